@@ -35,6 +35,7 @@ class WebUIConfig(BaseSettings):
     host: str = Field("0.0.0.0", env="WEB_UI_HOST")
     port: int = Field(8080, env="WEB_UI_PORT")
     debug: bool = Field(False, env="WEB_UI_DEBUG")
+    max_connections: int = Field(1000, env="WEB_UI_MAX_CONNECTIONS")
     
     class Config:
         env_prefix = "WEB_UI_"
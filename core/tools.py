@@ -372,7 +372,7 @@ class ToolManager:
         # Advanced tools (import dynamically to handle missing dependencies)
         # Advanced tools (import dynamically to handle missing dependencies)
         advanced_tools = [
-            ("tools.browser_tools", ["BrowserTool", "WebScrapingTool"], "selenium/beautifulsoup4"),
+            ("tools.browser_tools", ["BrowserTool", "WebScrapingTool"], "playwright/beautifulsoup4"),
             ("tools.audio_tools", ["TextToSpeechTool", "SpeechToTextTool", "AudioProcessingTool"], "pyttsx3/speechrecognition"),
             ("tools.document_tools", ["DocumentProcessorTool", "PDFTool", "WordTool"], "PyPDF2/python-docx"),
             ("tools.network_tools", ["HTTPRequestTool", "APITool", "WebhookTool"], "httpx"),
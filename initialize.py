@@ -79,16 +79,24 @@ async def check_dependencies():
     ]
     
     optional_packages = [
-        ("selenium", "selenium", "Browser automation"),
+        ("playwright", "playwright", "Browser automation"),
         ("speech_recognition", "SpeechRecognition", "Speech-to-text"),
         ("pyttsx3", "pyttsx3", "Text-to-speech"),
+        ("pymupdf", "pymupdf", "Fast PDF processing"),
         ("PyPDF2", "PyPDF2", "PDF processing"),
         ("docx", "python-docx", "Word document processing"),
+        ("charset_normalizer", "charset-normalizer", "Text encoding detection"),
+        ("google_crc32c", "google-crc32c", "Fast document cache fingerprints"),
         ("openpyxl", "openpyxl", "Excel processing"),
         ("PIL", "Pillow", "Image processing"),
         ("pandas", "pandas", "Data analysis"),
         ("matplotlib", "matplotlib", "Data visualization"),
-        ("httpx", "httpx", "Advanced HTTP requests")
+        ("httpx", "httpx", "Advanced HTTP requests"),
+        ("h2", "h2", "HTTP/2 for pooled HTTP requests"),
+        ("brotli", "brotli", "Brotli-compressed HTTP responses"),
+        ("zstandard", "zstandard", "Zstandard-compressed HTTP responses"),
+        ("httpx_aiohttp", "httpx-aiohttp", "aiohttp transport for pooled HTTP requests"),
+        ("hyperscan", "hyperscan", "Single-pass URL and email extraction")
     ]
     
     missing_required = []
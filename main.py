@@ -102,6 +102,14 @@ class AgentZeroGemini:
             if self.communication_manager:
                 await self.communication_manager.stop()
 
+            # Close pooled HTTP connections, the webhook server and the shared browser
+            from tools.browser_tools import close_browser, close_http_client
+            from tools.network_tools import aclose as close_network_client, stop_webhook_server
+            await close_http_client()
+            await close_network_client()
+            await stop_webhook_server()
+            await close_browser()
+
             # Save final state
             if self.root_agent:
                 await self.root_agent.save_state()
@@ -47,7 +47,6 @@ setup(
             "pyaudio>=0.2.11",
         ],
         "browser": [
-            "selenium>=4.15.0",
             "playwright>=1.40.0",
         ],
     },
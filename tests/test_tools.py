@@ -3,6 +3,8 @@ Tool tests for Agent Zero Gemini
 """
 import pytest
 import asyncio
+import json
+import os
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
 import tempfile
 from pathlib import Path
@@ -300,6 +302,539 @@ class TestAdvancedTools:
         except ImportError:
             pytest.skip("Analysis tools not available")
 
+class TestWebScrapingTool:
+    """Test web scraping tool"""
+    
+    @pytest.fixture
+    def serve(self):
+        """Serve fixed (content type, body) pages through the pooled HTTP client"""
+        httpx = pytest.importorskip("httpx")
+        pytest.importorskip("lxml")
+        pytest.importorskip("cssselect")
+        pages = {}
+        
+        def handler(request):
+            content_type, body = pages[request.url.path]
+            return httpx.Response(200, headers={"Content-Type": content_type}, content=body)
+        
+        # conftest patches httpx.AsyncClient; build the real client class directly
+        from httpx._client import AsyncClient
+        client = AsyncClient(transport=httpx.MockTransport(handler))
+        with patch("tools.browser_tools._get_http_client", return_value=client):
+            yield pages
+    
+    @pytest.mark.asyncio
+    async def test_charset_from_header_meta_or_default(self, serve):
+        """Test pages decode by HTTP charset, then <meta charset>, then UTF-8"""
+        from tools.browser_tools import WebScrapingTool
+        tool = WebScrapingTool()
+        
+        page = "<html><head><title>Café</title></head><body><p>Café</p></body></html>"
+        serve["/header"] = ("text/html; charset=utf-8", page.encode("utf-8"))
+        serve["/plain"] = ("text/html", page.encode("utf-8"))
+        serve["/meta"] = ("text/html", ('<meta charset="iso-8859-1">' + page).encode("latin-1"))
+        
+        for path in ("/header", "/plain", "/meta"):
+            result = await tool.execute(f"http://site.test{path}", {"text": "p"})
+            assert result["success"] is True
+            assert result["data"]["text"] == "Café"
+            assert result["page_title"] == "Café"
+    
+    @pytest.mark.asyncio
+    async def test_empty_body(self, serve):
+        """Test an empty page yields no matches rather than an error"""
+        from tools.browser_tools import WebScrapingTool
+        
+        serve["/empty"] = ("text/html", b"")
+        result = await WebScrapingTool().execute("http://site.test/empty", {"text": "p"})
+        
+        assert result["success"] is True
+        assert result["data"] == {"text": None}
+        assert result["page_title"] is None
+
+class TestImageAnalysisTool:
+    """Test image analysis tool"""
+    
+    @pytest.fixture
+    def image_file(self, temp_dir):
+        """Create a small test image"""
+        Image = pytest.importorskip("PIL.Image")
+        image_path = temp_dir / "photo.png"
+        Image.new("RGB", (40, 30), (200, 100, 50)).save(image_path)
+        return image_path
+    
+    @pytest.mark.asyncio
+    async def test_default_output_names(self, image_file):
+        """Test default output files keep the original suffix"""
+        from tools.analysis_tools import ImageAnalysisTool
+        tool = ImageAnalysisTool()
+        
+        result = await tool.execute("resize", str(image_file), width=20)
+        assert result["success"] is True
+        assert result["output_file"] == str(image_file.with_name("photo_resized.png"))
+        
+        result = await tool.execute("filter", str(image_file), filter_type="blur")
+        assert result["success"] is True
+        assert result["output_file"] == str(image_file.with_name("photo_blur.png"))
+        
+        result = await tool.execute("enhance", str(image_file), brightness=1.2)
+        assert result["success"] is True
+        assert result["output_file"] == str(image_file.with_name("photo_enhanced.png"))
+
+    @pytest.mark.asyncio
+    async def test_batch_keeps_outputs_apart(self, temp_dir):
+        """Test batch outputs never overwrite each other or the inputs"""
+        Image = pytest.importorskip("PIL.Image")
+        from tools.analysis_tools import ImageAnalysisTool
+        tool = ImageAnalysisTool()
+        
+        inputs = []
+        for folder in ("a", "b"):
+            (temp_dir / folder).mkdir()
+            inputs.append(temp_dir / folder / "photo.png")
+            Image.new("RGB", (40, 30), (200, 100, 50)).save(inputs[-1])
+        
+        result = await tool.execute(
+            "batch", None,
+            image_paths=[str(path) for path in inputs],
+            batch_action="resize",
+            width=20,
+            output_dir=str(temp_dir / "out")
+        )
+        assert result["success"] is True
+        assert sorted(path.name for path in (temp_dir / "out").iterdir()) == ["photo_1.png", "photo_2.png"]
+        
+        result = await tool.execute(
+            "batch", None,
+            image_paths=[str(inputs[0])],
+            batch_action="resize",
+            width=20,
+            output_dir=str(temp_dir / "a")
+        )
+        assert result["success"] is False
+        assert Image.open(inputs[0]).size == (40, 30)
+
+class TestAudioProcessingTool:
+    """Test audio processing tool"""
+    
+    @pytest.mark.asyncio
+    async def test_get_info_reads_header(self, temp_dir):
+        """Test get_info works from the WAV header alone"""
+        import wave
+        from tools.audio_tools import AudioProcessingTool
+        
+        audio_path = temp_dir / "tone.wav"
+        with wave.open(str(audio_path), "wb") as wav:
+            wav.setnchannels(2)
+            wav.setsampwidth(2)
+            wav.setframerate(8000)
+            wav.writeframes(b"\0" * 4 * 4000)
+        
+        result = await AudioProcessingTool().execute("get_info", str(audio_path))
+        
+        assert result["success"] is True
+        assert result["duration"] == 0.5
+        assert result["channels"] == 2
+        assert result["sample_rate"] == 8000
+        assert result["frame_width"] == 4
+        assert result["max_possible_amplitude"] == 32768.0
+        assert result["codec"] == "pcm_s16le"
+    
+    @pytest.mark.asyncio
+    async def test_convert_never_targets_the_input(self, temp_dir):
+        """Test same-format conversion writes a new file and an explicit output_file equal to the input is refused"""
+        from tools.audio_tools import AudioProcessingTool
+        
+        audio_path = temp_dir / "tone.wav"
+        audio_path.write_bytes(b"RIFF")
+        tool = AudioProcessingTool()
+        
+        with patch("tools.audio_tools._has_ffmpeg", return_value=True), \
+                patch("tools.audio_tools._run_ffmpeg", new=AsyncMock(return_value=b"")) as run_ffmpeg:
+            converted = await tool.execute("convert", str(audio_path), format="wav", sample_rate=8000)
+            refused = await tool.execute("convert", str(audio_path), format="wav", output_file=str(audio_path))
+        
+        assert converted["output_file"] == str(temp_dir / "tone_converted.wav")
+        assert run_ffmpeg.await_count == 1
+        assert refused["success"] is False
+        assert "overwrite the input" in refused["error"]
+
+class TestDocumentProcessorTool:
+    """Test document processor tool"""
+    
+    @pytest.mark.asyncio
+    async def test_extract_text_cache_follows_content(self, temp_dir):
+        """Test cached results are keyed by content, not path"""
+        from tools.document_tools import DocumentProcessorTool
+        tool = DocumentProcessorTool(cache_dir=temp_dir / "cache")
+        
+        original = temp_dir / "notes.txt"
+        original.write_text("hello\nworld\n", encoding="utf-8")
+        
+        result = await tool.execute("extract_text", str(original))
+        assert result["success"] is True
+        assert "cached" not in result
+        
+        moved = original.rename(temp_dir / "moved.txt")
+        result = await tool.execute("extract_text", str(moved))
+        assert result["cached"] is True
+        assert result["text"] == "hello\nworld\n"
+        assert result["file"] == str(moved)
+    
+    @pytest.mark.asyncio
+    async def test_convert_batch_reports_each_file(self, temp_dir):
+        """Test batch conversion writes every input and reports failures per file"""
+        from tools.document_tools import DocumentProcessorTool
+        tool = DocumentProcessorTool(cache_dir=temp_dir / "cache")
+        
+        first = temp_dir / "a.txt"
+        first.write_text("<first>", encoding="utf-8")
+        second = temp_dir / "b.txt"
+        second.write_text("second", encoding="utf-8")
+        
+        result = await tool.execute(
+            "convert_batch",
+            input_files=[str(first), str(second), str(temp_dir / "missing.txt")],
+            output_dir=str(temp_dir / "out"),
+            target_format="html"
+        )
+        
+        assert result["success"] is False
+        assert result["converted"] == 2
+        assert result["failed"] == 1
+        assert "&lt;first&gt;" in (temp_dir / "out" / "a.html").read_text(encoding="utf-8")
+        assert (temp_dir / "out" / "b.html").exists()
+    
+    @pytest.mark.asyncio
+    async def test_convert_batch_keeps_same_named_inputs_apart(self, temp_dir):
+        """Test inputs sharing a file name in different folders get separate outputs"""
+        from tools.document_tools import DocumentProcessorTool
+        tool = DocumentProcessorTool(cache_dir=temp_dir / "cache")
+        
+        inputs = []
+        for folder in ("a", "b"):
+            (temp_dir / folder).mkdir()
+            inputs.append(temp_dir / folder / "x.txt")
+            inputs[-1].write_text(f"from {folder}", encoding="utf-8")
+        
+        result = await tool.execute(
+            "convert_batch",
+            input_files=[str(path) for path in inputs] + [str(inputs[0])],
+            output_dir=str(temp_dir / "out"),
+            target_format="html"
+        )
+        
+        assert result["converted"] == 3
+        assert [entry["input_file"] for entry in result["results"]] == [str(inputs[0]), str(inputs[1]), str(inputs[0])]
+        outputs = sorted((temp_dir / "out").iterdir())
+        assert [path.name for path in outputs] == ["x_1.html", "x_2.html", "x_3.html"]
+        assert "from b" in outputs[1].read_text(encoding="utf-8")
+    
+    def test_excel_tiers_format_cells_alike(self, temp_dir):
+        """Test small and large workbooks stringify the same cell values identically"""
+        openpyxl = pytest.importorskip("openpyxl")
+        pytest.importorskip("pandas")
+        from tools import document_tools
+        
+        workbook_path = temp_dir / "numbers.xlsx"
+        workbook = openpyxl.Workbook()
+        workbook.active.append([1e20, 12345678901234567890, "text", None, 2.5])
+        workbook.save(workbook_path)
+        
+        with patch("tools.document_tools._EXCEL_PANDAS_MIN_ROWS", 0):
+            pandas_rows = document_tools._read_excel_rows(workbook_path)
+        cell_rows = document_tools._read_excel_rows(workbook_path)
+        
+        assert pandas_rows == cell_rows == {"Sheet": ["1e+20\t1.234567890123457e+19\ttext\t\t2.5"]}
+
+class TestHTTPRequestTool:
+    """Test HTTP request tool"""
+    
+    @pytest.mark.asyncio
+    async def test_large_bodies_spill_to_caller_owned_files(self, temp_dir):
+        """Test bodies over max_inline_bytes go to a file and expired spills are swept"""
+        httpx = pytest.importorskip("httpx")
+        from tools import network_tools
+        
+        async def handler(request):
+            return httpx.Response(200, json={"items": list(range(int(request.url.params["n"])))})
+        
+        from httpx._client import AsyncClient
+        client = AsyncClient(transport=httpx.MockTransport(handler))
+        stale = temp_dir / "old.body"
+        stale.write_bytes(b"left over")
+        os.utime(stale, (0, 0))
+        with patch("tools.network_tools._get_client", return_value=client), \
+                patch("tools.network_tools._SPILL_DIR", temp_dir):
+            tool = network_tools.HTTPRequestTool()
+            small = await tool.execute("GET", "http://api.test/", params={"n": 3})
+            large = await tool.execute("GET", "http://api.test/", params={"n": 1000}, max_inline_bytes=100)
+        
+        assert small["response"]["json"] == {"items": [0, 1, 2]}
+        body_path = Path(large["response"]["body_path"])
+        assert json.loads(body_path.read_bytes()) == {"items": list(range(1000))}
+        assert large["response"]["body_size"] == body_path.stat().st_size
+        assert "json" not in large["response"]
+        assert not stale.exists()
+
+class TestAPITool:
+    """Test API client tool"""
+    
+    @pytest.fixture
+    def mock_api(self):
+        """Route the pooled HTTP client to an in-process handler that records requests"""
+        httpx = pytest.importorskip("httpx")
+        requests = []
+        
+        async def handler(request):
+            requests.append(request)
+            # Long enough for concurrent calls to overlap
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={"user": request.headers.get("authorization")})
+        
+        # conftest patches httpx.AsyncClient; build the real client class directly
+        from httpx._client import AsyncClient
+        client = AsyncClient(transport=httpx.MockTransport(handler))
+        with patch("tools.network_tools._get_client", return_value=client):
+            yield requests
+    
+    @pytest.mark.asyncio
+    async def test_identical_calls_share_one_request(self, mock_api):
+        """Test concurrent identical GETs are coalesced into one request"""
+        from tools.network_tools import APITool
+        tool = APITool()
+        
+        results = await asyncio.gather(*(
+            tool.execute("call", url="http://api.test/me", headers={"Authorization": "Bearer alice"})
+            for _ in range(3)
+        ))
+        
+        assert len(mock_api) == 1
+        assert all(result["response"]["json"] == {"user": "Bearer alice"} for result in results)
+    
+    @pytest.mark.asyncio
+    async def test_calls_with_different_credentials_are_not_shared(self, mock_api):
+        """Test coalescing never hands one caller's response to another"""
+        from tools.network_tools import APITool
+        tool = APITool()
+        
+        alice, bob = await asyncio.gather(
+            tool.execute("call", url="http://api.test/me", headers={"Authorization": "Bearer alice"}),
+            tool.execute("call", url="http://api.test/me", headers={"authorization": "Bearer bob"})
+        )
+        
+        assert len(mock_api) == 2
+        assert alice["response"]["json"] == {"user": "Bearer alice"}
+        assert bob["response"]["json"] == {"user": "Bearer bob"}
+    
+    @pytest.mark.asyncio
+    async def test_cached_responses_are_kept_per_credentials(self, mock_api):
+        """Test the response cache never serves one caller's response to another"""
+        from tools.network_tools import APITool
+        tool = APITool()
+        
+        results = []
+        for user in ("alice", "alice", "bob"):
+            results.append(await tool.execute(
+                "call", url="http://api.test/me", headers={"Authorization": f"Bearer {user}"}, cache=True
+            ))
+        
+        assert len(mock_api) == 2
+        assert results[1]["cached"] is True
+        assert results[2]["response"]["json"] == {"user": "Bearer bob"}
+    
+    @pytest.mark.asyncio
+    async def test_revalidation_with_no_store_evicts_the_entry(self):
+        """Test a 304 carrying no-store answers the call but drops the cached response"""
+        httpx = pytest.importorskip("httpx")
+        from tools.network_tools import APITool
+        requests = []
+        
+        async def handler(request):
+            requests.append(request)
+            if request.headers.get("if-none-match") == '"v1"':
+                return httpx.Response(304, headers={"ETag": '"v1"', "Cache-Control": "no-store"})
+            return httpx.Response(200, json={"version": 1}, headers={"ETag": '"v1"', "Cache-Control": "max-age=0"})
+        
+        from httpx._client import AsyncClient
+        client = AsyncClient(transport=httpx.MockTransport(handler))
+        tool = APITool()
+        with patch("tools.network_tools._get_client", return_value=client):
+            results = [await tool.execute("call", url="http://api.test/v", cache=True) for _ in range(3)]
+        
+        assert results[1]["revalidated"] is True
+        assert results[1]["response"]["json"] == {"version": 1}
+        assert "if-none-match" in requests[1].headers
+        assert "if-none-match" not in requests[2].headers
+    
+    @pytest.mark.asyncio
+    async def test_endpoint_timings_are_none_without_trace_events(self, mock_api):
+        """Test unmeasured connection phases are reported as None, not as zero"""
+        from tools.network_tools import APITool
+        
+        result = await APITool().execute("test_endpoint", url="http://api.test/health")
+        
+        assert result["available"] is True
+        assert result["connect_time"] is None
+        assert result["ttfb"] is None
+    
+    @pytest.mark.asyncio
+    async def test_combined_jsonrpc_calls_get_their_own_replies(self):
+        """Test a combined JSON-RPC batch maps replies back even when callers reuse ids"""
+        httpx = pytest.importorskip("httpx")
+        from tools.network_tools import APITool
+        batches = []
+        
+        async def handler(request):
+            batch = json.loads(request.content)
+            batches.append(batch)
+            replies = [
+                {"jsonrpc": "2.0", "id": call["id"], "result": call["params"]}
+                for call in batch if "id" in call
+            ]
+            # Servers may answer a batch in any order
+            return httpx.Response(200, json=replies[::-1])
+        
+        def rpc(params, **fields):
+            return {
+                "method": "POST",
+                "url": "http://rpc.test/",
+                "json": {"jsonrpc": "2.0", "method": "echo", "params": params, **fields}
+            }
+        
+        from httpx._client import AsyncClient
+        client = AsyncClient(transport=httpx.MockTransport(handler))
+        with patch("tools.network_tools._get_client", return_value=client):
+            result = await APITool().execute(
+                "batch_call",
+                calls=[rpc(["first"], id=1), rpc(["second"], id=1), rpc(["ping"])],
+                combine_jsonrpc=True
+            )
+        
+        assert len(batches) == 1
+        first, second, notification = result["results"]
+        assert first["response"]["json"] == {"jsonrpc": "2.0", "id": 1, "result": ["first"]}
+        assert second["response"]["json"] == {"jsonrpc": "2.0", "id": 1, "result": ["second"]}
+        assert notification["success"] is True
+        assert notification["notification"] is True
+
+class TestWebhookTool:
+    """Test webhook tool"""
+    
+    @pytest.mark.asyncio
+    async def test_create_reports_busy_port(self):
+        """Test a port that is already in use fails the call instead of exiting the process"""
+        import socket
+        pytest.importorskip("uvicorn")
+        from tools.network_tools import WebhookTool, stop_webhook_server
+        
+        with socket.socket() as holder:
+            holder.bind(("127.0.0.1", 0))
+            holder.listen()
+            port = holder.getsockname()[1]
+            
+            result = await WebhookTool().execute("create", port=port, path="/busy")
+        
+        assert result["success"] is False
+        assert str(port) in result["error"]
+        await stop_webhook_server()
+    
+    @pytest.mark.asyncio
+    async def test_create_receives_deliveries(self):
+        """Test a created webhook is listening once create returns"""
+        import socket
+        import urllib.request
+        pytest.importorskip("uvicorn")
+        from tools.network_tools import WebhookTool, stop_webhook_server
+        
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        
+        tool = WebhookTool()
+        try:
+            result = await tool.execute("create", port=port, path="/hook", webhook_id="hook")
+            assert result["success"] is True
+            
+            request = urllib.request.Request(f"http://127.0.0.1:{port}/hook", data=b'{"n": 1}', method="POST")
+            await asyncio.to_thread(urllib.request.urlopen, request, timeout=5)
+            assert list(tool.active_webhooks["hook"]["data"])[0]["json"] == {"n": 1}
+        finally:
+            await stop_webhook_server()
+
+class TestFileUtils:
+    """Test file utilities"""
+    
+    def test_copy_file_onto_itself_keeps_data(self, temp_dir):
+        """Test copying a file onto itself or a link to it fails without truncating it"""
+        from utils.file_utils import FileUtils
+        
+        source = temp_dir / "data.txt"
+        source.write_text("keep me", encoding="utf-8")
+        link = temp_dir / "link.txt"
+        link.symlink_to(source)
+        
+        assert FileUtils.copy_file(source, source, overwrite=True) is False
+        assert FileUtils.copy_file(source, link, overwrite=True) is False
+        assert source.read_text(encoding="utf-8") == "keep me"
+    
+    def test_copy_file_copies_content(self, temp_dir):
+        """Test a regular copy creates parent directories and respects overwrite"""
+        from utils.file_utils import FileUtils
+        
+        source = temp_dir / "data.txt"
+        source.write_text("payload", encoding="utf-8")
+        destination = temp_dir / "nested" / "copy.txt"
+        
+        assert FileUtils.copy_file(source, destination) is True
+        assert destination.read_text(encoding="utf-8") == "payload"
+        assert FileUtils.copy_file(source, destination) is False
+
+class TestErrorHandler:
+    """Test error handler history"""
+    
+    def test_history_does_not_keep_frames_alive(self):
+        """Test stored errors keep their traceback text but release frame locals"""
+        import gc
+        import weakref
+        from utils.error_handler import ErrorHandler
+        
+        class Payload:
+            pass
+        
+        handler = ErrorHandler(log_errors=False)
+        payloads = []
+        
+        def fail(payload):
+            raise ValueError("boom")
+        
+        for _ in range(5):
+            payload = Payload()
+            payloads.append(weakref.ref(payload))
+            try:
+                fail(payload)
+            except ValueError as e:
+                handler.handle_error(e)
+            del payload
+        gc.collect()
+        
+        assert all(ref() is None for ref in payloads)
+        record = handler.get_error_statistics()["recent_errors"][-1]
+        assert "in fail" in record["traceback"]
+        assert "ValueError: boom" in record["traceback"]
+    
+    def test_history_is_bounded(self):
+        """Test the history keeps the newest maxlen errors and counts all of them"""
+        from utils.error_handler import ErrorHandler
+        
+        handler = ErrorHandler(log_errors=False)
+        handler.error_storage.maxlen = 3
+        for index in range(10):
+            handler.handle_error(ValueError(str(index)))
+        
+        assert [record["error_message"] for record in handler.error_storage] == ["7", "8", "9"]
+        assert handler.get_error_statistics()["total_errors"] == 10
+
 class TestToolManagerIntegration:
     """Test tool manager integration with all tools"""
     
@@ -2,16 +2,313 @@
 Data analysis and image processing tools for Agent Zero Gemini
 """
 import asyncio
+import atexit
+import itertools
 import logging
-from typing import Dict, List, Optional, Any
+import multiprocessing
+import os
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Any, Tuple
 from pathlib import Path
 import tempfile
 import base64
 
 from core.tools import BaseTool
 
+# Heavy optional dependencies are imported once at load time rather than on
+# every call; tools check for None and report what is missing
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pandas as pd
+    from pandas.api import types as ptypes
+except ImportError:
+    pd = None
+    ptypes = None
+
+try:
+    from PIL import Image, ImageFilter, ImageEnhance
+except ImportError:
+    Image = ImageFilter = ImageEnhance = None
+
 logger = logging.getLogger(__name__)
 
+# pyplot module, imported on first chart with the Agg backend selected
+_pyplot = None
+
+def _get_pyplot():
+    """Import pyplot once with the headless Agg backend"""
+    global _pyplot
+    
+    if _pyplot is None:
+        import matplotlib
+        # Must be selected before pyplot loads a GUI backend
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        _pyplot = plt
+    
+    return _pyplot
+
+# Compiled RGB histogram kernel; False once numba is known to be missing
+_hist_kernel = None
+
+# Zeroing and scanning the 2^24 histogram costs ~60 ms, so the kernel only
+# beats a sort of packed keys from about 8 MP up
+_HIST_KERNEL_MIN_PIXELS = 1 << 23
+
+def _get_hist_kernel():
+    """Compile the numba RGB histogram kernel on first use"""
+    global _hist_kernel
+    
+    if _hist_kernel is None:
+        try:
+            from numba import get_num_threads, njit, prange
+        except ImportError:
+            _hist_kernel = False
+            return None
+        
+        @njit(parallel=True, cache=True)
+        def _hist_rgb(pixels, out, blocks):
+            n = pixels.shape[0]
+            keys = np.empty(n, dtype=np.uint32)
+            for i in prange(n):
+                keys[i] = (np.uint32(pixels[i, 0]) << 16) | (np.uint32(pixels[i, 1]) << 8) | np.uint32(pixels[i, 2])
+            
+            # Each thread owns one block of bins and counts only the keys that land
+            # in it, so the counting runs in parallel without racing on shared bins
+            # and without a private 64 MB histogram per thread to zero and sum
+            width = (out.shape[0] + blocks - 1) // blocks
+            for block in prange(blocks):
+                low = block * width
+                high = low + width
+                for i in range(n):
+                    key = keys[i]
+                    if key >= low and key < high:
+                        out[key] += 1
+        
+        def _hist_all_threads(pixels, out):
+            # Thread count comes from here; read inside the kernel it would stop numba caching it
+            _hist_rgb(pixels, out, get_num_threads())
+        
+        _hist_kernel = _hist_all_threads
+    
+    return _hist_kernel or None
+
+# Images smaller than this are not worth the host/device transfer
+_GPU_MIN_BYTES = 8 * 1024 * 1024
+
+def _gpu_color_stats(img_array, top_n: int = 5):
+    """Compute mean and top colors on the GPU; None if no CUDA device is usable"""
+    try:
+        import cupy as cp
+        if cp.cuda.runtime.getDeviceCount() == 0:
+            return None
+    except Exception:
+        return None
+    
+    device_array = cp.asarray(img_array)
+    keys = ((device_array[..., 0].astype(cp.uint32) << 16) |
+            (device_array[..., 1].astype(cp.uint32) << 8) |
+            device_array[..., 2])
+    counts = cp.bincount(keys.ravel(), minlength=1 << 24)
+    top = cp.argpartition(counts, -top_n)[-top_n:]
+    top = top[counts[top] > 0]
+    
+    pixels = device_array.reshape(-1, 3)
+    mean_color = cp.add.reduce(pixels, axis=0, dtype=cp.uint64) / pixels.shape[0]
+    
+    return (
+        cp.asnumpy(mean_color),
+        cp.asnumpy(top),
+        cp.asnumpy(counts[top]),
+        int(cp.count_nonzero(counts))
+    )
+
+def _pack_rgb(pixels):
+    """Pack an (N, 3) uint8 array into 24-bit uint32 color keys"""
+    return ((pixels[:, 0].astype(np.uint32) << 16) |
+            (pixels[:, 1].astype(np.uint32) << 8) |
+            pixels[:, 2])
+
+# Below this many pixels a single sort beats a full 2^24 histogram
+_TILED_MIN_PIXELS = 1 << 24
+_COLOR_TILE = 512
+
+def _tiled_color_histogram(img_array, tile: int = _COLOR_TILE):
+    """Count colors tile by tile so each tile's keys stay cache-resident"""
+    histogram = np.zeros(1 << 24, dtype=np.uint32)
+    height, width = img_array.shape[:2]
+    
+    for y0 in range(0, height, tile):
+        for x0 in range(0, width, tile):
+            keys = _pack_rgb(img_array[y0:y0 + tile, x0:x0 + tile].reshape(-1, 3))
+            tile_keys, tile_counts = np.unique(keys, return_counts=True)
+            histogram[tile_keys] += tile_counts.astype(np.uint32)
+    
+    return histogram
+
+def _unpack_rgb(keys):
+    """Split packed 24-bit color keys back into an (N, 3) uint8 array"""
+    keys = keys.astype(np.uint32, copy=False)
+    return np.stack([(keys >> 16) & 0xFF, (keys >> 8) & 0xFF, keys & 0xFF], axis=1).astype(np.uint8)
+
+def _shrink_dataframe(df: 'pd.DataFrame') -> 'pd.DataFrame':
+    """Downcast numeric columns and categorize repetitive string columns in place"""
+    row_count = len(df)
+    for column in df.columns:
+        series = df[column]
+        dtype = series.dtype
+        
+        # Covers NumPy, nullable and Arrow-backed (polars/pyarrow readers) numerics;
+        # to_numeric keeps the backend, e.g. int64[pyarrow] -> int16[pyarrow]
+        if ptypes.is_integer_dtype(dtype):
+            minimum = series.min()
+            downcast = 'integer' if pd.isna(minimum) or minimum < 0 else 'unsigned'
+            df[column] = pd.to_numeric(series, downcast=downcast)
+        elif ptypes.is_float_dtype(dtype):
+            df[column] = pd.to_numeric(series, downcast='float')
+        elif row_count and (ptypes.is_object_dtype(dtype) or ptypes.is_string_dtype(dtype)):
+            try:
+                if series.nunique() / row_count < 0.5:
+                    df[column] = series.astype('category')
+            except TypeError:
+                # Unhashable cells (lists, dicts from JSON) can't be categorized
+                continue
+    
+    return df
+
+def _encode_arrow_sample(df: 'pd.DataFrame') -> Optional[str]:
+    """Serialize a DataFrame as a base64 Arrow IPC stream; None without pyarrow"""
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return None
+    
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    
+    return base64.b64encode(sink.getvalue().to_pybytes()).decode('ascii')
+
+# Loaded and derived DataFrames, most recently used last:
+# cache key -> (dataset_id, DataFrame)
+_DF_CACHE: "OrderedDict[str, Tuple[str, Any]]" = OrderedDict()
+_DF_CACHE_SIZE = 8
+_DERIVED_IDS = itertools.count(1)
+
+def _cache_dataframe(cache_key: str, dataset_id: str, df: 'pd.DataFrame'):
+    """Insert a DataFrame into the LRU cache, evicting the oldest entry"""
+    _DF_CACHE[cache_key] = (dataset_id, df)
+    _DF_CACHE.move_to_end(cache_key)
+    while len(_DF_CACHE) > _DF_CACHE_SIZE:
+        _DF_CACHE.popitem(last=False)
+
+def _get_cached_dataframe(dataset_id: Optional[str]) -> Optional['pd.DataFrame']:
+    """Look up a cached DataFrame by its dataset_id"""
+    if not dataset_id:
+        return None
+    
+    for cache_key, (cached_id, df) in _DF_CACHE.items():
+        if cached_id == dataset_id:
+            _DF_CACHE.move_to_end(cache_key)
+            return df
+    
+    return None
+
+_FILTER_OPERATORS = {
+    "==": lambda column, value: column == value,
+    "!=": lambda column, value: column != value,
+    ">": lambda column, value: column > value,
+    ">=": lambda column, value: column >= value,
+    "<": lambda column, value: column < value,
+    "<=": lambda column, value: column <= value,
+    "in": lambda column, value: column.isin(value),
+    "contains": lambda column, value: column.astype(str).str.contains(str(value), regex=False)
+}
+
+# Resampling filters by speed/quality trade-off, as Image.Resampling names
+_RESAMPLE_FILTERS = {
+    "fast": "BILINEAR",
+    "quality": "LANCZOS"
+}
+
+# Encoder formats by file suffix, so saves don't re-infer them
+_IMAGE_FORMATS = {
+    ".jpg": "JPEG",
+    ".jpeg": "JPEG",
+    ".png": "PNG",
+    ".webp": "WEBP",
+    ".gif": "GIF",
+    ".bmp": "BMP",
+    ".tif": "TIFF",
+    ".tiff": "TIFF"
+}
+
+def _reduce_and_resize(image: 'Image', new_size: Tuple[int, int], resample_filter) -> 'Image':
+    """Resize, box-reducing by an integer factor first when shrinking 2x or more"""
+    factor = min(image.width // new_size[0], image.height // new_size[1])
+    if factor >= 2:
+        try:
+            # Integer box reduction is far cheaper than filtering every source pixel
+            image = image.reduce(factor)
+        except ValueError:
+            # Palette and bilevel modes can't be reduced; resize directly
+            pass
+    
+    return image.resize(new_size, resample_filter)
+
+def _image_save_options(output_path: Path, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Explicit encoder parameters for Image.save, favoring encode speed"""
+    image_format = _IMAGE_FORMATS.get(output_path.suffix.lower())
+    if image_format is None:
+        return {}
+    
+    save_options = {"format": image_format}
+    if image_format in ("JPEG", "WEBP"):
+        save_options["quality"] = options.get("quality", 85)
+    if image_format == "JPEG":
+        save_options["progressive"] = False
+        save_options["optimize"] = False
+    elif image_format == "PNG":
+        # zlib level 1 is roughly 10x faster than the default 6 for ~20% larger files
+        save_options["compress_level"] = options.get("png_compress", 1)
+    
+    return save_options
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    """Shared worker pool for batch image processing, created on first use"""
+    global _process_pool
+    
+    if _process_pool is None:
+        # Spawned rather than forked: forking after numba's threading layer has
+        # started leaves workers that hang the interpreter at exit
+        _process_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        atexit.register(_shutdown_process_pool)
+    return _process_pool
+
+def _shutdown_process_pool():
+    """Stop the batch worker pool"""
+    global _process_pool
+    
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=True, cancel_futures=True)
+        _process_pool = None
+
+def _process_one_image(image_path: str, action: str, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """Process a single image inside a worker process"""
+    return asyncio.run(ImageAnalysisTool().execute(action, image_path, **kwargs))
+
 class DataAnalysisTool(BaseTool):
     """Data analysis tool with pandas and numpy"""
     
@@ -20,13 +317,19 @@ class DataAnalysisTool(BaseTool):
             name="data_analysis",
             description="Analyze data using pandas - load, clean, transform, and visualize datasets"
         )
+        # One reusable figure per tool; the lock keeps a save from racing the next plot
+        self._figure_num = f"data_analysis_{id(self)}"
+        self._figure_lock = asyncio.Lock()
     
     async def execute(self, action: str, **kwargs) -> Dict[str, Any]:
         """Perform data analysis"""
+        if pd is None or np is None:
+            return {
+                "success": False,
+                "error": "pandas/numpy not installed. Install with: pip install pandas numpy"
+            }
+        
         try:
-            import pandas as pd
-            import numpy as np
-            
             if action == "load_data":
                 return await self._load_data(**kwargs)
             elif action == "describe":
@@ -45,11 +348,6 @@ class DataAnalysisTool(BaseTool):
                     "error": f"Unknown action: {action}"
                 }
                 
-        except ImportError:
-            return {
-                "success": False,
-                "error": "pandas/numpy not installed. Install with: pip install pandas numpy"
-            }
         except Exception as e:
             return {
                 "success": False,
@@ -58,8 +356,6 @@ class DataAnalysisTool(BaseTool):
     
     async def _load_data(self, **kwargs) -> Dict[str, Any]:
         """Load data from various sources"""
-        import pandas as pd
-        
         source = kwargs.get("source")
         file_path = kwargs.get("file_path")
         
@@ -80,66 +376,173 @@ class DataAnalysisTool(BaseTool):
             # Determine file type and load accordingly
             file_extension = file_path_obj.suffix.lower()
             
-            if file_extension == '.csv':
-                df = pd.read_csv(file_path, **kwargs.get("read_options", {}))
-            elif file_extension in ['.xlsx', '.xls']:
-                df = pd.read_excel(file_path, **kwargs.get("read_options", {}))
-            elif file_extension == '.json':
-                df = pd.read_json(file_path, **kwargs.get("read_options", {}))
-            elif file_extension == '.parquet':
-                df = pd.read_parquet(file_path, **kwargs.get("read_options", {}))
+            read_options = kwargs.get("read_options", {})
+            columns = kwargs.get("columns")
+            filters = kwargs.get("filters")
+            shrink = kwargs.get("shrink", True)
+            
+            # An unchanged file loaded with the same options is served from cache
+            stat = file_path_obj.stat()
+            cache_key = (f"{file_path_obj.resolve()}:{stat.st_mtime_ns}:{stat.st_size}:"
+                         f"{shrink}:{sorted(read_options.items())!r}:{columns!r}:{filters!r}")
+            cached = _DF_CACHE.get(cache_key)
+            
+            if cached is not None:
+                _DF_CACHE.move_to_end(cache_key)
+                dataset_id, df = cached
             else:
-                return {
-                    "success": False,
-                    "error": f"Unsupported file format: {file_extension}"
-                }
+                if file_extension == '.csv':
+                    df = await self._read_columnar(file_path, file_extension, read_options, columns, filters)
+                    if df is None:
+                        if filters:
+                            raise ValueError("filters on CSV files require pyarrow")
+                        if columns:
+                            read_options = {**read_options, "usecols": columns}
+                        df = await asyncio.to_thread(pd.read_csv, file_path, **read_options)
+                elif file_extension in ['.xlsx', '.xls']:
+                    df = await asyncio.to_thread(pd.read_excel, file_path, **read_options)
+                elif file_extension == '.json':
+                    df = await asyncio.to_thread(pd.read_json, file_path, **read_options)
+                elif file_extension == '.parquet':
+                    df = await self._read_columnar(file_path, file_extension, read_options, columns, filters)
+                    if df is None:
+                        df = await asyncio.to_thread(
+                            pd.read_parquet, file_path, columns=columns, filters=filters, **read_options
+                        )
+                else:
+                    return {
+                        "success": False,
+                        "error": f"Unsupported file format: {file_extension}"
+                    }
+                
+                if shrink:
+                    df = await asyncio.to_thread(_shrink_dataframe, df)
+                
+                dataset_id = f"dataset_{uuid.uuid4().hex[:12]}"
+                _cache_dataframe(cache_key, dataset_id, df)
             
             # Basic info about the dataset
             info = {
                 "shape": df.shape,
                 "columns": list(df.columns),
                 "dtypes": df.dtypes.to_dict(),
-                "memory_usage": df.memory_usage(deep=True).sum(),
+                # A deep scan walks every Python string; only do it on request
+                "memory_usage": df.memory_usage(deep=kwargs.get("exact_memory", False)).sum(),
                 "null_counts": df.isnull().sum().to_dict()
             }
             
-            # Store dataframe reference (in real implementation, you'd use a proper storage mechanism)
-            dataset_id = f"dataset_{asyncio.get_event_loop().time()}"
-            
-            return {
+            result = {
                 "success": True,
                 "dataset_id": dataset_id,
                 "info": info,
-                "sample": df.head().to_dict('records'),
                 "file_path": str(file_path)
             }
             
+            # Columnar sample instead of one Python dict per row
+            sample = df.head()
+            sample_arrow = _encode_arrow_sample(sample)
+            if sample_arrow is not None:
+                result["sample_arrow_b64"] = sample_arrow
+            else:
+                result["sample"] = sample.to_dict('records')
+            
+            if kwargs.get("preview", True):
+                result["sample_preview"] = sample.to_string()
+            
+            return result
+            
         except Exception as e:
             return {
                 "success": False,
                 "error": f"Error loading data: {str(e)}"
             }
     
+    async def _read_columnar(self, file_path: str, file_extension: str, read_options: Dict[str, Any],
+                             columns: Optional[List[str]], filters: Optional[List]) -> Optional['pd.DataFrame']:
+        """Read CSV/Parquet with polars or pyarrow, or None to fall back to pandas"""
+        # read_options are pandas keyword arguments, neither reader would understand them
+        if read_options:
+            return None
+        
+        df = None
+        if not columns and not filters:
+            df = await self._read_with_polars(file_path, file_extension)
+        if df is None:
+            df = await self._read_with_arrow(file_path, file_extension, columns, filters)
+        
+        return df
+    
+    async def _read_with_polars(self, file_path: str, file_extension: str) -> Optional['pd.DataFrame']:
+        """Read CSV/Parquet with polars' multi-threaded reader"""
+        try:
+            import polars as pl
+        except ImportError:
+            return None
+        
+        reader = pl.read_csv if file_extension == '.csv' else pl.read_parquet
+        polars_df = await asyncio.to_thread(reader, file_path)
+        
+        try:
+            # Arrow-backed columns are handed over without copying
+            return polars_df.to_pandas(use_pyarrow_extension_array=True)
+        except ImportError:
+            return None
+    
+    async def _read_with_arrow(self, file_path: str, file_extension: str,
+                               columns: Optional[List[str]], filters: Optional[List]) -> Optional['pd.DataFrame']:
+        """Read with pyarrow, pushing column and row filters down into the scan"""
+        try:
+            import pyarrow.csv as pa_csv
+            import pyarrow.dataset as pa_dataset
+            import pyarrow.parquet as pq
+        except ImportError:
+            return None
+        
+        # filters use the pandas/pyarrow DNF form: [(column, op, value), ...]
+        expression = pq.filters_to_expression(filters) if filters else None
+        
+        def read():
+            if file_extension == '.parquet':
+                # Only the requested columns and matching row groups are decoded
+                table = pa_dataset.dataset(file_path, format="parquet").to_table(
+                    columns=columns, filter=expression
+                )
+            else:
+                convert_options = pa_csv.ConvertOptions(include_columns=columns) if columns else None
+                table = pa_csv.read_csv(file_path, convert_options=convert_options)
+                if expression is not None:
+                    table = table.filter(expression)
+            return table.to_pandas(types_mapper=pd.ArrowDtype)
+        
+        return await asyncio.to_thread(read)
+    
     async def _describe_data(self, **kwargs) -> Dict[str, Any]:
         """Generate descriptive statistics"""
-        # In a real implementation, you'd retrieve the dataframe by dataset_id
-        # For now, we'll simulate the analysis
+        dataset_id = kwargs.get("dataset_id")
+        df = _get_cached_dataframe(dataset_id)
+        
+        if df is None:
+            return {
+                "success": False,
+                "error": f"Dataset not found: {dataset_id}. Load it with load_data first"
+            }
+        
+        columns = kwargs.get("columns")
+        if columns:
+            df = df[columns]
+        
+        description = await asyncio.to_thread(df.describe, include='all')
         
         return {
             "success": True,
-            "description": {
-                "count": "Sample count statistics",
-                "mean": "Sample mean statistics", 
-                "std": "Sample standard deviation",
-                "min": "Sample minimum values",
-                "max": "Sample maximum values",
-                "quartiles": "Sample quartile information"
-            },
+            "dataset_id": dataset_id,
+            "description": description.to_dict(),
             "message": "Statistical description generated"
         }
     
     async def _filter_data(self, **kwargs) -> Dict[str, Any]:
         """Filter dataset based on conditions"""
+        dataset_id = kwargs.get("dataset_id")
         conditions = kwargs.get("conditions", [])
         
         if not conditions:
@@ -148,16 +551,49 @@ class DataAnalysisTool(BaseTool):
                 "error": "No filter conditions provided"
             }
         
-        # Simulate filtering
+        df = _get_cached_dataframe(dataset_id)
+        if df is None:
+            return {
+                "success": False,
+                "error": f"Dataset not found: {dataset_id}. Load it with load_data first"
+            }
+        
+        mask = None
+        for condition in conditions:
+            column = condition.get("column")
+            operator = condition.get("operator", "==")
+            value = condition.get("value")
+            
+            if column not in df.columns:
+                return {
+                    "success": False,
+                    "error": f"Unknown column: {column}"
+                }
+            if operator not in _FILTER_OPERATORS:
+                return {
+                    "success": False,
+                    "error": f"Unknown operator: {operator}"
+                }
+            
+            condition_mask = _FILTER_OPERATORS[operator](df[column], value)
+            mask = condition_mask if mask is None else mask & condition_mask
+        
+        filtered_df = df[mask]
+        filtered_id = f"{dataset_id}_filtered_{next(_DERIVED_IDS)}"
+        _cache_dataframe(filtered_id, filtered_id, filtered_df)
+        
         return {
             "success": True,
-            "filtered_rows": 150,  # Example
+            "dataset_id": filtered_id,
+            "source_dataset_id": dataset_id,
+            "filtered_rows": len(filtered_df),
             "conditions_applied": conditions,
             "message": "Data filtered successfully"
         }
     
     async def _aggregate_data(self, **kwargs) -> Dict[str, Any]:
         """Aggregate data by groups"""
+        dataset_id = kwargs.get("dataset_id")
         group_by = kwargs.get("group_by", [])
         aggregations = kwargs.get("aggregations", {})
         
@@ -167,77 +603,106 @@ class DataAnalysisTool(BaseTool):
                 "error": "group_by columns required"
             }
         
-        # Simulate aggregation
+        df = _get_cached_dataframe(dataset_id)
+        if df is None:
+            return {
+                "success": False,
+                "error": f"Dataset not found: {dataset_id}. Load it with load_data first"
+            }
+        
+        grouped = df.groupby(group_by, observed=True)
+        if aggregations:
+            aggregated = await asyncio.to_thread(grouped.agg, aggregations)
+        else:
+            aggregated = await asyncio.to_thread(grouped.size)
+            aggregated = aggregated.to_frame("count")
+        aggregated = aggregated.reset_index()
+        
+        aggregated_id = f"{dataset_id}_aggregated_{next(_DERIVED_IDS)}"
+        _cache_dataframe(aggregated_id, aggregated_id, aggregated)
+        
         return {
             "success": True,
-            "groups": len(group_by),
+            "dataset_id": aggregated_id,
+            "source_dataset_id": dataset_id,
+            "groups": len(aggregated),
             "aggregations": aggregations,
-            "result_shape": [50, 5],  # Example
+            "result_shape": list(aggregated.shape),
+            "result_preview": aggregated.head(20).to_string(),
             "message": "Data aggregated successfully"
         }
     
     async def _visualize_data(self, **kwargs) -> Dict[str, Any]:
         """Create data visualizations"""
         try:
-            import matplotlib.pyplot as plt
-            import seaborn as sns
+            _get_pyplot()
             
             chart_type = kwargs.get("chart_type", "histogram")
             columns = kwargs.get("columns", [])
             output_file = kwargs.get("output_file", "chart.png")
+            dpi = kwargs.get("dpi", 100)
+            bbox_inches = kwargs.get("bbox_inches")
             
-            # Create sample visualization
-            plt.figure(figsize=(10, 6))
-            
-            if chart_type == "histogram":
-                # Sample histogram
-                import numpy as np
-                data = np.random.normal(0, 1, 1000)
-                plt.hist(data, bins=30, alpha=0.7)
-                plt.title("Sample Histogram")
-                plt.xlabel("Value")
-                plt.ylabel("Frequency")
-            
-            elif chart_type == "scatter":
-                # Sample scatter plot
-                import numpy as np
-                x = np.random.normal(0, 1, 100)
-                y = np.random.normal(0, 1, 100)
-                plt.scatter(x, y, alpha=0.6)
-                plt.title("Sample Scatter Plot")
-                plt.xlabel("X Values")
-                plt.ylabel("Y Values")
-            
-            elif chart_type == "line":
-                # Sample line plot
-                import numpy as np
-                x = np.linspace(0, 10, 100)
-                y = np.sin(x)
-                plt.plot(x, y)
-                plt.title("Sample Line Plot")
-                plt.xlabel("X")
-                plt.ylabel("Y")
-            
-            # Save plot
-            output_path = Path(output_file)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            plt.savefig(output_path, dpi=300, bbox_inches='tight')
-            plt.close()
-            
-            return {
-                "success": True,
-                "chart_type": chart_type,
-                "output_file": str(output_path),
-                "columns": columns,
-                "message": f"Visualization saved to {output_path}"
-            }
+            async with self._figure_lock:
+                return await self._render_chart(chart_type, columns, output_file, dpi, bbox_inches)
             
         except ImportError:
             return {
                 "success": False,
-                "error": "matplotlib/seaborn not installed. Install with: pip install matplotlib seaborn"
+                "error": "matplotlib not installed. Install with: pip install matplotlib"
             }
     
+    async def _render_chart(self, chart_type: str, columns: List[str], output_file: str,
+                            dpi: int, bbox_inches: Optional[str]) -> Dict[str, Any]:
+        """Draw a chart on the reusable figure and save it"""
+        plt = _get_pyplot()
+        
+        # Reuse the figure instead of re-initializing backend state per chart
+        fig = plt.figure(num=self._figure_num, figsize=(10, 6), clear=True)
+        fig.set_layout_engine('tight')
+        
+        if chart_type == "histogram":
+            # Sample histogram
+            data = np.random.normal(0, 1, 1000)
+            plt.hist(data, bins=30, alpha=0.7, rasterized=True)
+            plt.title("Sample Histogram")
+            plt.xlabel("Value")
+            plt.ylabel("Frequency")
+        
+        elif chart_type == "scatter":
+            # Sample scatter plot
+            x = np.random.normal(0, 1, 100)
+            y = np.random.normal(0, 1, 100)
+            plt.scatter(x, y, alpha=0.6, rasterized=True)
+            plt.title("Sample Scatter Plot")
+            plt.xlabel("X Values")
+            plt.ylabel("Y Values")
+        
+        elif chart_type == "line":
+            # Sample line plot
+            x = np.linspace(0, 10, 100)
+            y = np.sin(x)
+            plt.plot(x, y, rasterized=True)
+            plt.title("Sample Line Plot")
+            plt.xlabel("X")
+            plt.ylabel("Y")
+        
+        # Save plot; a tight bbox costs an extra render pass, so it is opt-in
+        output_path = Path(output_file)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        save_options = {"dpi": dpi}
+        if bbox_inches:
+            save_options["bbox_inches"] = bbox_inches
+        await asyncio.to_thread(fig.savefig, output_path, **save_options)
+        
+        return {
+            "success": True,
+            "chart_type": chart_type,
+            "output_file": str(output_path),
+            "columns": columns,
+            "message": f"Visualization saved to {output_path}"
+        }
+            
     async def _export_data(self, **kwargs) -> Dict[str, Any]:
         """Export processed data"""
         output_format = kwargs.get("format", "csv")
@@ -269,9 +734,27 @@ class DataAnalysisTool(BaseTool):
                 "description": "Dataset identifier",
                 "optional": True
             },
+            "preview": {
+                "type": "boolean",
+                "description": "Include a human-readable text preview of the sample (for load_data)",
+                "default": True,
+                "optional": True
+            },
+            "exact_memory": {
+                "type": "boolean",
+                "description": "Measure string payloads exactly instead of estimating memory usage (for load_data)",
+                "default": False,
+                "optional": True
+            },
+            "shrink": {
+                "type": "boolean",
+                "description": "Downcast numeric dtypes and categorize repetitive strings after loading (for load_data)",
+                "default": True,
+                "optional": True
+            },
             "conditions": {
                 "type": "array",
-                "description": "Filter conditions (for filter)",
+                "description": "Filter conditions as {column, operator, value} objects; operators: ==, !=, >, >=, <, <=, in, contains (for filter)",
                 "optional": True
             },
             "group_by": {
@@ -292,13 +775,29 @@ class DataAnalysisTool(BaseTool):
             },
             "columns": {
                 "type": "array",
-                "description": "Columns to include in analysis",
+                "description": "Columns to include in analysis; for load_data, only these columns are read",
+                "optional": True
+            },
+            "filters": {
+                "type": "array",
+                "description": "Row filters as [column, op, value] triples pushed down into the read (for load_data on Parquet/CSV)",
                 "optional": True
             },
             "output_file": {
                 "type": "string",
                 "description": "Output file path",
                 "optional": True
+            },
+            "dpi": {
+                "type": "integer",
+                "description": "Chart resolution in dots per inch (for visualize)",
+                "default": 100,
+                "optional": True
+            },
+            "bbox_inches": {
+                "type": "string",
+                "description": "Pass 'tight' to crop chart whitespace at the cost of an extra render (for visualize)",
+                "optional": True
             }
         }
 
@@ -311,11 +810,23 @@ class ImageAnalysisTool(BaseTool):
             description="Process and analyze images - resize, filter, extract features, detect objects"
         )
     
-    async def execute(self, action: str, image_path: str, **kwargs) -> Dict[str, Any]:
+    async def execute(self, action: str, image_path: Optional[str] = None, **kwargs) -> Dict[str, Any]:
         """Process image"""
+        if Image is None:
+            return {
+                "success": False,
+                "error": "Pillow not installed. Install with: pip install Pillow (or pillow-simd for SIMD-accelerated resampling)"
+            }
+        
         try:
-            from PIL import Image, ImageFilter, ImageEnhance
-            import numpy as np
+            if action == "batch":
+                return await self._batch_process(**kwargs)
+            
+            if not image_path:
+                return {
+                    "success": False,
+                    "error": "image_path required"
+                }
             
             image_path_obj = Path(image_path)
             if not image_path_obj.exists():
@@ -325,7 +836,7 @@ class ImageAnalysisTool(BaseTool):
                 }
             
             # Load image
-            image = Image.open(image_path)
+            image = await asyncio.to_thread(Image.open, image_path)
             
             if action == "info":
                 return await self._get_image_info(image, image_path_obj)
@@ -340,23 +851,87 @@ class ImageAnalysisTool(BaseTool):
             elif action == "crop":
                 return await self._crop_image(image, image_path_obj, **kwargs)
             elif action == "analyze_colors":
-                return await self._analyze_colors(image, image_path_obj)
+                return await self._analyze_colors(image, image_path_obj, **kwargs)
             else:
                 return {
                     "success": False,
                     "error": f"Unknown action: {action}"
                 }
                 
-        except ImportError:
+        except Exception as e:
             return {
                 "success": False,
-                "error": "Pillow not installed. Install with: pip install Pillow"
+                "error": str(e)
             }
-        except Exception as e:
+    
+    async def _batch_process(self, **kwargs) -> Dict[str, Any]:
+        """Run one action over many images in worker processes"""
+        image_paths = kwargs.pop("image_paths", [])
+        batch_action = kwargs.pop("batch_action", None)
+        output_dir = kwargs.pop("output_dir", None)
+        # A single output_file would be overwritten by every image
+        kwargs.pop("output_file", None)
+        
+        if not image_paths or not batch_action:
             return {
                 "success": False,
-                "error": str(e)
+                "error": "image_paths and batch_action required"
             }
+        if batch_action == "batch":
+            return {
+                "success": False,
+                "error": "batch_action cannot be batch"
+            }
+        
+        output_names = {}
+        if output_dir:
+            output_root = Path(output_dir).resolve()
+            if any(Path(path).resolve().parent == output_root for path in image_paths):
+                return {
+                    "success": False,
+                    "error": "output_dir must differ from the folders of the input images"
+                }
+            
+            await asyncio.to_thread(output_root.mkdir, parents=True, exist_ok=True)
+            
+            # Inputs sharing a file name (a/x.png, b/x.png) get numbered outputs so none overwrite another
+            name_counts = Counter(Path(path).name for path in image_paths)
+            used_names = {name for name, count in name_counts.items() if count == 1}
+            for index, path in enumerate(image_paths):
+                input_path = Path(path)
+                name = input_path.name
+                number = 0
+                while name_counts[input_path.name] > 1 and (number == 0 or name in used_names):
+                    number += 1
+                    name = f"{input_path.stem}_{number}{input_path.suffix}"
+                used_names.add(name)
+                output_names[index] = name
+        
+        loop = asyncio.get_running_loop()
+        pool = _get_process_pool()
+        tasks = []
+        for index, path in enumerate(image_paths):
+            image_kwargs = dict(kwargs)
+            if output_dir:
+                image_kwargs["output_file"] = str(Path(output_dir) / output_names[index])
+            tasks.append(loop.run_in_executor(pool, _process_one_image, path, batch_action, image_kwargs))
+        
+        outcomes = await asyncio.gather(*tasks, return_exceptions=True)
+        
+        results = []
+        for path, outcome in zip(image_paths, outcomes):
+            if isinstance(outcome, Exception):
+                outcome = {"success": False, "error": str(outcome)}
+            results.append({"image_path": path, **outcome})
+        
+        failed = sum(1 for result in results if not result.get("success"))
+        return {
+            "success": failed == 0,
+            "action": batch_action,
+            "processed": len(results) - failed,
+            "failed": failed,
+            "results": results
+        }
     
     async def _get_image_info(self, image: 'Image', image_path: Path) -> Dict[str, Any]:
         """Get image information"""
@@ -379,6 +954,7 @@ class ImageAnalysisTool(BaseTool):
         width = kwargs.get("width")
         height = kwargs.get("height")
         maintain_aspect = kwargs.get("maintain_aspect", True)
+        resample = kwargs.get("resample")
         output_file = kwargs.get("output_file")
         
         if not width and not height:
@@ -390,8 +966,9 @@ class ImageAnalysisTool(BaseTool):
         # Calculate new size
         if maintain_aspect:
             if width and height:
-                image.thumbnail((width, height), Image.Resampling.LANCZOS)
-                new_size = image.size
+                # Fit inside the box without upscaling, like thumbnail()
+                ratio = min(width / image.width, height / image.height, 1.0)
+                new_size = (max(1, round(image.width * ratio)), max(1, round(image.height * ratio)))
             elif width:
                 ratio = width / image.width
                 new_height = int(image.height * ratio)
@@ -403,56 +980,69 @@ class ImageAnalysisTool(BaseTool):
         else:
             new_size = (width or image.width, height or image.height)
         
+        # Bilinear is indistinguishable from Lanczos for mild downscales and
+        # several times cheaper; keep Lanczos for heavier reductions
+        if resample is None:
+            is_mild = new_size[0] * 2 >= image.width and new_size[1] * 2 >= image.height
+            resample = "fast" if is_mild else "quality"
+        if resample not in _RESAMPLE_FILTERS:
+            return {
+                "success": False,
+                "error": f"Unknown resample mode: {resample}"
+            }
+        resample_filter = getattr(Image.Resampling, _RESAMPLE_FILTERS[resample])
+        
         # Resize image
-        resized_image = image.resize(new_size, Image.Resampling.LANCZOS)
+        resized_image = await asyncio.to_thread(_reduce_and_resize, image, new_size, resample_filter)
         
         # Save resized image
         if not output_file:
-            output_file = image_path.with_suffix("_resized" + image_path.suffix)
+            output_file = image_path.with_name(f"{image_path.stem}_resized{image_path.suffix}")
         
         output_path = Path(output_file)
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        resized_image.save(output_path)
+        await asyncio.to_thread(resized_image.save, output_path, **_image_save_options(output_path, kwargs))
         
         return {
             "success": True,
             "original_size": image.size,
             "new_size": new_size,
+            "resample": resample,
             "output_file": str(output_path),
             "message": f"Image resized to {new_size}"
         }
     
     async def _apply_filter(self, image: 'Image', image_path: Path, **kwargs) -> Dict[str, Any]:
         """Apply image filter"""
-        from PIL import ImageFilter
-        
         filter_type = kwargs.get("filter_type", "blur")
         output_file = kwargs.get("output_file")
         
         # Apply filter
         if filter_type == "blur":
-            filtered_image = image.filter(ImageFilter.BLUR)
+            image_filter = ImageFilter.BLUR
         elif filter_type == "sharpen":
-            filtered_image = image.filter(ImageFilter.SHARPEN)
+            image_filter = ImageFilter.SHARPEN
         elif filter_type == "edge_enhance":
-            filtered_image = image.filter(ImageFilter.EDGE_ENHANCE)
+            image_filter = ImageFilter.EDGE_ENHANCE
         elif filter_type == "emboss":
-            filtered_image = image.filter(ImageFilter.EMBOSS)
+            image_filter = ImageFilter.EMBOSS
         elif filter_type == "smooth":
-            filtered_image = image.filter(ImageFilter.SMOOTH)
+            image_filter = ImageFilter.SMOOTH
         else:
             return {
                 "success": False,
                 "error": f"Unknown filter type: {filter_type}"
             }
         
+        filtered_image = await asyncio.to_thread(image.filter, image_filter)
+        
         # Save filtered image
         if not output_file:
-            output_file = image_path.with_suffix(f"_{filter_type}" + image_path.suffix)
+            output_file = image_path.with_name(f"{image_path.stem}_{filter_type}{image_path.suffix}")
         
         output_path = Path(output_file)
         output_path.parent.mkdir(parents=True, exist_ok=True)
-        filtered_image.save(output_path)
+        await asyncio.to_thread(filtered_image.save, output_path, **_image_save_options(output_path, kwargs))
         
         return {
             "success": True,
@@ -463,14 +1053,39 @@ class ImageAnalysisTool(BaseTool):
     
     async def _enhance_image(self, image: 'Image', image_path: Path, **kwargs) -> Dict[str, Any]:
         """Enhance image properties"""
-        from PIL import ImageEnhance
-        
         brightness = kwargs.get("brightness", 1.0)
         contrast = kwargs.get("contrast", 1.0)
         saturation = kwargs.get("saturation", 1.0)
         sharpness = kwargs.get("sharpness", 1.0)
         output_file = kwargs.get("output_file")
         
+        enhanced_image = await asyncio.to_thread(
+            self._enhance_image_sync, image, brightness, contrast, saturation, sharpness
+        )
+        
+        # Save enhanced image
+        if not output_file:
+            output_file = image_path.with_name(f"{image_path.stem}_enhanced{image_path.suffix}")
+        
+        output_path = Path(output_file)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        await asyncio.to_thread(enhanced_image.save, output_path, **_image_save_options(output_path, kwargs))
+        
+        return {
+            "success": True,
+            "enhancements": {
+                "brightness": brightness,
+                "contrast": contrast,
+                "saturation": saturation,
+                "sharpness": sharpness
+            },
+            "output_file": str(output_path),
+            "message": "Image enhanced successfully"
+        }
+    
+    def _enhance_image_sync(self, image: 'Image', brightness: float, contrast: float,
+                            saturation: float, sharpness: float) -> 'Image':
+        """Apply enhancements synchronously"""
         enhanced_image = image
         
         # Apply enhancements
@@ -490,29 +1105,28 @@ class ImageAnalysisTool(BaseTool):
             enhancer = ImageEnhance.Sharpness(enhanced_image)
             enhanced_image = enhancer.enhance(sharpness)
         
-        # Save enhanced image
-        if not output_file:
-            output_file = image_path.with_suffix("_enhanced" + image_path.suffix)
-        
-        output_path = Path(output_file)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        enhanced_image.save(output_path)
-        
-        return {
-            "success": True,
-            "enhancements": {
-                "brightness": brightness,
-                "contrast": contrast,
-                "saturation": saturation,
-                "sharpness": sharpness
-            },
-            "output_file": str(output_path),
-            "message": "Image enhanced successfully"
-        }
+        return enhanced_image
     
-    async def _analyze_colors(self, image: 'Image', image_path: Path) -> Dict[str, Any]:
+    async def _analyze_colors(self, image: 'Image', image_path: Path, **kwargs) -> Dict[str, Any]:
         """Analyze image colors"""
-        import numpy as np
+        if np is None:
+            return {
+                "success": False,
+                "error": "numpy not installed. Install with: pip install numpy"
+            }
+        
+        return await asyncio.to_thread(self._analyze_colors_sync, image, kwargs.get("max_dim", 0))
+    
+    def _analyze_colors_sync(self, image: 'Image', max_dim: int) -> Dict[str, Any]:
+        """Analyze image colors synchronously"""
+        original_size = image.size
+        
+        # Opt-in: approximate statistics are much cheaper at reduced size (JPEG
+        # decodes at a reduced DCT scale), but full resolution keeps the exact
+        # counts and lets large images reach the GPU/numba/tiled histogram paths
+        if max_dim:
+            image.draft('RGB', (max_dim, max_dim))
+            image.thumbnail((max_dim, max_dim), Image.Resampling.BILINEAR)
         
         # Convert to RGB if necessary
         if image.mode != 'RGB':
@@ -521,13 +1135,37 @@ class ImageAnalysisTool(BaseTool):
         # Get image data as numpy array
         img_array = np.array(image)
         
-        # Calculate color statistics
-        mean_color = np.mean(img_array, axis=(0, 1))
+        pixels = img_array.reshape(-1, 3)
         dominant_colors = []
         
-        # Get most common colors (simplified)
-        pixels = img_array.reshape(-1, 3)
-        unique_colors, counts = np.unique(pixels, axis=0, return_counts=True)
+        gpu_stats = _gpu_color_stats(img_array) if img_array.nbytes >= _GPU_MIN_BYTES else None
+        if gpu_stats is not None:
+            mean_color, color_keys, counts, total_unique_colors = gpu_stats
+            unique_colors = _unpack_rgb(color_keys)
+        else:
+            # Calculate color statistics; accumulate in integers so the
+            # reduction never widens every pixel to float64
+            mean_color = pixels.sum(axis=0, dtype=np.uint64) / len(pixels)
+            
+            # Get most common colors (simplified)
+            hist_kernel = _get_hist_kernel() if len(pixels) >= _HIST_KERNEL_MIN_PIXELS else None
+            if hist_kernel is not None:
+                histogram = np.zeros(1 << 24, dtype=np.uint32)
+                hist_kernel(np.ascontiguousarray(pixels), histogram)
+            elif len(pixels) >= _TILED_MIN_PIXELS:
+                histogram = _tiled_color_histogram(img_array)
+            else:
+                histogram = None
+            
+            if histogram is not None:
+                color_keys = np.flatnonzero(histogram)
+                counts = histogram[color_keys]
+                unique_colors = _unpack_rgb(color_keys)
+            else:
+                # Scalar 24-bit keys sort much faster than np.unique(axis=0)'s row compares
+                color_keys, counts = np.unique(_pack_rgb(pixels), return_counts=True)
+                unique_colors = _unpack_rgb(color_keys)
+            total_unique_colors = len(unique_colors)
         
         # Get top 5 colors
         top_indices = np.argsort(counts)[-5:]
@@ -550,10 +1188,11 @@ class ImageAnalysisTool(BaseTool):
                     "hex": f"#{int(mean_color[0]):02x}{int(mean_color[1]):02x}{int(mean_color[2]):02x}"
                 },
                 "dominant_colors": dominant_colors,
-                "total_unique_colors": len(unique_colors)
+                "total_unique_colors": total_unique_colors
             },
             "image_info": {
-                "size": image.size,
+                "size": original_size,
+                "analyzed_size": image.size,
                 "mode": image.mode
             }
         }
@@ -563,12 +1202,28 @@ class ImageAnalysisTool(BaseTool):
             "action": {
                 "type": "string",
                 "description": "Image processing action",
-                "enum": ["info", "resize", "filter", "enhance", "convert", "crop", "analyze_colors"]
+                "enum": ["info", "resize", "filter", "enhance", "convert", "crop", "analyze_colors", "batch"]
             },
             "image_path": {
                 "type": "string",
                 "description": "Path to image file"
             },
+            "image_paths": {
+                "type": "array",
+                "description": "Image files to process in parallel (for batch)",
+                "optional": True
+            },
+            "batch_action": {
+                "type": "string",
+                "description": "Action to run on every image (for batch)",
+                "enum": ["info", "resize", "filter", "enhance", "convert", "crop", "analyze_colors"],
+                "optional": True
+            },
+            "output_dir": {
+                "type": "string",
+                "description": "Directory for per-image outputs (for batch)",
+                "optional": True
+            },
             "width": {
                 "type": "integer",
                 "description": "Target width (for resize)",
@@ -585,6 +1240,12 @@ class ImageAnalysisTool(BaseTool):
                 "default": True,
                 "optional": True
             },
+            "resample": {
+                "type": "string",
+                "description": "Resampling filter; chosen from the scale factor when omitted (for resize)",
+                "enum": ["fast", "quality"],
+                "optional": True
+            },
             "filter_type": {
                 "type": "string",
                 "description": "Filter to apply",
@@ -615,9 +1276,27 @@ class ImageAnalysisTool(BaseTool):
                 "default": 1.0,
                 "optional": True
             },
+            "quality": {
+                "type": "integer",
+                "description": "JPEG/WebP quality 1-100 for saved images",
+                "default": 85,
+                "optional": True
+            },
+            "png_compress": {
+                "type": "integer",
+                "description": "PNG zlib compression level 0-9 for saved images",
+                "default": 1,
+                "optional": True
+            },
             "output_file": {
                 "type": "string",
                 "description": "Output file path",
                 "optional": True
+            },
+            "max_dim": {
+                "type": "integer",
+                "description": "Downsample to this longest side before color analysis for faster, approximate results; 0 for full resolution (for analyze_colors)",
+                "default": 0,
+                "optional": True
             }
         }
@@ -2,8 +2,16 @@
 Audio processing tools for Agent Zero Gemini
 """
 import asyncio
+import base64
+import functools
+import io
+import json
 import logging
-from typing import Dict, List, Optional, Any
+import re
+import shutil
+import threading
+import wave
+from typing import AsyncIterator, Dict, List, Optional, Any
 from pathlib import Path
 import tempfile
 
@@ -11,6 +19,267 @@ from core.tools import BaseTool
 
 logger = logging.getLogger(__name__)
 
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+def _split_sentences(text: str) -> List[str]:
+    """Split text into sentences on . ! and ?"""
+    return [sentence.strip() for sentence in _SENTENCE_END.split(text) if sentence.strip()]
+
+# Local STT models are expensive to load; keep one per model name
+_stt_models: Dict[str, Any] = {}
+_stt_models_lock = threading.Lock()
+
+def _get_vosk_model(model_name: str):
+    """Load a Vosk model once (downloaded on first use if not present)"""
+    key = f"vosk:{model_name}"
+    with _stt_models_lock:
+        if key not in _stt_models:
+            from vosk import Model
+            _stt_models[key] = Model(model_name=model_name)
+        return _stt_models[key]
+
+def _get_whisper_model(model_name: str):
+    """Load a faster-whisper model once, with INT8 CTranslate2 kernels"""
+    key = f"whisper:{model_name}"
+    with _stt_models_lock:
+        if key not in _stt_models:
+            from faster_whisper import WhisperModel
+            _stt_models[key] = WhisperModel(model_name, compute_type="int8")
+        return _stt_models[key]
+
+def _get_whisper_pipeline(model_name: str):
+    """Batched faster-whisper pipeline, or the plain model on older releases"""
+    key = f"whisper-batched:{model_name}"
+    model = _get_whisper_model(model_name)
+    with _stt_models_lock:
+        if key not in _stt_models:
+            try:
+                from faster_whisper import BatchedInferencePipeline
+                _stt_models[key] = BatchedInferencePipeline(model=model)
+            except ImportError:
+                _stt_models[key] = model
+        return _stt_models[key]
+
+def _has_ffmpeg() -> bool:
+    """Whether the ffmpeg and ffprobe binaries are on PATH"""
+    return shutil.which("ffmpeg") is not None and shutil.which("ffprobe") is not None
+
+async def _run_ffmpeg(*args: str) -> bytes:
+    """Run ffmpeg without blocking the event loop"""
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-y", "-v", "error", *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    stdout, stderr = await process.communicate()
+    
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {stderr.decode(errors='replace').strip()}")
+    
+    return stdout
+
+# ffmpeg muxer names that differ from the file extension
+_FFMPEG_MUXERS = {"aac": "adts", "m4a": "ipod"}
+
+# MP4-family muxers seek back to write the moov index, which stdout can't do
+_MP4_MUXERS = {"mp4", "ipod", "mov"}
+
+def _ffmpeg_muxer(path: Path) -> str:
+    """ffmpeg muxer for a file's extension"""
+    extension = path.suffix[1:].lower()
+    return _FFMPEG_MUXERS.get(extension, extension)
+
+def _ffmpeg_format_args(muxer: str, output_path: Optional[Path]) -> List[str]:
+    """-f arguments; MP4-family output to stdout is written as fragmented MP4 in ~1 s fragments"""
+    if output_path is None and muxer in _MP4_MUXERS:
+        return ["-f", muxer, "-movflags", "frag_keyframe+empty_moov", "-min_frag_duration", "1000000"]
+    return ["-f", muxer]
+
+def _ffmpeg_target(output_path: Optional[Path]) -> str:
+    """Output argument for ffmpeg: the file, or stdout for in-memory results"""
+    return "pipe:1" if output_path is None else str(output_path)
+
+def _export_segment(audio, output_path: Optional[Path], output_format: str) -> Optional[bytes]:
+    """Export a pydub segment to disk, or into memory when no path is given"""
+    if output_path is not None:
+        audio.export(str(output_path), format=output_format)
+        return None
+    
+    buffer = io.BytesIO()
+    audio.export(buffer, format=output_format)
+    return buffer.getvalue()
+
+def _output_result(result: Dict[str, Any], output_path: Optional[Path], data: Optional[bytes]) -> Dict[str, Any]:
+    """Attach either the output file or the in-memory audio to a result"""
+    if output_path is None:
+        result["audio_b64"] = base64.b64encode(data).decode('ascii')
+        result["size"] = len(data)
+    else:
+        result["output_file"] = str(output_path)
+    return result
+
+def _resample_segment(audio, sample_rate: int):
+    """Resample a pydub segment with libsoxr, falling back to pydub's own converter"""
+    try:
+        import numpy as np
+        import soxr
+        from pydub import AudioSegment
+    except ImportError:
+        return audio.set_frame_rate(sample_rate)
+    
+    if audio.sample_width not in (2, 4):
+        return audio.set_frame_rate(sample_rate)
+    
+    samples = np.array(audio.get_array_of_samples()).reshape(-1, audio.channels)
+    resampled = soxr.resample(samples, audio.frame_rate, sample_rate, quality='VHQ')
+    
+    return AudioSegment(
+        data=resampled.astype(samples.dtype).tobytes(),
+        sample_width=audio.sample_width,
+        frame_rate=sample_rate,
+        channels=audio.channels
+    )
+
+# Compiled gain kernel; False once numba is known to be missing
+_gain_kernel = None
+
+def _get_gain_kernel():
+    """Compile the numba gain kernel on first use"""
+    global _gain_kernel
+    
+    if _gain_kernel is None:
+        try:
+            from numba import njit, prange
+        except ImportError:
+            _gain_kernel = False
+            return None
+        
+        @njit(parallel=True, fastmath=True, cache=True)
+        def _scale_samples(samples, gain, low, high, out):
+            for i in prange(samples.shape[0]):
+                value = samples[i] * gain
+                if value < low:
+                    value = low
+                elif value > high:
+                    value = high
+                out[i] = value
+        
+        _gain_kernel = _scale_samples
+    
+    return _gain_kernel or None
+
+def _apply_gain(audio, volume_change: float):
+    """Apply a dB gain to a pydub segment with clipping"""
+    if audio.sample_width not in (1, 2, 4):
+        return audio + volume_change
+    
+    try:
+        import numpy as np
+    except ImportError:
+        return audio + volume_change
+    
+    dtype = {1: np.int8, 2: np.int16, 4: np.int32}[audio.sample_width]
+    samples = np.frombuffer(audio.raw_data, dtype=dtype)
+    limits = np.iinfo(dtype)
+    gain = 10 ** (volume_change / 20)
+    
+    kernel = _get_gain_kernel()
+    if kernel is not None:
+        out = np.empty_like(samples)
+        kernel(samples, gain, float(limits.min), float(limits.max), out)
+    else:
+        # Q15 fixed-point multiply: vectorized integer ops, no float round trip
+        gain_q15 = int(round(gain * 32768))
+        scaled = (samples.astype(np.int64) * gain_q15) >> 15
+        out = np.clip(scaled, limits.min, limits.max).astype(dtype)
+    
+    return audio._spawn(out.tobytes())
+
+# Bit depth for the soundfile PCM subtypes
+_SOUNDFILE_BITS = {"PCM_S8": 8, "PCM_U8": 8, "PCM_16": 16, "PCM_24": 24, "PCM_32": 32, "FLOAT": 32, "DOUBLE": 64}
+
+# ffprobe codec names for soundfile subtypes (little-endian PCM; AIFF is flipped to big-endian)
+_SOUNDFILE_CODECS = {
+    "PCM_S8": "pcm_s8", "PCM_U8": "pcm_u8", "PCM_16": "pcm_s16le", "PCM_24": "pcm_s24le", "PCM_32": "pcm_s32le",
+    "FLOAT": "pcm_f32le", "DOUBLE": "pcm_f64le", "FLAC": "flac", "VORBIS": "vorbis", "OPUS": "opus",
+    "MPEG_LAYER_III": "mp3"
+}
+
+# ffprobe codec names for mutagen file types; MP4 may also hold ALAC
+_MUTAGEN_CODECS = {"MP3": "mp3", "AAC": "aac", "MP4": "aac", "OggVorbis": "vorbis", "OggOpus": "opus", "FLAC": "flac"}
+
+def _header_info(duration: float, channels: Optional[int], sample_rate: Optional[int], bits: Optional[int],
+                 codec: Optional[str]) -> Dict[str, Any]:
+    """Shape header fields like the ffprobe get_info result"""
+    # Lossy codecs have no sample width; assume 16-bit as the ffprobe branch does
+    bits = bits or 16
+    return {
+        "duration": duration,  # seconds
+        "channels": channels,
+        "sample_rate": sample_rate,
+        "frame_width": channels * bits // 8 if channels else None,
+        "max_possible_amplitude": float(2 ** (bits - 1)),
+        "codec": codec
+    }
+
+@functools.lru_cache(maxsize=256)
+def _read_audio_header(path: str, mtime_ns: int, size: int) -> Optional[Dict[str, Any]]:
+    """Read stream info from the file header only; None if no reader understands it"""
+    # mtime_ns and size only key the cache, so a rewritten file is read again
+    try:
+        import soundfile
+        info = soundfile.info(path)
+        codec = _SOUNDFILE_CODECS.get(info.subtype)
+        if codec and codec.endswith("le") and info.format == "AIFF":
+            codec = codec[:-2] + "be"
+        return _header_info(
+            info.frames / info.samplerate, info.channels, info.samplerate, _SOUNDFILE_BITS.get(info.subtype), codec
+        )
+    except Exception:
+        pass
+    
+    try:
+        with wave.open(path, 'rb') as wav:
+            bits = wav.getsampwidth() * 8
+            return _header_info(
+                wav.getnframes() / wav.getframerate(), wav.getnchannels(), wav.getframerate(), bits,
+                "pcm_u8" if bits == 8 else f"pcm_s{bits}le"
+            )
+    except Exception:
+        pass
+    
+    try:
+        import mutagen
+        tagged = mutagen.File(path)
+        if tagged is not None and getattr(tagged, "info", None) is not None:
+            info = tagged.info
+            codec = "alac" if getattr(info, "codec", None) == "alac" else _MUTAGEN_CODECS.get(type(tagged).__name__)
+            return _header_info(
+                info.length,
+                getattr(info, "channels", None),
+                getattr(info, "sample_rate", None),
+                getattr(info, "bits_per_sample", None),
+                codec
+            )
+    except Exception:
+        pass
+    
+    return None
+
+async def _probe_audio(path: Path) -> Dict[str, Any]:
+    """Read container and stream headers with ffprobe"""
+    process = await asyncio.create_subprocess_exec(
+        "ffprobe", "-v", "quiet", "-print_format", "json", "-show_format", "-show_streams", str(path),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE
+    )
+    stdout, _ = await process.communicate()
+    
+    if process.returncode != 0:
+        raise RuntimeError(f"ffprobe could not read {path}")
+    
+    return json.loads(stdout)
+
 class TextToSpeechTool(BaseTool):
     """Text-to-speech tool"""
     
@@ -19,7 +288,25 @@ class TextToSpeechTool(BaseTool):
             name="text_to_speech",
             description="Convert text to speech audio"
         )
-        self._setup_tts()
+        # pyttsx3 engines are not thread-safe; one utterance at a time
+        self._tts_lock = asyncio.Lock()
+        
+        # pyttsx3 is imported and its engine started on first use, not at registration
+        self.tts_engine = None
+        self._tts_ready = False
+        self._voices = []
+        self._last_rate = None
+        self._last_volume = None
+        self._last_voice_id = None
+    
+    async def _ensure_tts(self):
+        """Start the TTS engine on first use"""
+        async with self._tts_lock:
+            if not self._tts_ready:
+                await asyncio.to_thread(self._setup_tts)
+                self._tts_ready = True
+        
+        return self.tts_engine
     
     def _setup_tts(self):
         """Setup TTS engine"""
@@ -27,13 +314,11 @@ class TextToSpeechTool(BaseTool):
             import pyttsx3
             self.tts_engine = pyttsx3.init()
             
-            # Configure voice settings
-            voices = self.tts_engine.getProperty('voices')
-            if voices:
-                self.tts_engine.setProperty('voice', voices[0].id)
+            # Enumerate voices once; the list doesn't change at runtime
+            self._voices = self.tts_engine.getProperty('voices') or []
             
-            self.tts_engine.setProperty('rate', 150)  # Speed
-            self.tts_engine.setProperty('volume', 0.9)  # Volume
+            # Configure voice settings
+            self._apply_tts_settings(rate=150, volume=0.9, voice_index=0)
             
         except ImportError:
             logger.warning("pyttsx3 not installed. TTS will not be available.")
@@ -44,7 +329,7 @@ class TextToSpeechTool(BaseTool):
     
     async def execute(self, text: str, output_file: Optional[str] = None, **kwargs) -> Dict[str, Any]:
         """Convert text to speech"""
-        if not self.tts_engine:
+        if not await self._ensure_tts():
             return {
                 "success": False,
                 "error": "TTS engine not available. Install with: pip install pyttsx3"
@@ -56,36 +341,29 @@ class TextToSpeechTool(BaseTool):
             volume = kwargs.get("volume", 0.9)
             voice_index = kwargs.get("voice_index", 0)
             
-            self.tts_engine.setProperty('rate', rate)
-            self.tts_engine.setProperty('volume', volume)
-            
-            # Set voice if specified
-            voices = self.tts_engine.getProperty('voices')
-            if voices and 0 <= voice_index < len(voices):
-                self.tts_engine.setProperty('voice', voices[voice_index].id)
-            
-            if output_file:
-                # Save to file
-                output_path = Path(output_file)
-                output_path.parent.mkdir(parents=True, exist_ok=True)
+            async with self._tts_lock:
+                self._apply_tts_settings(rate, volume, voice_index)
                 
-                self.tts_engine.save_to_file(text, str(output_path))
-                await asyncio.to_thread(self.tts_engine.runAndWait)
-                
-                return {
-                    "success": True,
-                    "output_file": str(output_path),
-                    "message": f"Speech saved to {output_path}"
-                }
-            else:
-                # Play directly
-                await asyncio.to_thread(self.tts_engine.say, text)
-                await asyncio.to_thread(self.tts_engine.runAndWait)
-                
-                return {
-                    "success": True,
-                    "message": "Speech played successfully"
-                }
+                if output_file:
+                    # Save to file
+                    output_path = Path(output_file)
+                    output_path.parent.mkdir(parents=True, exist_ok=True)
+                    
+                    await asyncio.to_thread(self._speak_sync, text, str(output_path))
+                    
+                    return {
+                        "success": True,
+                        "output_file": str(output_path),
+                        "message": f"Speech saved to {output_path}"
+                    }
+                else:
+                    # Play directly
+                    await asyncio.to_thread(self._speak_sync, text)
+                    
+                    return {
+                        "success": True,
+                        "message": "Speech played successfully"
+                    }
                 
         except Exception as e:
             return {
@@ -93,6 +371,69 @@ class TextToSpeechTool(BaseTool):
                 "error": str(e)
             }
     
+    async def execute_stream(self, text: str, output_dir: Optional[str] = None, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """Synthesize sentence by sentence, yielding each audio file as soon as it is ready"""
+        if not await self._ensure_tts():
+            yield {
+                "success": False,
+                "error": "TTS engine not available. Install with: pip install pyttsx3"
+            }
+            return
+        
+        output_path = Path(output_dir) if output_dir else Path(tempfile.mkdtemp(prefix="tts_"))
+        output_path.mkdir(parents=True, exist_ok=True)
+        
+        rate = kwargs.get("rate", 150)
+        volume = kwargs.get("volume", 0.9)
+        voice_index = kwargs.get("voice_index", 0)
+        
+        for index, sentence in enumerate(_split_sentences(text)):
+            chunk_file = output_path / f"chunk_{index:04d}.wav"
+            
+            try:
+                async with self._tts_lock:
+                    self._apply_tts_settings(rate, volume, voice_index)
+                    await asyncio.to_thread(self._speak_sync, sentence, str(chunk_file))
+            except Exception as e:
+                yield {
+                    "success": False,
+                    "index": index,
+                    "error": str(e)
+                }
+                return
+            
+            yield {
+                "success": True,
+                "index": index,
+                "text": sentence,
+                "output_file": str(chunk_file)
+            }
+    
+    def _apply_tts_settings(self, rate: int, volume: float, voice_index: int):
+        """Only touch engine properties that changed (voice changes are costly on SAPI5)"""
+        if rate != self._last_rate:
+            self.tts_engine.setProperty('rate', rate)
+            self._last_rate = rate
+        
+        if volume != self._last_volume:
+            self.tts_engine.setProperty('volume', volume)
+            self._last_volume = volume
+        
+        if 0 <= voice_index < len(self._voices):
+            voice_id = self._voices[voice_index].id
+            if voice_id != self._last_voice_id:
+                self.tts_engine.setProperty('voice', voice_id)
+                self._last_voice_id = voice_id
+    
+    def _speak_sync(self, text: str, output_file: Optional[str] = None):
+        """Queue one utterance and run the engine loop"""
+        if output_file:
+            self.tts_engine.save_to_file(text, output_file)
+        else:
+            self.tts_engine.say(text)
+        
+        self.tts_engine.runAndWait()
+    
     def get_parameters(self) -> Dict[str, Any]:
         return {
             "text": {
@@ -132,18 +473,24 @@ class SpeechToTextTool(BaseTool):
             name="speech_to_text",
             description="Convert speech audio to text"
         )
-        self._setup_stt()
+        # speech_recognition is imported on first use, not at registration
+        self.recognizer = None
+        self._stt_ready = False
+        
+        # The microphone is opened and calibrated on first use, not at construction
+        self.microphone = None
+        self._chunk_size = None
+        self._calibrated = False
     
     def _setup_stt(self):
         """Setup STT recognizer"""
         try:
             import speech_recognition as sr
             self.recognizer = sr.Recognizer()
-            self.microphone = sr.Microphone()
             
-            # Adjust for ambient noise
-            with self.microphone as source:
-                self.recognizer.adjust_for_ambient_noise(source)
+            # A fixed threshold avoids the cold-start silence window of dynamic adjustment
+            self.recognizer.energy_threshold = 300
+            self.recognizer.dynamic_energy_threshold = False
                 
         except ImportError:
             logger.warning("speech_recognition not installed. STT will not be available.")
@@ -154,6 +501,10 @@ class SpeechToTextTool(BaseTool):
     
     async def execute(self, source: str = "microphone", **kwargs) -> Dict[str, Any]:
         """Convert speech to text"""
+        if not self._stt_ready:
+            await asyncio.to_thread(self._setup_stt)
+            self._stt_ready = True
+        
         if not self.recognizer:
             return {
                 "success": False,
@@ -182,9 +533,17 @@ class SpeechToTextTool(BaseTool):
         timeout = kwargs.get("timeout", 5)
         phrase_timeout = kwargs.get("phrase_timeout", 1)
         language = kwargs.get("language", "en-US")
+        chunk_size = kwargs.get("chunk_size", 320)
         
         try:
-            with self.microphone as source:
+            microphone = self._get_microphone(chunk_size)
+            
+            with microphone as source:
+                # Calibrate once, briefly, instead of for a full second at startup
+                if not self._calibrated and kwargs.get("calibrate", True):
+                    await asyncio.to_thread(self.recognizer.adjust_for_ambient_noise, source, duration=0.3)
+                    self._calibrated = True
+                
                 logger.info("Listening for speech...")
                 audio = await asyncio.to_thread(
                     self.recognizer.listen,
@@ -194,11 +553,7 @@ class SpeechToTextTool(BaseTool):
                 )
             
             # Recognize speech
-            text = await asyncio.to_thread(
-                self.recognizer.recognize_google,
-                audio,
-                language=language
-            )
+            text = await self._transcribe(audio, language, **kwargs)
             
             return {
                 "success": True,
@@ -212,6 +567,48 @@ class SpeechToTextTool(BaseTool):
                 "error": f"Speech recognition failed: {str(e)}"
             }
     
+    async def _transcribe(self, audio, language: str, **kwargs) -> str:
+        """Transcribe off the event loop"""
+        return await asyncio.to_thread(self._transcribe_sync, audio, language, **kwargs)
+    
+    def _transcribe_sync(self, audio, language: str, **kwargs) -> str:
+        """Transcribe captured audio with the requested backend"""
+        backend = kwargs.get("backend", "google")
+        
+        if backend == "google":
+            return self.recognizer.recognize_google(audio, language=language)
+        
+        # Local backends take 16 kHz 16-bit mono PCM
+        pcm = audio.get_raw_data(convert_rate=16000, convert_width=2)
+        
+        if backend == "vosk":
+            from vosk import KaldiRecognizer
+            
+            model = _get_vosk_model(kwargs.get("model", "vosk-model-small-en-us-0.15"))
+            recognizer = KaldiRecognizer(model, 16000)
+            recognizer.AcceptWaveform(pcm)
+            return json.loads(recognizer.FinalResult()).get("text", "")
+        
+        if backend == "whisper":
+            import numpy as np
+            
+            # The batched pipeline decodes the recording's 30 s windows together
+            pipeline = _get_whisper_pipeline(kwargs.get("model", "base"))
+            samples = np.frombuffer(pcm, dtype=np.int16).astype(np.float32) / 32768.0
+            segments, _ = pipeline.transcribe(samples, language=language.split("-")[0])
+            return " ".join(segment.text.strip() for segment in segments)
+        
+        raise ValueError(f"Unknown STT backend: {backend}")
+    
+    def _get_microphone(self, chunk_size: int):
+        """Open the microphone at 16 kHz; 320-sample chunks are 20 ms each"""
+        if self.microphone is None or chunk_size != self._chunk_size:
+            import speech_recognition as sr
+            self.microphone = sr.Microphone(sample_rate=16000, chunk_size=chunk_size)
+            self._chunk_size = chunk_size
+        
+        return self.microphone
+    
     async def _recognize_from_file(self, audio_file: str, **kwargs) -> Dict[str, Any]:
         """Recognize speech from audio file"""
         if not audio_file:
@@ -236,11 +633,7 @@ class SpeechToTextTool(BaseTool):
                 audio = await asyncio.to_thread(self.recognizer.record, source)
             
             # Recognize speech
-            text = await asyncio.to_thread(
-                self.recognizer.recognize_google,
-                audio,
-                language=language
-            )
+            text = await self._transcribe(audio, language, **kwargs)
             
             return {
                 "success": True,
@@ -285,6 +678,30 @@ class SpeechToTextTool(BaseTool):
                 "description": "Language code for recognition",
                 "default": "en-US",
                 "optional": True
+            },
+            "backend": {
+                "type": "string",
+                "description": "Recognition backend: google (cloud), vosk or whisper (local)",
+                "enum": ["google", "vosk", "whisper"],
+                "default": "google",
+                "optional": True
+            },
+            "model": {
+                "type": "string",
+                "description": "Model name for the vosk or whisper backend",
+                "optional": True
+            },
+            "chunk_size": {
+                "type": "integer",
+                "description": "Microphone buffer size in samples at 16 kHz",
+                "default": 320,
+                "optional": True
+            },
+            "calibrate": {
+                "type": "boolean",
+                "description": "Calibrate for ambient noise on first microphone use",
+                "default": True,
+                "optional": True
             }
         }
 
@@ -300,8 +717,6 @@ class AudioProcessingTool(BaseTool):
     async def execute(self, action: str, input_file: str, **kwargs) -> Dict[str, Any]:
         """Process audio file"""
         try:
-            from pydub import AudioSegment
-            
             input_path = Path(input_file)
             if not input_path.exists():
                 return {
@@ -309,17 +724,19 @@ class AudioProcessingTool(BaseTool):
                     "error": f"Input file not found: {input_file}"
                 }
             
-            # Load audio
-            audio = AudioSegment.from_file(str(input_path))
+            # ffmpeg works on the file directly; pydub decodes it all into memory first
+            use_ffmpeg = _has_ffmpeg()
+            if not use_ffmpeg and action != "get_info":
+                import pydub  # noqa: F401
             
             if action == "convert":
-                return await self._convert_audio(audio, input_path, **kwargs)
+                return await self._convert_audio(input_path, use_ffmpeg, **kwargs)
             elif action == "trim":
-                return await self._trim_audio(audio, input_path, **kwargs)
+                return await self._trim_audio(input_path, use_ffmpeg, **kwargs)
             elif action == "adjust_volume":
-                return await self._adjust_volume(audio, input_path, **kwargs)
+                return await self._adjust_volume(input_path, use_ffmpeg, **kwargs)
             elif action == "get_info":
-                return await self._get_audio_info(audio, input_path)
+                return await self._get_audio_info(input_path, use_ffmpeg)
             else:
                 return {
                     "success": False,
@@ -329,7 +746,7 @@ class AudioProcessingTool(BaseTool):
         except ImportError:
             return {
                 "success": False,
-                "error": "pydub not installed. Install with: pip install pydub"
+                "error": "ffmpeg not found and pydub not installed. Install ffmpeg, or: pip install pydub"
             }
         except Exception as e:
             return {
@@ -337,74 +754,155 @@ class AudioProcessingTool(BaseTool):
                 "error": str(e)
             }
     
-    async def _convert_audio(self, audio, input_path: Path, **kwargs) -> Dict[str, Any]:
+    async def _load_audio(self, input_path: Path):
+        """Decode a file with pydub (fallback when ffmpeg is missing)"""
+        from pydub import AudioSegment
+        return await asyncio.to_thread(AudioSegment.from_file, str(input_path))
+    
+    async def _convert_audio(self, input_path: Path, use_ffmpeg: bool, **kwargs) -> Dict[str, Any]:
         """Convert audio format"""
         output_format = kwargs.get("format", "mp3")
         output_file = kwargs.get("output_file")
+        output_buffer = kwargs.get("output_buffer", False)
         
         if not output_file:
-            output_file = input_path.with_suffix(f".{output_format}")
+            # A suffix swap alone would overwrite the input when the format is unchanged
+            output_file = input_path.with_name(f"{input_path.stem}_converted.{output_format}")
         
-        output_path = Path(output_file)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path = None if output_buffer else Path(output_file)
+        if output_path is not None:
+            if output_path.resolve() == input_path.resolve():
+                return {
+                    "success": False,
+                    "error": f"Output file would overwrite the input: {output_path}"
+                }
+            output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        await asyncio.to_thread(audio.export, str(output_path), format=output_format)
+        sample_rate = kwargs.get("sample_rate")
         
-        return {
+        if use_ffmpeg:
+            extra_args = ["-ar", str(sample_rate)] if sample_rate else []
+            # One pass: joining separately encoded mp3/aac slices leaves encoder-delay gaps at the seams
+            muxer = _FFMPEG_MUXERS.get(output_format, output_format)
+            data = await _run_ffmpeg(
+                "-i", str(input_path), *extra_args, *_ffmpeg_format_args(muxer, output_path), _ffmpeg_target(output_path)
+            )
+        else:
+            audio = await self._load_audio(input_path)
+            if sample_rate:
+                audio = await asyncio.to_thread(_resample_segment, audio, sample_rate)
+            data = await asyncio.to_thread(_export_segment, audio, output_path, output_format)
+        
+        return _output_result({
             "success": True,
-            "output_file": str(output_path),
             "format": output_format
-        }
+        }, output_path, data)
     
-    async def _trim_audio(self, audio, input_path: Path, **kwargs) -> Dict[str, Any]:
+    async def _trim_audio(self, input_path: Path, use_ffmpeg: bool, **kwargs) -> Dict[str, Any]:
         """Trim audio"""
-        start_time = kwargs.get("start_time", 0) * 1000  # Convert to milliseconds
+        start_time = kwargs.get("start_time", 0)
         end_time = kwargs.get("end_time")
+        output_buffer = kwargs.get("output_buffer", False)
         
-        if end_time:
-            end_time = end_time * 1000
-            trimmed_audio = audio[start_time:end_time]
-        else:
-            trimmed_audio = audio[start_time:]
-        
-        output_file = kwargs.get("output_file", input_path.with_suffix("_trimmed" + input_path.suffix))
-        output_path = Path(output_file)
+        output_file = kwargs.get("output_file", input_path.with_name(f"{input_path.stem}_trimmed{input_path.suffix}"))
+        output_path = None if output_buffer else Path(output_file)
         
-        await asyncio.to_thread(trimmed_audio.export, str(output_path), format=input_path.suffix[1:])
+        if use_ffmpeg:
+            duration_args = ["-t", str(end_time - start_time)] if end_time else []
+            
+            if output_path is None or output_path.suffix.lower() == input_path.suffix.lower():
+                # Same container: seek on the index and copy packets, never decoding
+                format_args = _ffmpeg_format_args(_ffmpeg_muxer(input_path), None) if output_path is None else []
+                data = await _run_ffmpeg(
+                    "-noaccurate_seek", "-ss", str(start_time), "-i", str(input_path), *duration_args,
+                    "-c", "copy", "-avoid_negative_ts", "make_zero", *format_args, _ffmpeg_target(output_path)
+                )
+            else:
+                # A different container needs a real transcode with sample-accurate seeking
+                data = await _run_ffmpeg("-ss", str(start_time), "-i", str(input_path), *duration_args, str(output_path))
+            
+            info = await _probe_audio(output_path if output_path is not None else input_path)
+            duration = float(info.get("format", {}).get("duration", 0))
+            if output_path is None:
+                # Probed the source; work out the length of the cut from it
+                duration = max(0.0, min(end_time or duration, duration) - start_time)
+        else:
+            audio = await self._load_audio(input_path)
+            if end_time:
+                trimmed_audio = audio[start_time * 1000:end_time * 1000]  # milliseconds
+            else:
+                trimmed_audio = audio[start_time * 1000:]
+            
+            data = await asyncio.to_thread(_export_segment, trimmed_audio, output_path, input_path.suffix[1:])
+            duration = len(trimmed_audio) / 1000
         
-        return {
+        return _output_result({
             "success": True,
-            "output_file": str(output_path),
-            "duration": len(trimmed_audio) / 1000
-        }
+            "duration": duration
+        }, output_path, data)
     
-    async def _adjust_volume(self, audio, input_path: Path, **kwargs) -> Dict[str, Any]:
+    async def _adjust_volume(self, input_path: Path, use_ffmpeg: bool, **kwargs) -> Dict[str, Any]:
         """Adjust audio volume"""
         volume_change = kwargs.get("volume_change", 0)  # dB change
+        output_buffer = kwargs.get("output_buffer", False)
         
-        adjusted_audio = audio + volume_change
+        output_file = kwargs.get("output_file", input_path.with_name(f"{input_path.stem}_adjusted{input_path.suffix}"))
+        output_path = None if output_buffer else Path(output_file)
         
-        output_file = kwargs.get("output_file", input_path.with_suffix("_adjusted" + input_path.suffix))
-        output_path = Path(output_file)
-        
-        await asyncio.to_thread(adjusted_audio.export, str(output_path), format=input_path.suffix[1:])
+        if use_ffmpeg:
+            format_args = _ffmpeg_format_args(_ffmpeg_muxer(input_path), None) if output_path is None else []
+            data = await _run_ffmpeg(
+                "-i", str(input_path), "-filter:a", f"volume={volume_change}dB", *format_args, _ffmpeg_target(output_path)
+            )
+        else:
+            audio = await self._load_audio(input_path)
+            adjusted_audio = await asyncio.to_thread(_apply_gain, audio, volume_change)
+            data = await asyncio.to_thread(_export_segment, adjusted_audio, output_path, input_path.suffix[1:])
         
-        return {
+        return _output_result({
             "success": True,
-            "output_file": str(output_path),
             "volume_change": volume_change
-        }
+        }, output_path, data)
     
-    async def _get_audio_info(self, audio, input_path: Path) -> Dict[str, Any]:
+    async def _get_audio_info(self, input_path: Path, use_ffmpeg: bool) -> Dict[str, Any]:
         """Get audio file information"""
+        # Header readers first: nothing is decoded and repeat lookups are cached
+        stat = input_path.stat()
+        header = await asyncio.to_thread(_read_audio_header, str(input_path), stat.st_mtime_ns, stat.st_size)
+        if header is not None:
+            return {
+                "success": True,
+                "file": str(input_path),
+                **header
+            }
+        
+        if not use_ffmpeg:
+            audio = await self._load_audio(input_path)
+            return {
+                "success": True,
+                "file": str(input_path),
+                "duration": len(audio) / 1000,  # seconds
+                "channels": audio.channels,
+                "sample_rate": audio.frame_rate,
+                "frame_width": audio.frame_width,
+                "max_possible_amplitude": audio.max_possible_amplitude
+            }
+        
+        # Headers only; the samples are never read
+        info = await _probe_audio(input_path)
+        stream = next((s for s in info.get("streams", []) if s.get("codec_type") == "audio"), {})
+        channels = int(stream.get("channels", 0))
+        bits = int(stream.get("bits_per_sample") or stream.get("bits_per_raw_sample") or 16)
+        
         return {
             "success": True,
             "file": str(input_path),
-            "duration": len(audio) / 1000,  # seconds
-            "channels": audio.channels,
-            "sample_rate": audio.frame_rate,
-            "frame_width": audio.frame_width,
-            "max_possible_amplitude": audio.max_possible_amplitude
+            "duration": float(info.get("format", {}).get("duration", 0)),  # seconds
+            "channels": channels,
+            "sample_rate": int(stream.get("sample_rate", 0)),
+            "frame_width": channels * bits // 8,
+            "max_possible_amplitude": float(2 ** (bits - 1)),
+            "codec": stream.get("codec_name")
         }
     
     def get_parameters(self) -> Dict[str, Any]:
@@ -428,6 +926,11 @@ class AudioProcessingTool(BaseTool):
                 "description": "Output format for conversion",
                 "optional": True
             },
+            "sample_rate": {
+                "type": "integer",
+                "description": "Resample to this rate (Hz) when converting",
+                "optional": True
+            },
             "start_time": {
                 "type": "number",
                 "description": "Start time for trimming (seconds)",
@@ -442,5 +945,11 @@ class AudioProcessingTool(BaseTool):
                 "type": "number",
                 "description": "Volume change in dB",
                 "optional": True
+            },
+            "output_buffer": {
+                "type": "boolean",
+                "description": "Return the processed audio base64-encoded instead of writing a file",
+                "default": False,
+                "optional": True
             }
         }
@@ -2,7 +2,12 @@
 Browser automation tools for Agent Zero Gemini
 """
 import asyncio
+import codecs
+import functools
+import importlib.util
 import logging
+import os
+import re
 from typing import Dict, List, Optional, Any
 from pathlib import Path
 import base64
@@ -11,49 +16,215 @@ from core.tools import BaseTool
 
 logger = logging.getLogger(__name__)
 
+# One headless Chromium shared by every BrowserTool; each tool gets its own context
+_playwright = None
+_browser = None
+_browser_loop = None
+_browser_lock = None
+
+async def _get_browser(async_playwright, launch_args: List[str]):
+    """Get the shared browser, launching it on first use"""
+    global _playwright, _browser, _browser_loop, _browser_lock
+    
+    loop = asyncio.get_running_loop()
+    if _browser_loop is not loop:
+        # Playwright objects are bound to the loop that created them
+        _playwright = None
+        _browser = None
+        _browser_lock = asyncio.Lock()
+        _browser_loop = loop
+    
+    async with _browser_lock:
+        if _browser is None or not _browser.is_connected():
+            if _playwright is None:
+                _playwright = await async_playwright().start()
+            _browser = await _playwright.chromium.launch(headless=True, args=launch_args)
+    
+    return _browser
+
+async def close_browser():
+    """Close the shared browser"""
+    global _playwright, _browser
+    
+    if _browser is not None:
+        await _browser.close()
+    if _playwright is not None:
+        await _playwright.stop()
+    _browser = None
+    _playwright = None
+
+# Keep-alive HTTP client for scraping, created on first use per event loop
+_http_client = None
+_http_client_loop = None
+
+def _get_http_client():
+    """Get the pooled HTTP client for the running event loop"""
+    global _http_client, _http_client_loop
+    import httpx
+    
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=64, max_keepalive_connections=32, keepalive_expiry=30),
+            timeout=30,
+            follow_redirects=True
+        )
+        _http_client_loop = loop
+    
+    return _http_client
+
+async def close_http_client():
+    """Close the pooled scraping client"""
+    global _http_client
+    
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+
+# Selectors that are a bare tag name can be pre-filtered with a SoupStrainer
+_TAG_SELECTOR = re.compile(r'^[a-zA-Z][a-zA-Z0-9-]*$')
+
+def _html_parser() -> str:
+    """Prefer lxml's C parser; fall back to the stdlib one"""
+    try:
+        import lxml  # noqa: F401
+        return 'lxml'
+    except ImportError:
+        return 'html.parser'
+
+@functools.lru_cache(maxsize=1024)
+def _css_to_xpath(selector: str) -> str:
+    """Translate a CSS selector into an XPath expression, once per selector"""
+    from cssselect import HTMLTranslator
+    return HTMLTranslator().css_to_xpath(selector)
+
+@functools.lru_cache(maxsize=1024)
+def _css_xpath(selector: str):
+    """Compiled XPath for a CSS selector, reused across scrapes"""
+    from lxml import etree
+    return etree.XPath(_css_to_xpath(selector))
+
+@functools.lru_cache(maxsize=1024)
+def _css_soupsieve(selector: str):
+    """Compiled soupsieve selector for the BeautifulSoup fallback"""
+    import soupsieve
+    return soupsieve.compile(selector)
+
+# Size of the body chunks fed to the incremental HTML parser
+_SCRAPE_CHUNK_SIZE = 32 * 1024
+
+# charset declared in a <meta> tag near the start of a page
+_META_CHARSET_RE = re.compile(rb'<meta[^>]+charset\s*=\s*["\']?\s*([A-Za-z0-9_.:-]+)', re.IGNORECASE)
+
+def _lxml_available() -> bool:
+    """Whether the lxml/cssselect scraping path can be used"""
+    return importlib.util.find_spec("lxml") is not None and importlib.util.find_spec("cssselect") is not None
+
+def _sniff_encoding(head: bytes) -> str:
+    """Encoding from a BOM or <meta charset> in the first bytes of a page, else UTF-8"""
+    if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    
+    match = _META_CHARSET_RE.search(head, 0, 4096)
+    if match:
+        name = match.group(1).decode("ascii")
+        try:
+            return codecs.lookup(name).name
+        except LookupError:
+            pass
+    return "utf-8"
+
+def _feed_parser(encoding: str):
+    """Incremental lxml HTML parser; the encoding is fixed up front since lxml can't see HTTP headers"""
+    import lxml.html
+    return lxml.html.HTMLParser(encoding=encoding)
+
+def _extract_with_lxml(root, selectors: Dict[str, str]) -> tuple:
+    """Run cached XPath selectors over an lxml tree"""
+    extracted_data = {}
+    for key, selector in selectors.items():
+        texts = [elem.text_content().strip() for elem in _css_xpath(selector)(root)]
+        extracted_data[key] = (texts[0] if len(texts) == 1 else texts) if texts else None
+    
+    title = root.findtext('.//title')
+    return extracted_data, title
+
+def _extract_with_soup(content: bytes, selectors: Dict[str, str]) -> tuple:
+    """BeautifulSoup fallback for when lxml/cssselect are unavailable"""
+    from bs4 import BeautifulSoup, SoupStrainer
+    
+    # Compiled selectors are cached across calls
+    compiled_selectors = {key: _css_soupsieve(selector) for key, selector in selectors.items()}
+    
+    # When only plain tags are wanted, build just those subtrees (plus <title>)
+    strainer = None
+    if selectors and all(_TAG_SELECTOR.match(selector) for selector in selectors.values()):
+        strainer = SoupStrainer(sorted(set(selectors.values()) | {"title"}))
+    
+    soup = BeautifulSoup(content, _html_parser(), parse_only=strainer)
+    
+    extracted_data = {}
+    for key, compiled_selector in compiled_selectors.items():
+        elements = compiled_selector.select(soup)
+        if elements:
+            if len(elements) == 1:
+                extracted_data[key] = elements[0].get_text(strip=True)
+            else:
+                extracted_data[key] = [elem.get_text(strip=True) for elem in elements]
+        else:
+            extracted_data[key] = None
+    
+    return extracted_data, soup.title.string if soup.title else None
+
+def _write_bytes(path: Path, data: bytes):
+    """Write a buffer straight to a file descriptor, bypassing Python file buffering"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+    finally:
+        os.close(fd)
+
 class BrowserTool(BaseTool):
-    """Browser automation tool using Selenium"""
+    """Browser automation tool using Playwright"""
     
     def __init__(self):
         super().__init__(
             name="browser_automation",
             description="Automate web browser interactions, navigate pages, fill forms, click elements"
         )
-        self.driver = None
+        self.context = None
+        self.page = None
         self._setup_browser()
     
     def _setup_browser(self):
         """Setup browser driver"""
-        try:
-            from selenium import webdriver
-            from selenium.webdriver.chrome.options import Options
-            from selenium.webdriver.common.by import By
-            from selenium.webdriver.support.ui import WebDriverWait
-            from selenium.webdriver.support import expected_conditions as EC
-            
-            self.webdriver = webdriver
-            self.By = By
-            self.WebDriverWait = WebDriverWait
-            self.EC = EC
-            
-            # Chrome options
-            self.chrome_options = Options()
-            self.chrome_options.add_argument("--headless")
-            self.chrome_options.add_argument("--no-sandbox")
-            self.chrome_options.add_argument("--disable-dev-shm-usage")
-            self.chrome_options.add_argument("--disable-gpu")
-            self.chrome_options.add_argument("--window-size=1920,1080")
-            
-        except ImportError:
-            logger.warning("Selenium not installed. Browser automation will not be available.")
-            self.webdriver = None
+        # Only check that Playwright is installed; importing it waits for first use
+        self._async_playwright = None
+        self._playwright_available = importlib.util.find_spec("playwright") is not None
+        if not self._playwright_available:
+            logger.warning("Playwright not installed. Browser automation will not be available.")
+        
+        # Chromium launch options
+        self.launch_args = ["--no-sandbox", "--disable-dev-shm-usage", "--disable-gpu"]
+        self.viewport = {"width": 1920, "height": 1080}
+    
+    @property
+    def async_playwright(self):
+        """Import Playwright on first use"""
+        if self._async_playwright is None:
+            from playwright.async_api import async_playwright
+            self._async_playwright = async_playwright
+        return self._async_playwright
     
     async def execute(self, action: str, **kwargs) -> Dict[str, Any]:
         """Execute browser action"""
-        if not self.webdriver:
+        if not self._playwright_available:
             return {
                 "success": False,
-                "error": "Selenium not available. Install with: pip install selenium"
+                "error": "Playwright not available. Install with: pip install playwright && playwright install chromium"
             }
         
         try:
@@ -66,7 +237,7 @@ class BrowserTool(BaseTool):
             elif action == "get_text":
                 return await self._get_text(kwargs.get("selector"))
             elif action == "screenshot":
-                return await self._screenshot(kwargs.get("filename"))
+                return await self._screenshot(kwargs.get("filename"), kwargs.get("quality", 70))
             elif action == "wait_for_element":
                 return await self._wait_for_element(kwargs.get("selector"), kwargs.get("timeout", 10))
             elif action == "execute_script":
@@ -88,28 +259,30 @@ class BrowserTool(BaseTool):
             }
     
     async def _ensure_driver(self):
-        """Ensure browser driver is initialized"""
-        if not self.driver:
-            self.driver = self.webdriver.Chrome(options=self.chrome_options)
+        """Ensure browser page is initialized"""
+        if not self.page:
+            # A context is cheap and isolates cookies/storage; the browser process is shared
+            browser = await _get_browser(self.async_playwright, self.launch_args)
+            self.context = await browser.new_context(viewport=self.viewport)
+            self.page = await self.context.new_page()
     
     async def _navigate(self, url: str) -> Dict[str, Any]:
         """Navigate to URL"""
         await self._ensure_driver()
         
-        await asyncio.to_thread(self.driver.get, url)
+        await self.page.goto(url)
         
         return {
             "success": True,
-            "url": self.driver.current_url,
-            "title": self.driver.title
+            "url": self.page.url,
+            "title": await self.page.title()
         }
     
     async def _click(self, selector: str) -> Dict[str, Any]:
         """Click element by selector"""
         await self._ensure_driver()
         
-        element = self.driver.find_element(self.By.CSS_SELECTOR, selector)
-        await asyncio.to_thread(element.click)
+        await self.page.click(selector)
         
         return {
             "success": True,
@@ -120,9 +293,8 @@ class BrowserTool(BaseTool):
         """Type text into element"""
         await self._ensure_driver()
         
-        element = self.driver.find_element(self.By.CSS_SELECTOR, selector)
-        await asyncio.to_thread(element.clear)
-        await asyncio.to_thread(element.send_keys, text)
+        # fill() clears the field and sets the value in a single call
+        await self.page.fill(selector, text)
         
         return {
             "success": True,
@@ -133,25 +305,30 @@ class BrowserTool(BaseTool):
         """Get text from element"""
         await self._ensure_driver()
         
-        element = self.driver.find_element(self.By.CSS_SELECTOR, selector)
-        text = element.text
+        text = await self.page.inner_text(selector)
         
         return {
             "success": True,
             "text": text
         }
     
-    async def _screenshot(self, filename: Optional[str] = None) -> Dict[str, Any]:
+    async def _screenshot(self, filename: Optional[str] = None, quality: int = 70) -> Dict[str, Any]:
         """Take screenshot"""
         await self._ensure_driver()
         
         if not filename:
-            filename = f"screenshot_{asyncio.get_event_loop().time()}.png"
+            filename = f"screenshot_{asyncio.get_event_loop().time()}.jpg"
         
         screenshot_path = Path("tmp") / filename
         screenshot_path.parent.mkdir(exist_ok=True)
         
-        await asyncio.to_thread(self.driver.save_screenshot, str(screenshot_path))
+        # The browser encodes JPEG itself and it is far smaller than PNG; keep PNG if asked for
+        if screenshot_path.suffix.lower() == ".png":
+            image_bytes = await self.page.screenshot(type="png")
+        else:
+            image_bytes = await self.page.screenshot(type="jpeg", quality=quality)
+        
+        await asyncio.to_thread(_write_bytes, screenshot_path, image_bytes)
         
         return {
             "success": True,
@@ -163,11 +340,7 @@ class BrowserTool(BaseTool):
         """Wait for element to be present"""
         await self._ensure_driver()
         
-        wait = self.WebDriverWait(self.driver, timeout)
-        element = await asyncio.to_thread(
-            wait.until,
-            self.EC.presence_of_element_located((self.By.CSS_SELECTOR, selector))
-        )
+        await self.page.wait_for_selector(selector, state="attached", timeout=timeout * 1000)
         
         return {
             "success": True,
@@ -178,7 +351,8 @@ class BrowserTool(BaseTool):
         """Execute JavaScript"""
         await self._ensure_driver()
         
-        result = await asyncio.to_thread(self.driver.execute_script, script)
+        # Run as a function body so `return ...` scripts behave as before
+        result = await self.page.evaluate(f"() => {{\n{script}\n}}")
         
         return {
             "success": True,
@@ -189,7 +363,7 @@ class BrowserTool(BaseTool):
         """Get page source"""
         await self._ensure_driver()
         
-        source = self.driver.page_source
+        source = await self.page.content()
         
         return {
             "success": True,
@@ -198,9 +372,11 @@ class BrowserTool(BaseTool):
     
     async def _close_browser(self) -> Dict[str, Any]:
         """Close browser"""
-        if self.driver:
-            await asyncio.to_thread(self.driver.quit)
-            self.driver = None
+        if self.context:
+            # Leave the shared browser running for the next session
+            await self.context.close()
+            self.context = None
+            self.page = None
         
         return {
             "success": True,
@@ -228,7 +404,13 @@ class BrowserTool(BaseTool):
             },
             "filename": {
                 "type": "string",
-                "description": "Screenshot filename (for screenshot action)"
+                "description": "Screenshot filename (for screenshot action); .png saves PNG, otherwise JPEG"
+            },
+            "quality": {
+                "type": "integer",
+                "description": "JPEG quality (for screenshot action)",
+                "default": 70,
+                "optional": True
             },
             "timeout": {
                 "type": "integer",
@@ -242,7 +424,7 @@ class BrowserTool(BaseTool):
         }
 
 class WebScrapingTool(BaseTool):
-    """Web scraping tool with BeautifulSoup"""
+    """Web scraping tool with lxml (BeautifulSoup fallback)"""
     
     def __init__(self):
         super().__init__(
@@ -253,43 +435,47 @@ class WebScrapingTool(BaseTool):
     async def execute(self, url: str, selectors: Dict[str, str], **kwargs) -> Dict[str, Any]:
         """Scrape web page"""
         try:
-            import requests
-            from bs4 import BeautifulSoup
-            
             # Get page content
             headers = kwargs.get("headers", {
                 "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
             })
             
-            response = await asyncio.to_thread(requests.get, url, headers=headers)
-            response.raise_for_status()
-            
-            # Parse HTML
-            soup = BeautifulSoup(response.content, 'html.parser')
+            # Pooled connections skip the TCP/TLS handshake on repeat hosts;
+            # the body is parsed chunk by chunk as it arrives (already decompressed)
+            use_lxml = _lxml_available()
+            parser = None
+            async with _get_http_client().stream("GET", url, headers=headers) as response:
+                response.raise_for_status()
+                
+                if not use_lxml:
+                    content = await response.aread()
+                else:
+                    async for chunk in response.aiter_bytes(_SCRAPE_CHUNK_SIZE):
+                        if parser is None:
+                            # The HTTP charset wins; otherwise a BOM or <meta> in the first chunk
+                            parser = _feed_parser(response.charset_encoding or _sniff_encoding(chunk))
+                        parser.feed(chunk)
             
             # Extract data using selectors
-            extracted_data = {}
-            for key, selector in selectors.items():
-                elements = soup.select(selector)
-                if elements:
-                    if len(elements) == 1:
-                        extracted_data[key] = elements[0].get_text(strip=True)
-                    else:
-                        extracted_data[key] = [elem.get_text(strip=True) for elem in elements]
-                else:
-                    extracted_data[key] = None
+            if not use_lxml:
+                extracted_data, page_title = await asyncio.to_thread(_extract_with_soup, content, selectors)
+            elif parser is None:
+                # Empty body: nothing to parse, and lxml refuses to close an empty document
+                extracted_data, page_title = {key: None for key in selectors}, None
+            else:
+                extracted_data, page_title = await asyncio.to_thread(_extract_with_lxml, parser.close(), selectors)
             
             return {
                 "success": True,
                 "url": url,
                 "data": extracted_data,
-                "page_title": soup.title.string if soup.title else None
+                "page_title": page_title
             }
             
         except ImportError:
             return {
                 "success": False,
-                "error": "Required packages not installed. Install with: pip install requests beautifulsoup4"
+                "error": "Required packages not installed. Install with: pip install httpx beautifulsoup4 lxml"
             }
         except Exception as e:
             return {
@@ -2,40 +2,427 @@
 Document processing tools for Agent Zero Gemini
 """
 import asyncio
+import atexit
+import csv
+import hashlib
+import html
+import io
+import json
 import logging
-from typing import Dict, List, Optional, Any
+import mmap
+import os
+import threading
+import zlib
+from typing import ClassVar, Dict, List, Optional, Any, Tuple
 from pathlib import Path
 import tempfile
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+import aiofiles
 
 from core.tools import BaseTool
 
 logger = logging.getLogger(__name__)
 
+_HASH_CHUNK_BYTES = 1 << 20
+
+def _content_hash(file_path: Path, secure: bool = False) -> str:
+    """Cache fingerprint of a file's contents: size plus CRC32C, or SHA-256 when secure"""
+    with open(file_path, 'rb') as file:
+        chunks = iter(lambda: file.read(_HASH_CHUNK_BYTES), b'')
+        
+        if secure:
+            digest = hashlib.sha256()
+            for chunk in chunks:
+                digest.update(chunk)
+            return digest.hexdigest()
+        
+        # Cache keys only need to tell contents apart, not resist tampering; CRC32C runs on
+        # the CPU's CRC instruction, leaving disk bandwidth as the limit
+        try:
+            import google_crc32c
+        except ImportError:
+            google_crc32c = None
+        
+        size = 0
+        if google_crc32c is not None:
+            checksum = google_crc32c.Checksum()
+            for chunk in chunks:
+                checksum.update(chunk)
+                size += len(chunk)
+            return f"crc32c-{size}-{checksum.hexdigest().decode()}"
+        
+        crc = 0
+        for chunk in chunks:
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+        return f"crc32-{size}-{crc:08x}"
+
+def _read_cache(cache_file: Path) -> Optional[Dict[str, Any]]:
+    """Load a cached result; None on a miss or an unreadable entry"""
+    try:
+        return json.loads(cache_file.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+def _write_cache(cache_file: Path, result: Dict[str, Any]):
+    """Store a result atomically so concurrent readers never see half a file"""
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    temp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    temp_file.write_text(json.dumps(result, default=str), encoding='utf-8')
+    os.replace(temp_file, cache_file)
+
+# Span size for page-by-page streaming
+_PDF_CHUNK_PAGES = 10
+
+# Extraction strategy by document size, first matching row wins:
+# (name, max_pages, max_mb, strategy, workers, chunk_pages); workers=None means cpu_count.
+# There is no threaded tier: MuPDF documents aren't thread-safe and PyMuPDF keeps the GIL
+# while extracting, so threads would only serialize on the document lock
+_PDF_STRATEGIES = (
+    ("tiny", 10, 5, "sequential", 1, None),
+    ("small", 50, 20, "sequential", 1, None),
+    ("medium", 200, 50, "sequential", 1, None),
+    ("large", 500, 100, "processes", None, 25),
+    ("xlarge", 2000, 500, "processes", None, 50),
+    ("huge", None, None, "processes", None, 100),
+)
+
+def _choose_pdf_strategy(page_count: int, size_mb: float) -> Tuple[str, int, Optional[int]]:
+    """Pick (strategy, workers, chunk_pages) for a PDF from _PDF_STRATEGIES"""
+    for _name, max_pages, max_mb, strategy, workers, chunk_pages in _PDF_STRATEGIES:
+        if (max_pages is None or page_count <= max_pages) and (max_mb is None or size_mb <= max_mb):
+            return strategy, workers or os.cpu_count() or 1, chunk_pages
+    return "processes", os.cpu_count() or 1, 100
+
+# Parsed PyMuPDF documents, most recently used last, keyed by (path, mtime_ns, size).
+# Documents are not thread-safe, so all use happens under _pdf_documents_lock
+_PDF_CACHE_SIZE = 64
+_pdf_documents: "OrderedDict[tuple, Any]" = OrderedDict()
+_pdf_documents_lock = threading.RLock()
+
+def _open_pdf(file_path: str):
+    """PyMuPDF document for a path, reused until the file changes; hold _pdf_documents_lock"""
+    import pymupdf
+    
+    stat_result = os.stat(file_path)
+    key = (os.path.abspath(file_path), stat_result.st_mtime_ns, stat_result.st_size)
+    
+    doc = _pdf_documents.get(key)
+    if doc is not None:
+        _pdf_documents.move_to_end(key)
+        return doc
+    
+    doc = pymupdf.open(file_path)
+    _pdf_documents[key] = doc
+    if len(_pdf_documents) > _PDF_CACHE_SIZE:
+        _, oldest = _pdf_documents.popitem(last=False)
+        oldest.close()
+    return doc
+
+def _reset_pdf_documents():
+    """Give forked pool workers an empty cache instead of handles sharing the parent's file offsets"""
+    global _pdf_documents_lock
+    
+    _pdf_documents.clear()
+    _pdf_documents_lock = threading.RLock()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_pdf_documents)
+
+def _pdf_page_count(file_path: str) -> int:
+    """Number of pages, preferring PyMuPDF"""
+    try:
+        import pymupdf  # noqa: F401
+    except ImportError:
+        import PyPDF2
+        
+        with open(file_path, 'rb') as file:
+            return len(PyPDF2.PdfReader(file).pages)
+    
+    with _pdf_documents_lock:
+        return _open_pdf(file_path).page_count
+
+def _extract_pages_chunk(file_path: str, start: int = 0, end: Optional[int] = None) -> List[str]:
+    """Text of pages [start, end), with PyMuPDF (C) or PyPDF2 (pure Python fallback)"""
+    try:
+        import pymupdf  # noqa: F401
+    except ImportError:
+        import PyPDF2
+        
+        with open(file_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            stop = len(pdf_reader.pages) if end is None else min(end, len(pdf_reader.pages))
+            return [pdf_reader.pages[index].extract_text() for index in range(start, stop)]
+    
+    with _pdf_documents_lock:
+        doc = _open_pdf(file_path)
+        stop = doc.page_count if end is None else min(end, doc.page_count)
+        return [doc[index].get_text("text") for index in range(start, stop)]
+
+# Text files above this size are decoded straight from a memory map
+_MMAP_MIN_BYTES = 1 << 20
+
+def _universal_newlines(text: str) -> str:
+    """Match the newline translation of text-mode reads"""
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+def _decode_bytes(data, encoding: str) -> tuple:
+    """Decode with the requested encoding, else the detected one; returns (text, encoding_used)"""
+    try:
+        return str(data, encoding), encoding
+    except UnicodeDecodeError:
+        pass
+    
+    try:
+        import charset_normalizer
+    except ImportError:
+        charset_normalizer = None
+    
+    if charset_normalizer is not None:
+        match = charset_normalizer.from_bytes(bytes(data)).best()
+        if match is not None:
+            # Among equally plausible Western code pages, prefer the common one
+            if match.encoding != 'cp1252' and 'cp1252' in match.could_be_from_charset:
+                return str(data, 'cp1252'), 'cp1252'
+            return str(match), match.encoding
+    
+    return str(data, 'utf-8', errors='replace'), 'utf-8'
+
+def _read_text_file(file_path: Path, encoding: str) -> tuple:
+    """Read a text file in one pass and decode it; returns (text, encoding_used)"""
+    with open(file_path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size <= _MMAP_MIN_BYTES:
+            text, encoding_used = _decode_bytes(file.read(), encoding)
+        else:
+            # Decode straight from the mapping, without first copying it into a bytes object
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                text, encoding_used = _decode_bytes(view, encoding)
+    
+    return _universal_newlines(text), encoding_used
+
+def _count_lines(text: str) -> int:
+    """Number of lines as text.split('\\n') counts them, without building the list"""
+    # str.count is a single C scan; no per-line objects are allocated
+    return text.count('\n') + 1
+
+# Workbooks with fewer rows than this are stringified cell by cell;
+# larger ones go through pandas' vectorized string ops
+_EXCEL_PANDAS_MIN_ROWS = 100
+
+def _read_excel_rows(file_path: Path) -> Dict[str, List[str]]:
+    """Tab-joined, non-blank rows for every sheet of a workbook"""
+    import openpyxl
+    
+    # Streaming reader: rows are parsed as they are iterated, not held as a cell model
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    
+    try:
+        total_rows = sum(workbook[sheet_name].max_row or 0 for sheet_name in workbook.sheetnames)
+        if total_rows >= _EXCEL_PANDAS_MIN_ROWS:
+            try:
+                import pandas as pd
+            except ImportError:
+                pd = None
+            
+            if pd is not None:
+                # Frames are built from the same openpyxl values the small tier writes and
+                # stringified with str(), so a cell reads the same in both (1e+20, not
+                # read_excel(dtype=str)'s 100000000000000000000)
+                return {
+                    sheet_name: _frame_rows(
+                        pd.DataFrame(workbook[sheet_name].iter_rows(values_only=True), dtype=object).fillna('').astype(str)
+                    )
+                    for sheet_name in workbook.sheetnames
+                }
+        
+        return {sheet_name: _sheet_rows(workbook[sheet_name]) for sheet_name in workbook.sheetnames}
+    finally:
+        workbook.close()
+
+# Record separator for csv output; never produced by str() of a cell value in practice
+_ROW_SEPARATOR = '\x1e'
+
+def _sheet_rows(sheet) -> List[str]:
+    """Tab-joined, non-blank rows of an openpyxl sheet"""
+    # csv.writer formats whole rows in C; with quoting off its output equals "\t".join(...)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter='\t', lineterminator=_ROW_SEPARATOR, quoting=csv.QUOTE_NONE, quotechar=None)
+    try:
+        writer.writerows(sheet.iter_rows(values_only=True))
+        return [row_text for row_text in buffer.getvalue().split(_ROW_SEPARATOR) if row_text.strip()]
+    except csv.Error:
+        # A cell contains a tab (or newline); only quoting could encode it, so join by hand
+        rows_data = []
+        for row in sheet.iter_rows(values_only=True):
+            row_text = "\t".join(str(cell) if cell is not None else "" for cell in row)
+            if row_text.strip():
+                rows_data.append(row_text)
+        return rows_data
+
+def _frame_rows(df) -> List[str]:
+    """Join a string DataFrame's columns with tabs, dropping blank rows"""
+    if df.empty:
+        return []
+    
+    # str.cat concatenates whole columns at once; to_csv would quote cells containing tabs or quotes
+    df = df.fillna('')
+    rows = df.iloc[:, 0].str.cat([df.iloc[:, index] for index in range(1, df.shape[1])], sep='\t')
+    return rows[rows.str.strip() != ''].tolist()
+
+def _read_word_paragraphs(file_path: Path) -> List[str]:
+    """Non-blank paragraph texts of a Word document"""
+    from docx import Document
+    
+    return [para.text for para in Document(file_path).paragraphs if para.text.strip()]
+
+# Slice size for streaming plain text
+_TEXT_CHUNK_CHARS = 64 * 1024
+
+# Directories holding at least this many of the checked files are listed once with scandir
+_SCANDIR_MIN_FILES = 8
+
+def _first_missing(file_paths: List[str]) -> Optional[str]:
+    """First path (in input order) that is not an existing file, or None"""
+    by_directory: Dict[str, List[str]] = {}
+    for file_path in file_paths:
+        by_directory.setdefault(os.path.dirname(os.path.abspath(file_path)), []).append(file_path)
+    
+    present = set()
+    for directory, paths in by_directory.items():
+        if len(paths) < _SCANDIR_MIN_FILES:
+            present.update(path for path in paths if os.path.isfile(path))
+            continue
+        
+        try:
+            with os.scandir(directory) as entries:
+                names = {entry.name for entry in entries if entry.is_file()}
+        except OSError:
+            names = set()
+        present.update(path for path in paths if os.path.basename(path) in names)
+    
+    for file_path in file_paths:
+        if file_path not in present:
+            return file_path
+    return None
+
+def _merge_pdf_files(input_files: List[str], output_file: str):
+    """Concatenate PDFs; PyMuPDF copies page objects in C, PyPDF2 reparses in Python"""
+    try:
+        import pymupdf
+    except ImportError:
+        import PyPDF2
+        
+        merger = PyPDF2.PdfMerger()
+        try:
+            for file_path in input_files:
+                merger.append(file_path)
+            with open(output_file, 'wb') as output:
+                merger.write(output)
+        finally:
+            merger.close()
+        return
+    
+    merged = pymupdf.open()
+    try:
+        for file_path in input_files:
+            with pymupdf.open(file_path) as source:
+                merged.insert_pdf(source)
+        merged.save(output_file, garbage=4, deflate=True)
+    finally:
+        merged.close()
+
+def _read_pdf_metadata(file_path: Path) -> Dict[str, Any]:
+    """Page count and document info, preferring PyMuPDF"""
+    try:
+        import pymupdf  # noqa: F401
+    except ImportError:
+        import PyPDF2
+        
+        with open(file_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            return {
+                "page_count": len(pdf_reader.pages),
+                "pdf_metadata": dict(pdf_reader.metadata) if pdf_reader.metadata else {}
+            }
+    
+    with _pdf_documents_lock:
+        doc = _open_pdf(str(file_path))
+        return {
+            "page_count": doc.page_count,
+            "pdf_metadata": {key: value for key, value in (doc.metadata or {}).items() if value}
+        }
+
 class DocumentProcessorTool(BaseTool):
     """General document processing tool"""
     
-    def __init__(self):
+    # File suffix -> handler method name
+    _EXTRACTORS: ClassVar[Dict[str, str]] = {
+        '.pdf': '_extract_pdf_text',
+        '.docx': '_extract_word_text',
+        '.doc': '_extract_word_text',
+        '.xlsx': '_extract_excel_text',
+        '.xls': '_extract_excel_text',
+        '.txt': '_extract_plain_text',
+    }
+    _METADATA_READERS: ClassVar[Dict[str, str]] = {
+        '.pdf': '_get_pdf_metadata',
+        '.docx': '_get_word_metadata',
+        '.doc': '_get_word_metadata',
+    }
+    
+    # One worker pool per process, shared by every instance and call
+    _executor: ClassVar[Optional[ProcessPoolExecutor]] = None
+    _executor_lock: ClassVar[threading.Lock] = threading.Lock()
+    
+    @classmethod
+    def _get_executor(cls) -> ProcessPoolExecutor:
+        """Worker pool for parallel extraction, created on first use and shut down at exit"""
+        with cls._executor_lock:
+            if cls._executor is None:
+                # Slightly oversubscribed so workers stay busy while others do I/O
+                cls._executor = ProcessPoolExecutor(max_workers=max(1, int((os.cpu_count() or 1) * 1.5)))
+                atexit.register(cls._executor.shutdown)
+            return cls._executor
+    
+    def __init__(self, cache_dir: Optional[Path] = None, secure_hash: bool = False):
         super().__init__(
             name="document_processor",
             description="Process various document formats - extract text, metadata, convert formats"
         )
+        # Parsed results keyed by file content, so renamed or moved copies still hit
+        self.cache_dir = Path(cache_dir) if cache_dir else Path("~/.cache/agent_zero/docs").expanduser()
+        # SHA-256 instead of CRC32C keys, for deployments where cache entries could be forged
+        self.secure_hash = secure_hash
     
-    async def execute(self, action: str, file_path: str, **kwargs) -> Dict[str, Any]:
+    async def execute(self, action: str, file_path: str = "", **kwargs) -> Dict[str, Any]:
         """Process document"""
         try:
+            if action == "convert_batch":
+                return await self._convert_batch(**kwargs)
+            
             file_path_obj = Path(file_path)
+            
+            # Reject formats no handler reads before touching the disk
+            if action in ("extract_text", "convert") and file_path_obj.suffix.lower() not in self._EXTRACTORS:
+                return {
+                    "success": False,
+                    "error": f"Unsupported file format: {file_path_obj.suffix.lower()}"
+                }
+            
             if not file_path_obj.exists():
                 return {
                     "success": False,
                     "error": f"File not found: {file_path}"
                 }
             
-            file_extension = file_path_obj.suffix.lower()
-            
             if action == "extract_text":
-                return await self._extract_text(file_path_obj, **kwargs)
+                return await self._cached(action, self._extract_text, file_path_obj, **kwargs)
             elif action == "get_metadata":
-                return await self._get_metadata(file_path_obj, **kwargs)
+                return await self._cached(action, self._get_metadata, file_path_obj, **kwargs)
             elif action == "convert":
                 return await self._convert_document(file_path_obj, **kwargs)
             else:
@@ -50,24 +437,112 @@ class DocumentProcessorTool(BaseTool):
                 "error": str(e)
             }
     
+    async def _convert_batch(self, **kwargs) -> Dict[str, Any]:
+        """Convert several documents concurrently, at most one per CPU at a time"""
+        input_files = kwargs.pop("input_files", None) or []
+        output_dir = kwargs.pop("output_dir", None)
+        kwargs.pop("output_file", None)
+        
+        if not input_files:
+            return {
+                "success": False,
+                "error": "No input files provided"
+            }
+        
+        target_format = kwargs.get("target_format", "txt")
+        if output_dir:
+            await asyncio.to_thread(Path(output_dir).mkdir, parents=True, exist_ok=True)
+        
+        # Inputs that would share an output name (a/x.txt, b/x.txt, x.pdf) get numbered outputs so none overwrite another
+        output_names = {}
+        if output_dir:
+            name_counts = Counter(Path(input_file).stem for input_file in input_files)
+            used_names = {f"{stem}.{target_format}" for stem, count in name_counts.items() if count == 1}
+            for index, input_file in enumerate(input_files):
+                stem = Path(input_file).stem
+                name = f"{stem}.{target_format}"
+                number = 0
+                while name_counts[stem] > 1 and (number == 0 or name in used_names):
+                    number += 1
+                    name = f"{stem}_{number}.{target_format}"
+                used_names.add(name)
+                output_names[index] = name
+        
+        limit = asyncio.Semaphore(os.cpu_count() or 1)
+        
+        async def convert_one(index, input_file):
+            output_file = str(Path(output_dir) / output_names[index]) if output_dir else None
+            async with limit:
+                return await self.execute("convert", input_file, output_file=output_file, **kwargs)
+        
+        outcomes = await asyncio.gather(
+            *(convert_one(index, input_file) for index, input_file in enumerate(input_files)),
+            return_exceptions=True
+        )
+        
+        # One entry per input, in order, so a file listed twice is reported twice
+        results = []
+        for input_file, outcome in zip(input_files, outcomes):
+            if isinstance(outcome, BaseException):
+                outcome = {"success": False, "error": str(outcome)}
+            results.append({"input_file": str(input_file), **outcome})
+        
+        failed = sum(1 for result in results if not result.get("success"))
+        
+        return {
+            "success": failed == 0,
+            "results": results,
+            "converted": len(results) - failed,
+            "failed": failed
+        }
+    
+    async def _cached(self, action: str, handler, file_path: Path, **kwargs) -> Dict[str, Any]:
+        """Serve a parse result from the content-hash cache, computing it on a miss"""
+        if not kwargs.pop("use_cache", True):
+            return await handler(file_path, **kwargs)
+        
+        content_hash = await asyncio.to_thread(_content_hash, file_path, self.secure_hash)
+        options = hashlib.sha256(json.dumps(kwargs, sort_keys=True, default=str).encode()).hexdigest()[:12]
+        cache_file = self.cache_dir / f"{action}-{content_hash}-{options}.json"
+        
+        result = await asyncio.to_thread(_read_cache, cache_file)
+        if result is None:
+            result = await handler(file_path, **kwargs)
+            if result.get("success"):
+                try:
+                    await asyncio.to_thread(_write_cache, cache_file, result)
+                except OSError as e:
+                    logger.debug(f"Could not write document cache: {e}")
+            return result
+        
+        # The cached entry may have been made from a copy elsewhere; report this file
+        if "file" in result:
+            result["file"] = str(file_path)
+        if "metadata" in result:
+            stat = file_path.stat()
+            result["metadata"].update({
+                "file_name": file_path.name,
+                "file_size": stat.st_size,
+                "created": stat.st_ctime,
+                "modified": stat.st_mtime
+            })
+        result["cached"] = True
+        
+        return result
+    
     async def _extract_text(self, file_path: Path, **kwargs) -> Dict[str, Any]:
         """Extract text from document"""
         file_extension = file_path.suffix.lower()
         
         try:
-            if file_extension == '.pdf':
-                return await self._extract_pdf_text(file_path, **kwargs)
-            elif file_extension in ['.docx', '.doc']:
-                return await self._extract_word_text(file_path, **kwargs)
-            elif file_extension in ['.xlsx', '.xls']:
-                return await self._extract_excel_text(file_path, **kwargs)
-            elif file_extension == '.txt':
-                return await self._extract_plain_text(file_path, **kwargs)
-            else:
+            handler = getattr(self, self._EXTRACTORS.get(file_extension, ''), None)
+            if handler is None:
                 return {
                     "success": False,
                     "error": f"Unsupported file format: {file_extension}"
                 }
+            
+            return await handler(file_path, **kwargs)
                 
         except Exception as e:
             return {
@@ -78,59 +553,101 @@ class DocumentProcessorTool(BaseTool):
     async def _extract_pdf_text(self, file_path: Path, **kwargs) -> Dict[str, Any]:
         """Extract text from PDF"""
         try:
-            import PyPDF2
-            
-            text = ""
-            page_texts = []
+            page_count = await asyncio.to_thread(_pdf_page_count, str(file_path))
+            size_mb = file_path.stat().st_size / (1024 * 1024)
+            strategy, workers, chunk_pages = _choose_pdf_strategy(page_count, size_mb)
             
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
+            if strategy == "sequential":
+                pages = await asyncio.to_thread(_extract_pages_chunk, str(file_path))
+            else:
+                # Pages are independent; extract spans in parallel and keep page order
+                spans = [(start, start + chunk_pages) for start in range(0, page_count, chunk_pages)]
                 
-                for page_num, page in enumerate(pdf_reader.pages):
-                    page_text = page.extract_text()
-                    page_texts.append({
-                        "page": page_num + 1,
-                        "text": page_text
-                    })
-                    text += page_text + "\n"
+                loop = asyncio.get_running_loop()
+                pool = self._get_executor()
+                chunks = await asyncio.gather(*(
+                    loop.run_in_executor(pool, _extract_pages_chunk, str(file_path), start, end)
+                    for start, end in spans
+                ))
+                pages = [page_text for chunk in chunks for page_text in chunk]
             
-            return {
+            # One join at the end instead of reallocating the text on every page
+            result = {
                 "success": True,
-                "text": text.strip(),
-                "pages": page_texts,
-                "page_count": len(pdf_reader.pages),
+                "text": "".join(page_text + "\n" for page_text in pages).strip(),
+                "page_count": len(pages),
                 "file": str(file_path)
             }
             
+            # The per-page copy doubles the result size, so only build it on request
+            if kwargs.get("include_pages", False):
+                result["pages"] = [
+                    {"page": page_num + 1, "text": page_text}
+                    for page_num, page_text in enumerate(pages)
+                ]
+            
+            return result
+            
         except ImportError:
             return {
                 "success": False,
-                "error": "PyPDF2 not installed. Install with: pip install PyPDF2"
+                "error": "No PDF library installed. Install with: pip install pymupdf (or PyPDF2)"
             }
     
+    async def _stream_pdf_text(self, file_path: Path):
+        """Yield {"page", "text"} one page at a time, holding one span in memory"""
+        page_count = await asyncio.to_thread(_pdf_page_count, str(file_path))
+        
+        for start in range(0, page_count, _PDF_CHUNK_PAGES):
+            chunk = await asyncio.to_thread(_extract_pages_chunk, str(file_path), start, start + _PDF_CHUNK_PAGES)
+            for offset, page_text in enumerate(chunk):
+                yield {
+                    "page": start + offset + 1,
+                    "text": page_text
+                }
+    
+    async def _iter_text(self, file_path: Path, **kwargs):
+        """Yield a document's text in pieces: per page, paragraph, sheet row or 64 KiB slice"""
+        file_extension = file_path.suffix.lower()
+        
+        if file_extension == '.pdf':
+            async for page in self._stream_pdf_text(file_path):
+                yield page["text"] + "\n"
+        elif file_extension in ['.docx', '.doc']:
+            for para in await asyncio.to_thread(_read_word_paragraphs, file_path):
+                yield para + "\n"
+        elif file_extension in ['.xlsx', '.xls']:
+            sheet_rows = await asyncio.to_thread(_read_excel_rows, file_path)
+            for sheet_name, rows_data in sheet_rows.items():
+                yield f"Sheet: {sheet_name}\n"
+                for row_text in rows_data:
+                    yield row_text + "\n"
+                yield "\n\n"
+        elif file_extension == '.txt':
+            # Decoding needs the whole file for charset detection; only the output is sliced
+            text, _ = await asyncio.to_thread(_read_text_file, file_path, kwargs.get("encoding", "utf-8"))
+            for start in range(0, len(text), _TEXT_CHUNK_CHARS):
+                yield text[start:start + _TEXT_CHUNK_CHARS]
+        else:
+            raise ValueError(f"Unsupported file format: {file_extension}")
+    
     async def _extract_word_text(self, file_path: Path, **kwargs) -> Dict[str, Any]:
         """Extract text from Word document"""
         try:
-            from docx import Document
+            paragraphs = await asyncio.to_thread(_read_word_paragraphs, file_path)
             
-            doc = Document(file_path)
-            
-            paragraphs = []
-            full_text = ""
-            
-            for para in doc.paragraphs:
-                if para.text.strip():
-                    paragraphs.append(para.text)
-                    full_text += para.text + "\n"
-            
-            return {
+            result = {
                 "success": True,
-                "text": full_text.strip(),
-                "paragraphs": paragraphs,
+                "text": "".join(para + "\n" for para in paragraphs).strip(),
                 "paragraph_count": len(paragraphs),
                 "file": str(file_path)
             }
             
+            if kwargs.get("include_pages", False):
+                result["paragraphs"] = paragraphs
+            
+            return result
+            
         except ImportError:
             return {
                 "success": False,
@@ -140,38 +657,36 @@ class DocumentProcessorTool(BaseTool):
     async def _extract_excel_text(self, file_path: Path, **kwargs) -> Dict[str, Any]:
         """Extract text from Excel file"""
         try:
-            import openpyxl
+            import openpyxl  # noqa: F401
             
-            workbook = openpyxl.load_workbook(file_path)
+            sheet_rows = await asyncio.to_thread(_read_excel_rows, file_path)
             
+            include_pages = kwargs.get("include_pages", False)
             sheets_data = {}
             all_text = ""
             
-            for sheet_name in workbook.sheetnames:
-                sheet = workbook[sheet_name]
-                sheet_text = ""
-                rows_data = []
-                
-                for row in sheet.iter_rows(values_only=True):
-                    row_text = "\t".join(str(cell) if cell is not None else "" for cell in row)
-                    if row_text.strip():
-                        rows_data.append(row_text)
-                        sheet_text += row_text + "\n"
+            for sheet_name, rows_data in sheet_rows.items():
+                sheet_text = "".join(row_text + "\n" for row_text in rows_data)
                 
-                sheets_data[sheet_name] = {
-                    "text": sheet_text.strip(),
-                    "rows": rows_data
-                }
+                if include_pages:
+                    sheets_data[sheet_name] = {
+                        "text": sheet_text.strip(),
+                        "rows": rows_data
+                    }
                 all_text += f"Sheet: {sheet_name}\n{sheet_text}\n\n"
             
-            return {
+            result = {
                 "success": True,
                 "text": all_text.strip(),
-                "sheets": sheets_data,
-                "sheet_count": len(workbook.sheetnames),
+                "sheet_count": len(sheet_rows),
                 "file": str(file_path)
             }
             
+            if include_pages:
+                result["sheets"] = sheets_data
+            
+            return result
+            
         except ImportError:
             return {
                 "success": False,
@@ -182,63 +697,51 @@ class DocumentProcessorTool(BaseTool):
         """Extract text from plain text file"""
         encoding = kwargs.get("encoding", "utf-8")
         
-        try:
-            with open(file_path, 'r', encoding=encoding) as file:
-                text = file.read()
-            
-            lines = text.split('\n')
-            
+        text, encoding_used = await asyncio.to_thread(_read_text_file, file_path, encoding)
+        
+        if encoding_used != encoding:
             return {
                 "success": True,
                 "text": text,
-                "lines": lines,
-                "line_count": len(lines),
+                "line_count": _count_lines(text),
+                "encoding_used": encoding_used,
                 "file": str(file_path)
             }
-            
-        except UnicodeDecodeError:
-            # Try different encodings
-            for enc in ['latin-1', 'cp1252', 'iso-8859-1']:
-                try:
-                    with open(file_path, 'r', encoding=enc) as file:
-                        text = file.read()
-                    
-                    return {
-                        "success": True,
-                        "text": text,
-                        "encoding_used": enc,
-                        "file": str(file_path)
-                    }
-                except UnicodeDecodeError:
-                    continue
-            
-            return {
-                "success": False,
-                "error": "Could not decode file with any common encoding"
-            }
+        
+        result = {
+            "success": True,
+            "text": text,
+            "line_count": _count_lines(text),
+            "file": str(file_path)
+        }
+        
+        if kwargs.get("include_pages", False):
+            result["lines"] = text.split('\n')
+        
+        return result
     
     async def _get_metadata(self, file_path: Path, **kwargs) -> Dict[str, Any]:
         """Get document metadata"""
         file_extension = file_path.suffix.lower()
         
         try:
+            stat_result = file_path.stat()
             basic_metadata = {
                 "file_name": file_path.name,
-                "file_size": file_path.stat().st_size,
+                "file_size": stat_result.st_size,
                 "file_extension": file_extension,
-                "created": file_path.stat().st_ctime,
-                "modified": file_path.stat().st_mtime
+                "created": stat_result.st_ctime,
+                "modified": stat_result.st_mtime
             }
             
-            if file_extension == '.pdf':
-                return await self._get_pdf_metadata(file_path, basic_metadata)
-            elif file_extension in ['.docx', '.doc']:
-                return await self._get_word_metadata(file_path, basic_metadata)
-            else:
+            handler = getattr(self, self._METADATA_READERS.get(file_extension, ''), None)
+            if handler is None:
                 return {
                     "success": True,
                     "metadata": basic_metadata
                 }
+            
+            return await handler(file_path, basic_metadata)
                 
         except Exception as e:
             return {
@@ -249,16 +752,8 @@ class DocumentProcessorTool(BaseTool):
     async def _get_pdf_metadata(self, file_path: Path, basic_metadata: Dict) -> Dict[str, Any]:
         """Get PDF metadata"""
         try:
-            import PyPDF2
-            
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                
-                metadata = basic_metadata.copy()
-                metadata.update({
-                    "page_count": len(pdf_reader.pages),
-                    "pdf_metadata": dict(pdf_reader.metadata) if pdf_reader.metadata else {}
-                })
+            metadata = basic_metadata.copy()
+            metadata.update(await asyncio.to_thread(_read_pdf_metadata, file_path))
             
             return {
                 "success": True,
@@ -269,7 +764,7 @@ class DocumentProcessorTool(BaseTool):
             return {
                 "success": True,
                 "metadata": basic_metadata,
-                "warning": "PyPDF2 not available for detailed PDF metadata"
+                "warning": "PyMuPDF/PyPDF2 not available for detailed PDF metadata"
             }
     
     async def _get_word_metadata(self, file_path: Path, basic_metadata: Dict) -> Dict[str, Any]:
@@ -314,28 +809,35 @@ class DocumentProcessorTool(BaseTool):
         output_path = Path(output_file)
         
         try:
-            # Extract text first
-            text_result = await self._extract_text(file_path)
-            
-            if not text_result["success"]:
-                return text_result
-            
-            text = text_result["text"]
-            
-            # Save in target format
-            if target_format == "txt":
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write(text)
-            elif target_format == "html":
-                html_content = f"<html><body><pre>{text}</pre></body></html>"
-                with open(output_path, 'w', encoding='utf-8') as f:
-                    f.write(html_content)
-            else:
+            if target_format not in ("txt", "html"):
                 return {
                     "success": False,
                     "error": f"Unsupported target format: {target_format}"
                 }
             
+            if file_path.suffix.lower() not in self._EXTRACTORS:
+                return {
+                    "success": False,
+                    "error": f"Unsupported file format: {file_path.suffix.lower()}"
+                }
+            
+            # Opening the output for writing would truncate the input before it is read
+            if output_path.resolve() == file_path.resolve():
+                return {
+                    "success": False,
+                    "error": f"Output file would overwrite the input: {output_path}"
+                }
+            
+            # Write piece by piece so the whole document is never held as one string;
+            # a 1 MiB buffer turns the many small writes into few syscalls
+            async with aiofiles.open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                if target_format == "html":
+                    await f.write("<html><body><pre>")
+                async for chunk in self._iter_text(file_path, **kwargs):
+                    await f.write(html.escape(chunk) if target_format == "html" else chunk)
+                if target_format == "html":
+                    await f.write("</pre></body></html>")
+            
             return {
                 "success": True,
                 "output_file": str(output_path),
@@ -343,6 +845,11 @@ class DocumentProcessorTool(BaseTool):
                 "original_file": str(file_path)
             }
             
+        except ImportError as e:
+            return {
+                "success": False,
+                "error": f"Missing dependency for {file_path.suffix.lower()} files: {e.name or e}"
+            }
         except Exception as e:
             return {
                 "success": False,
@@ -354,11 +861,21 @@ class DocumentProcessorTool(BaseTool):
             "action": {
                 "type": "string",
                 "description": "Document processing action",
-                "enum": ["extract_text", "get_metadata", "convert"]
+                "enum": ["extract_text", "get_metadata", "convert", "convert_batch"]
             },
             "file_path": {
                 "type": "string",
-                "description": "Path to document file"
+                "description": "Path to document file (not used by convert_batch)"
+            },
+            "input_files": {
+                "type": "array",
+                "description": "Document files to convert (for convert_batch action)",
+                "optional": True
+            },
+            "output_dir": {
+                "type": "string",
+                "description": "Directory for convert_batch outputs; defaults to each input's own folder",
+                "optional": True
             },
             "target_format": {
                 "type": "string",
@@ -376,12 +893,32 @@ class DocumentProcessorTool(BaseTool):
                 "description": "Text encoding for plain text files",
                 "default": "utf-8",
                 "optional": True
+            },
+            "include_pages": {
+                "type": "boolean",
+                "description": "Also return per-page, paragraph, sheet or line breakdowns with extracted text",
+                "default": False,
+                "optional": True
+            },
+            "use_cache": {
+                "type": "boolean",
+                "description": "Reuse cached extract_text/get_metadata results for identical file contents",
+                "default": True,
+                "optional": True
             }
         }
 
 class PDFTool(BaseTool):
     """Specialized PDF processing tool"""
     
+    # Action -> handler method name
+    _ACTIONS: ClassVar[Dict[str, str]] = {
+        "merge": "_merge_pdfs",
+        "split": "_split_pdf",
+        "extract_pages": "_extract_pages",
+        "rotate_pages": "_rotate_pages",
+    }
+    
     def __init__(self):
         super().__init__(
             name="pdf_processor",
@@ -391,26 +928,19 @@ class PDFTool(BaseTool):
     async def execute(self, action: str, **kwargs) -> Dict[str, Any]:
         """Process PDF"""
         try:
-            import PyPDF2
-            
-            if action == "merge":
-                return await self._merge_pdfs(**kwargs)
-            elif action == "split":
-                return await self._split_pdf(**kwargs)
-            elif action == "extract_pages":
-                return await self._extract_pages(**kwargs)
-            elif action == "rotate_pages":
-                return await self._rotate_pages(**kwargs)
-            else:
+            handler = getattr(self, self._ACTIONS.get(action, ''), None)
+            if handler is None:
                 return {
                     "success": False,
                     "error": f"Unknown action: {action}"
                 }
+            
+            return await handler(**kwargs)
                 
         except ImportError:
             return {
                 "success": False,
-                "error": "PyPDF2 not installed. Install with: pip install PyPDF2"
+                "error": "No PDF library installed. Install with: pip install pymupdf (or PyPDF2)"
             }
         except Exception as e:
             return {
@@ -420,8 +950,6 @@ class PDFTool(BaseTool):
     
     async def _merge_pdfs(self, **kwargs) -> Dict[str, Any]:
         """Merge multiple PDF files"""
-        import PyPDF2
-        
         input_files = kwargs.get("input_files", [])
         output_file = kwargs.get("output_file", "merged.pdf")
         
@@ -431,22 +959,15 @@ class PDFTool(BaseTool):
                 "error": "No input files provided"
             }
         
-        merger = PyPDF2.PdfMerger()
+        missing_file = _first_missing(input_files)
+        if missing_file is not None:
+            return {
+                "success": False,
+                "error": f"File not found: {missing_file}"
+            }
         
         try:
-            for file_path in input_files:
-                if Path(file_path).exists():
-                    merger.append(file_path)
-                else:
-                    return {
-                        "success": False,
-                        "error": f"File not found: {file_path}"
-                    }
-            
-            with open(output_file, 'wb') as output:
-                merger.write(output)
-            
-            merger.close()
+            await asyncio.to_thread(_merge_pdf_files, input_files, output_file)
             
             return {
                 "success": True,
@@ -455,8 +976,12 @@ class PDFTool(BaseTool):
                 "message": f"Merged {len(input_files)} PDFs into {output_file}"
             }
             
+        except ImportError:
+            return {
+                "success": False,
+                "error": "No PDF library installed. Install with: pip install pymupdf (or PyPDF2)"
+            }
         except Exception as e:
-            merger.close()
             return {
                 "success": False,
                 "error": str(e)
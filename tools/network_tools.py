@@ -2,16 +2,457 @@
 Network and API tools for Agent Zero Gemini
 """
 import asyncio
-import logging
+import base64
+import contextlib
+import datetime
+import email.utils
+import functools
+import hashlib
+import importlib.util
 import json
-from typing import Dict, List, Optional, Any
+import logging
+import os
+import random
+import socket
+import tempfile
+import time
+from typing import ClassVar, Dict, List, Optional, Any, Tuple
 from pathlib import Path
 import urllib.parse
+from collections import OrderedDict, deque
 
 from core.tools import BaseTool
 
+# Optional faster JSON parser, imported once at load time; json is used when it is missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# One keep-alive pool for every HTTP/API call, so repeated requests to a host skip the TCP/TLS handshake
+_http_client = None
+_http_client_loop = None
+
+def _get_client():
+    """Get the pooled HTTP client for the running event loop"""
+    global _http_client, _http_client_loop
+    import httpx
+    
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        try:
+            # aiohttp's connection layer sustains more requests/s on wide fan-out;
+            # it speaks HTTP/1.1 only, so HTTP/2 applies to the native transport below
+            import aiohttp
+            from httpx_aiohttp import AiohttpTransport
+        except ImportError:
+            _http_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=1000, max_keepalive_connections=100),
+                timeout=httpx.Timeout(30),
+                # HTTP/2 multiplexes concurrent calls over one connection; it needs the h2 package.
+                # httpx advertises br/zstd in Accept-Encoding on its own once brotli/zstandard are installed.
+                http2=importlib.util.find_spec("h2") is not None
+            )
+        else:
+            _http_client = httpx.AsyncClient(
+                transport=AiohttpTransport(
+                    client=aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=1000))
+                ),
+                timeout=httpx.Timeout(30)
+            )
+        _http_client_loop = loop
+    
+    return _http_client
+
+async def aclose():
+    """Close the pooled HTTP client"""
+    global _http_client
+    
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    _http_client = None
+
+class _TokenBucket:
+    """Async token bucket: `rate` tokens per second, bursts of up to `capacity`"""
+    
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Take one token, sleeping just long enough for it to refill if the bucket is empty"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+                self.last_refill = now
+                
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+    
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+def _freshness_lifetime(headers, default: float) -> Optional[float]:
+    """Seconds a response stays fresh per Cache-Control/Expires; None if it must not be stored"""
+    directives = {}
+    for part in headers.get("cache-control", "").lower().split(","):
+        name, _, value = part.strip().partition("=")
+        if name:
+            directives[name] = value.strip('"')
+    
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0
+    if "max-age" in directives:
+        try:
+            return max(0, int(directives["max-age"]))
+        except ValueError:
+            return 0
+    
+    expires = headers.get("expires")
+    if expires:
+        try:
+            expires_at = email.utils.parsedate_to_datetime(expires)
+        except (TypeError, ValueError):
+            return 0
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=datetime.timezone.utc)
+        return max(0, (expires_at - datetime.datetime.now(datetime.timezone.utc)).total_seconds())
+    
+    return default
+
+class _ResponseCache:
+    """Bounded LRU of API responses with per-entry expiry and revalidation headers"""
+    
+    def __init__(self, maxsize: int = 1024, ttl: float = 300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[bytes, Dict[str, Any]]" = OrderedDict()
+    
+    def get(self, key: bytes) -> Optional[Dict[str, Any]]:
+        """Entry for a key, fresh or stale; None on a miss"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+    
+    def put(self, key: bytes, response_data: Dict[str, Any], headers):
+        """Store a response unless its headers forbid it, evicting the least recently used"""
+        lifetime = _freshness_lifetime(headers, self.ttl)
+        if lifetime is None:
+            self._entries.pop(key, None)
+            return
+        
+        self._entries[key] = {
+            "data": response_data,
+            "expires": time.monotonic() + lifetime,
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified")
+        }
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def refresh(self, key: bytes, headers):
+        """Extend an entry's freshness after a 304 Not Modified, or evict it if storing is now forbidden"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        
+        lifetime = _freshness_lifetime(headers, self.ttl)
+        if lifetime is None:
+            # no-store on the revalidation applies to the stored response too
+            del self._entries[key]
+            return
+        
+        # max-age=0/no-cache leave the entry stale, so every use is revalidated first
+        entry["expires"] = time.monotonic() + lifetime
+        entry["etag"] = headers.get("etag", entry["etag"])
+        entry["last_modified"] = headers.get("last-modified", entry["last_modified"])
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+# HTTPRequestTool default: bodies larger than this are spilled to a temp file instead of returned inline
+_MAX_INLINE_BODY = 1 << 20
+
+# Spilled bodies belong to the caller; any still here after _SPILL_TTL seconds are swept
+_SPILL_DIR = Path(tempfile.gettempdir()) / "agent_zero_http"
+_SPILL_TTL = 3600
+
+# Methods whose concurrent identical calls can safely share one response
+_IDEMPOTENT_METHODS = frozenset(("GET", "HEAD"))
+
+# Status codes that never carry a response body
+_BODYLESS_STATUS_CODES = frozenset((204, 304))
+
+def _is_json_content(content_type: str) -> bool:
+    """application/json and the +json family, judged from the header alone"""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type == "application/json" or media_type.endswith("+json")
+
+def _json_loads(data):
+    """Parse JSON bytes, with orjson when available"""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson only reads UTF-8; json also detects UTF-16/32 bodies
+            pass
+    return json.loads(data)
+
+def _cache_key(method: str, url: str, params: Dict[str, Any]) -> bytes:
+    """Fixed-size cache key for a request; params are serialized with sorted keys at every level"""
+    if orjson is not None:
+        try:
+            params_bytes = orjson.dumps(params, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            params_bytes = repr(sorted(params.items(), key=repr)).encode()
+    else:
+        params_bytes = json.dumps(params, sort_keys=True, separators=(",", ":"), default=str).encode()
+    
+    return hashlib.blake2b(
+        method.upper().encode() + b"|" + str(url).encode() + b"|" + params_bytes, digest_size=16
+    ).digest()
+
+def _inflight_key(method: str, url: str, kwargs: Dict[str, Any]) -> bytes:
+    """Single-flight key: everything that can change the response, including headers and body"""
+    headers = kwargs.get("headers") or {}
+    return _cache_key(method, url, {
+        "params": kwargs.get("params") or {},
+        # Header names are case-insensitive; credentials and identity headers are part of the key
+        "headers": sorted((str(name).lower(), str(value)) for name, value in headers.items()),
+        "json": kwargs.get("json")
+    })
+
+def _open_spill_file():
+    """New temp file for a large response body, sweeping expired spills first"""
+    _SPILL_DIR.mkdir(exist_ok=True)
+    cutoff = time.time() - _SPILL_TTL
+    for path in _SPILL_DIR.glob("*.body"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            # Deleted by its caller or a concurrent sweep
+            continue
+    return tempfile.NamedTemporaryFile(dir=_SPILL_DIR, suffix=".body", delete=False)
+
+async def _send_request(client, method: str, url: str, max_inline_bytes: Optional[int] = None, **request_kwargs):
+    """Stream a request's response; returns (response, response_data) with the body parsed by Content-Type"""
+    async with client.stream(method, url, **request_kwargs) as response:
+        body = bytearray()
+        # Opened only once the body outgrows max_inline_bytes
+        spill_file = None
+        
+        # HEAD, 204 and 304 carry no body; don't read or parse one
+        if method.upper() == "HEAD" or response.status_code in _BODYLESS_STATUS_CODES:
+            return response, {
+                "status_code": response.status_code,
+                "headers": dict(response.headers),
+                "url": str(response.url),
+                "body": None
+            }
+        
+        try:
+            async for chunk in response.aiter_bytes():
+                if spill_file is None and (max_inline_bytes is None or len(body) + len(chunk) <= max_inline_bytes):
+                    body += chunk
+                    continue
+                
+                if spill_file is None:
+                    # Too big to hand back inline; keep memory flat by writing the rest to disk
+                    spill_file = await asyncio.to_thread(_open_spill_file)
+                    await asyncio.to_thread(spill_file.write, bytes(body))
+                    body = bytearray()
+                await asyncio.to_thread(spill_file.write, chunk)
+        except BaseException:
+            if spill_file is not None:
+                # A partial body is no use to anyone; don't leave it behind
+                spill_file.close()
+                os.unlink(spill_file.name)
+            raise
+        finally:
+            if spill_file is not None:
+                await asyncio.to_thread(spill_file.close)
+    
+    response_data = {
+        "status_code": response.status_code,
+        "headers": dict(response.headers),
+        "url": str(response.url)
+    }
+    
+    if spill_file is not None:
+        response_data["body_path"] = spill_file.name
+        response_data["body_size"] = os.path.getsize(spill_file.name)
+        return response, response_data
+    
+    if not body:
+        response_data["body"] = None
+        return response, response_data
+    
+    if _is_json_content(response.headers.get("content-type", "")):
+        try:
+            response_data["json"] = _json_loads(body)
+            return response, response_data
+        except ValueError:
+            pass
+    response_data["text"] = body.decode(response.encoding or "utf-8", errors="replace")
+    
+    return response, response_data
+
+@functools.lru_cache(maxsize=4096)
+def _url_domain(url: str) -> str:
+    """netloc of a URL, parsed once per distinct URL"""
+    return urllib.parse.urlparse(url).netloc
+
+@functools.lru_cache(maxsize=256)
+def _auth_fields(auth_items) -> Tuple[Tuple[Tuple[str, str], ...], Tuple[Tuple[str, str], ...]]:
+    """(header items, query items) for an auth config, built once per distinct config"""
+    auth = dict(auth_items)
+    auth_type = auth.get("type")
+    
+    if auth_type == "basic":
+        credentials = f"{auth.get('username')}:{auth.get('password')}".encode("utf-8")
+        return (("Authorization", "Basic " + base64.b64encode(credentials).decode("ascii")),), ()
+    if auth_type == "bearer":
+        return (("Authorization", f"Bearer {auth.get('token')}"),), ()
+    if auth_type == "api_key":
+        if auth.get("location") == "header":
+            return ((auth.get("key", "X-API-Key"), auth.get("value")),), ()
+        if auth.get("location") == "query":
+            return (), ((auth.get("key", "api_key"), auth.get("value")),)
+    return (), ()
+
+def _is_jsonrpc(call_config: Dict[str, Any]) -> bool:
+    """True for a POSTed JSON-RPC 2.0 request object"""
+    body = call_config.get("json")
+    return (
+        str(call_config.get("method", "GET")).upper() == "POST"
+        and isinstance(body, dict)
+        and body.get("jsonrpc") == "2.0"
+    )
+
+def _group_jsonrpc_calls(calls: List[Dict[str, Any]]) -> List[List[int]]:
+    """Call indexes grouped so JSON-RPC calls to the same endpoint and headers share one group"""
+    groups: List[List[int]] = []
+    by_endpoint: Dict[tuple, int] = {}
+    
+    for index, call_config in enumerate(calls):
+        if _is_jsonrpc(call_config):
+            key = (call_config.get("url"), repr(sorted((call_config.get("headers") or {}).items())))
+            if key in by_endpoint:
+                groups[by_endpoint[key]].append(index)
+                continue
+            by_endpoint[key] = len(groups)
+        groups.append([index])
+    
+    return groups
+
+def _jsonrpc_wire_bodies(bodies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Batch request objects with each id replaced by its position, so duplicate caller ids can't collide"""
+    return [{**body, "id": position} if "id" in body else body for position, body in enumerate(bodies)]
+
+def _split_jsonrpc_result(result: Dict[str, Any], bodies: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Turn the result of one batched JSON-RPC POST back into one result per call, with the caller's ids restored"""
+    response = result.get("response") or {}
+    replies = response.get("json")
+    expects_replies = any("id" in body for body in bodies)
+    if not result.get("success") or (expects_replies and not isinstance(replies, list)):
+        # Transport failure or a single error object for the whole batch
+        return [result] * len(bodies)
+    
+    # Replies carry the positional ids from _jsonrpc_wire_bodies
+    by_position = {reply.get("id"): reply for reply in replies or () if isinstance(reply, dict)}
+    split = []
+    for position, body in enumerate(bodies):
+        if "id" not in body:
+            # Notifications get no reply by design
+            split.append({**result, "notification": True, "response": {**response, "json": None}})
+        elif position in by_position:
+            reply = {**by_position[position], "id": body["id"]}
+            split.append({**result, "response": {**response, "json": reply}})
+        else:
+            split.append({"success": False, "error": f"No JSON-RPC reply for id {body['id']!r}"})
+    
+    return split
+
+# All webhooks share one FastAPI app, served by a single uvicorn task started on first use
+_webhook_app = None
+_webhook_server = None
+_webhook_server_task = None
+_webhook_port = None
+
+def _get_webhook_app():
+    """Shared FastAPI app that webhook routes are added to"""
+    global _webhook_app
+    
+    if _webhook_app is None:
+        from fastapi import FastAPI
+        _webhook_app = FastAPI()
+    return _webhook_app
+
+async def _start_webhook_server(port: int):
+    """Serve the shared webhook app on `port` in the background, if not already running; OSError if it can't bind"""
+    global _webhook_server, _webhook_server_task, _webhook_port
+    import uvicorn
+    
+    if _webhook_server_task is not None and not _webhook_server_task.done():
+        return
+    
+    # Bind here so a busy port raises OSError to the caller; uvicorn's own bind
+    # failure calls sys.exit, which would take down the host process
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("127.0.0.1", port))
+    except OSError:
+        sock.close()
+        raise
+    
+    server = uvicorn.Server(uvicorn.Config(_get_webhook_app(), port=port, loop="asyncio", log_level="warning"))
+    # Leave Ctrl+C handling to the host application
+    server.install_signal_handlers = lambda: None
+    if hasattr(server, "capture_signals"):
+        server.capture_signals = contextlib.nullcontext
+    
+    _webhook_server = server
+    _webhook_port = port
+    _webhook_server_task = asyncio.create_task(server.serve(sockets=[sock]))
+    
+    # Report success only once the server is actually accepting connections
+    while not server.started:
+        if _webhook_server_task.done():
+            await stop_webhook_server()
+            sock.close()
+            raise OSError(f"Webhook server failed to start on port {port}")
+        await asyncio.sleep(0.01)
+
+async def stop_webhook_server():
+    """Shut down the shared webhook server"""
+    global _webhook_server, _webhook_server_task, _webhook_port
+    
+    if _webhook_server is not None:
+        _webhook_server.should_exit = True
+    if _webhook_server_task is not None:
+        await asyncio.gather(_webhook_server_task, return_exceptions=True)
+    _webhook_server = None
+    _webhook_server_task = None
+    _webhook_port = None
+
 class HTTPRequestTool(BaseTool):
     """HTTP request tool for API calls and web requests"""
     
@@ -24,58 +465,41 @@ class HTTPRequestTool(BaseTool):
     async def execute(self, method: str, url: str, **kwargs) -> Dict[str, Any]:
         """Make HTTP request"""
         try:
-            import httpx
-            
             # Prepare request parameters
-            headers = kwargs.get("headers", {})
-            params = kwargs.get("params", {})
+            headers = dict(kwargs.get("headers") or {})
+            params = dict(kwargs.get("params") or {})
             data = kwargs.get("data")
             json_data = kwargs.get("json")
             timeout = kwargs.get("timeout", 30)
             auth = kwargs.get("auth")
             
             # Handle authentication
-            auth_obj = None
             if auth:
-                if auth.get("type") == "basic":
-                    auth_obj = (auth.get("username"), auth.get("password"))
-                elif auth.get("type") == "bearer":
-                    headers["Authorization"] = f"Bearer {auth.get('token')}"
-                elif auth.get("type") == "api_key":
-                    if auth.get("location") == "header":
-                        headers[auth.get("key", "X-API-Key")] = auth.get("value")
-                    elif auth.get("location") == "query":
-                        params[auth.get("key", "api_key")] = auth.get("value")
-            
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.request(
-                    method=method.upper(),
-                    url=url,
-                    headers=headers,
-                    params=params,
-                    data=data,
-                    json=json_data,
-                    auth=auth_obj
-                )
-                
-                # Parse response
-                response_data = {
-                    "status_code": response.status_code,
-                    "headers": dict(response.headers),
-                    "url": str(response.url)
-                }
-                
-                # Try to parse JSON response
                 try:
-                    response_data["json"] = response.json()
-                except:
-                    response_data["text"] = response.text
-                
-                return {
-                    "success": True,
-                    "response": response_data
-                }
-                
+                    auth_headers, auth_params = _auth_fields(frozenset(auth.items()))
+                except TypeError:
+                    # Unhashable values; build the fields without the cache
+                    auth_headers, auth_params = _auth_fields.__wrapped__(auth.items())
+                headers.update(auth_headers)
+                params.update(auth_params)
+            
+            _, response_data = await _send_request(
+                _get_client(),
+                method.upper(),
+                url,
+                headers=headers,
+                params=params,
+                data=data,
+                json=json_data,
+                timeout=timeout,
+                max_inline_bytes=kwargs.get("max_inline_bytes", _MAX_INLINE_BODY)
+            )
+            
+            return {
+                "success": True,
+                "response": response_data
+            }
+            
         except ImportError:
             return {
                 "success": False,
@@ -128,19 +552,39 @@ class HTTPRequestTool(BaseTool):
                 "type": "object",
                 "description": "Authentication configuration",
                 "optional": True
+            },
+            "max_inline_bytes": {
+                "type": "integer",
+                "description": (
+                    "Bodies larger than this are written to a temp file and returned as "
+                    "response.body_path and response.body_size instead of text/json. "
+                    "Delete body_path when done; unclaimed files are removed after an hour"
+                ),
+                "default": _MAX_INLINE_BODY,
+                "optional": True
             }
         }
 
 class APITool(BaseTool):
     """Advanced API interaction tool"""
     
+    # Common schema endpoints, most preferred first
+    _SCHEMA_ENDPOINTS: ClassVar[Dict[str, Tuple[str, ...]]] = {
+        "openapi": ("/openapi.json", "/swagger.json", "/api-docs"),
+        "jsonapi": ("/api/schema", "/schema.json"),
+        "graphql": ("/graphql/schema", "/graphql")
+    }
+    
     def __init__(self):
         super().__init__(
             name="api_client",
             description="Advanced API client with rate limiting, retries, and response caching"
         )
-        self.session_cache = {}
-        self.rate_limits = {}
+        self.session_cache = _ResponseCache(maxsize=1024, ttl=300)
+        # Per-domain token buckets, created on first call to each domain
+        self._buckets: Dict[str, _TokenBucket] = {}
+        # Identical GET/HEAD calls already in flight, keyed by URL, params, headers and body
+        self._inflight: Dict[bytes, asyncio.Future] = {}
     
     async def execute(self, action: str, **kwargs) -> Dict[str, Any]:
         """Execute API action"""
@@ -166,6 +610,37 @@ class APITool(BaseTool):
             }
     
     async def _api_call(self, **kwargs) -> Dict[str, Any]:
+        """Make API call, sharing one request between identical concurrent GET/HEAD calls"""
+        method = kwargs.get("method", "GET")
+        if method.upper() not in _IDEMPOTENT_METHODS:
+            return await self._send_api_call(**kwargs)
+        
+        key = _inflight_key(method, kwargs.get("url"), kwargs)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            try:
+                # Shielded so one waiter being cancelled doesn't cancel the shared call
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                if not inflight.cancelled():
+                    raise
+                # The leading call failed; make our own request instead
+                return await self._send_api_call(**kwargs)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._send_api_call(**kwargs)
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del self._inflight[key]
+        
+        future.set_result(result)
+        return result
+    
+    async def _send_api_call(self, **kwargs) -> Dict[str, Any]:
         """Make API call with advanced features"""
         import httpx
         
@@ -173,59 +648,84 @@ class APITool(BaseTool):
         method = kwargs.get("method", "GET")
         retries = kwargs.get("retries", 3)
         retry_delay = kwargs.get("retry_delay", 1)
+        max_delay = kwargs.get("max_delay", 30)
         cache_response = kwargs.get("cache", False)
         
-        # Check cache first
-        cache_key = f"{method}:{url}:{json.dumps(kwargs.get('params', {}), sort_keys=True)}"
-        if cache_response and cache_key in self.session_cache:
-            return {
-                "success": True,
-                "response": self.session_cache[cache_key],
-                "cached": True
-            }
+        headers = dict(kwargs.get("headers") or {})
+        params = kwargs.get("params") or {}
+        
+        # Check cache first; a stale entry is revalidated with a conditional request
+        cache_key = None
+        cached_entry = None
+        if cache_response:
+            # Same inputs as the single-flight key, so a response fetched with one
+            # caller's credentials or cookies is never served to another
+            cache_key = _inflight_key(method, url, kwargs)
+            cached_entry = self.session_cache.get(cache_key)
+            
+            if cached_entry is not None:
+                if cached_entry["expires"] > time.monotonic():
+                    return {
+                        "success": True,
+                        "response": cached_entry["data"],
+                        "cached": True
+                    }
+                if cached_entry["etag"]:
+                    headers["If-None-Match"] = cached_entry["etag"]
+                if cached_entry["last_modified"]:
+                    headers["If-Modified-Since"] = cached_entry["last_modified"]
         
         # Rate limiting check
-        await self._check_rate_limit(url)
+        await self._check_rate_limit(url, kwargs.get("rate_limit", 10), kwargs.get("burst", 10))
         
         last_error = None
         for attempt in range(retries + 1):
+            if attempt > 0:
+                # Full jitter: spread retries over [0, backoff] so concurrent callers don't retry in lockstep
+                await asyncio.sleep(random.uniform(0, min(retry_delay * (2 ** (attempt - 1)), max_delay)))
+            
             try:
-                async with httpx.AsyncClient() as client:
-                    response = await client.request(
-                        method=method,
-                        url=url,
-                        headers=kwargs.get("headers", {}),
-                        params=kwargs.get("params", {}),
-                        json=kwargs.get("json"),
-                        timeout=kwargs.get("timeout", 30)
-                    )
-                    
-                    response_data = {
-                        "status_code": response.status_code,
-                        "headers": dict(response.headers),
-                        "url": str(response.url)
-                    }
-                    
-                    try:
-                        response_data["json"] = response.json()
-                    except:
-                        response_data["text"] = response.text
-                    
-                    # Cache successful response
-                    if cache_response and response.status_code == 200:
-                        self.session_cache[cache_key] = response_data
-                    
-                    return {
-                        "success": True,
-                        "response": response_data,
-                        "attempt": attempt + 1
-                    }
-                    
-            except Exception as e:
+                # No max_inline_bytes: cached and coalesced responses are shared, so the
+                # body must stay inline rather than in a file one caller might delete
+                response, response_data = await _send_request(
+                    _get_client(),
+                    method,
+                    url,
+                    headers=headers,
+                    params=params,
+                    json=kwargs.get("json"),
+                    timeout=kwargs.get("timeout", 30)
+                )
+            except httpx.TransportError as e:
                 last_error = e
-                if attempt < retries:
-                    await asyncio.sleep(retry_delay * (2 ** attempt))  # Exponential backoff
-                
+                continue
+            
+            # Throttling and server errors are transient; any other status is the answer
+            if (response.status_code == 429 or response.status_code >= 500) and attempt < retries:
+                last_error = f"HTTP {response.status_code} from {url}"
+                continue
+            
+            # Not modified: the stored body is still current, so nothing was re-downloaded
+            if response.status_code == 304 and cached_entry is not None:
+                self.session_cache.refresh(cache_key, response.headers)
+                return {
+                    "success": True,
+                    "response": cached_entry["data"],
+                    "cached": True,
+                    "revalidated": True,
+                    "attempt": attempt + 1
+                }
+            
+            # Cache successful response
+            if cache_response and response.status_code == 200:
+                self.session_cache.put(cache_key, response_data, response.headers)
+            
+            return {
+                "success": True,
+                "response": response_data,
+                "attempt": attempt + 1
+            }
+        
         return {
             "success": False,
             "error": str(last_error),
@@ -236,6 +736,7 @@ class APITool(BaseTool):
         """Make multiple API calls concurrently"""
         calls = kwargs.get("calls", [])
         max_concurrent = kwargs.get("max_concurrent", 5)
+        combine_jsonrpc = kwargs.get("combine_jsonrpc", False)
         
         if not calls:
             return {
@@ -243,15 +744,43 @@ class APITool(BaseTool):
                 "error": "No API calls provided"
             }
         
-        semaphore = asyncio.Semaphore(max_concurrent)
+        # A fixed set of workers drains a bounded queue, so only a handful of calls
+        # exist as coroutines at once however long the list is
+        worker_count = max(1, min(max_concurrent, len(calls)))
+        queue: asyncio.Queue = asyncio.Queue(maxsize=worker_count * 2)
+        results: List[Any] = [None] * len(calls)
+        
+        async def worker():
+            while True:
+                indexes = await queue.get()
+                if indexes is None:
+                    return
+                try:
+                    if len(indexes) == 1:
+                        results[indexes[0]] = await self._api_call(**calls[indexes[0]])
+                        continue
+                    
+                    # Several JSON-RPC requests to one endpoint go out as a single batch POST
+                    bodies = [calls[index]["json"] for index in indexes]
+                    result = await self._api_call(
+                        **{**calls[indexes[0]], "json": _jsonrpc_wire_bodies(bodies), "cache": False}
+                    )
+                    for index, call_result in zip(indexes, _split_jsonrpc_result(result, bodies)):
+                        results[index] = call_result
+                except Exception as e:
+                    for index in indexes:
+                        results[index] = e
         
-        async def make_call(call_config):
-            async with semaphore:
-                return await self._api_call(**call_config)
+        async def produce():
+            # put() waits while the queue is full, pacing the producer to the workers
+            groups = _group_jsonrpc_calls(calls) if combine_jsonrpc else ([index] for index in range(len(calls)))
+            for indexes in groups:
+                await queue.put(indexes)
+            for _ in range(worker_count):
+                await queue.put(None)
         
         # Execute calls concurrently
-        tasks = [make_call(call) for call in calls]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.gather(produce(), *(worker() for _ in range(worker_count)))
         
         # Process results
         successful_calls = 0
@@ -296,29 +825,45 @@ class APITool(BaseTool):
                 "error": "URL required for endpoint testing"
             }
         
+        # Timestamp each connection phase reported by httpcore's trace hook
+        phases = {}
+        
+        async def trace(event_name, info):
+            phases[event_name] = time.monotonic()
+        
         # Test basic connectivity
-        start_time = asyncio.get_event_loop().time()
+        start_time = time.monotonic()
         
         try:
-            import httpx
+            response = await _get_client().head(url, timeout=10, extensions={"trace": trace})
+            
+            end_time = time.monotonic()
+            response_time = end_time - start_time
+            
+            connect_started = phases.get("connection.connect_tcp.started")
+            connect_done = phases.get("connection.start_tls.complete", phases.get("connection.connect_tcp.complete"))
+            headers_done = phases.get("http11.receive_response_headers.complete",
+                                      phases.get("http2.receive_response_headers.complete"))
+            
+            # A pooled connection that was reused has no connect phase; with no trace
+            # events at all (a transport without httpcore's hook) nothing was measured
+            connect_time = None
+            if phases:
+                connect_time = connect_done - connect_started if connect_started and connect_done else 0.0
+            
+            return {
+                "success": True,
+                "endpoint": url,
+                "status_code": response.status_code,
+                "response_time": response_time,
+                "connect_time": connect_time,
+                "ttfb": headers_done - start_time if headers_done else None,
+                "headers": dict(response.headers),
+                "available": response.status_code < 400
+            }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.head(url, timeout=10)
-                
-                end_time = asyncio.get_event_loop().time()
-                response_time = end_time - start_time
-                
-                return {
-                    "success": True,
-                    "endpoint": url,
-                    "status_code": response.status_code,
-                    "response_time": response_time,
-                    "headers": dict(response.headers),
-                    "available": response.status_code < 400
-                }
-                
         except Exception as e:
-            end_time = asyncio.get_event_loop().time()
+            end_time = time.monotonic()
             response_time = end_time - start_time
             
             return {
@@ -334,50 +879,56 @@ class APITool(BaseTool):
         url = kwargs.get("url")
         schema_format = kwargs.get("format", "openapi")
         
-        # Common schema endpoints
-        schema_endpoints = {
-            "openapi": ["/openapi.json", "/swagger.json", "/api-docs"],
-            "jsonapi": ["/api/schema", "/schema.json"],
-            "graphql": ["/graphql/schema", "/graphql"]
-        }
-        
         base_url = url.rstrip('/')
+        schema_urls = [base_url + endpoint for endpoint in self._SCHEMA_ENDPOINTS.get(schema_format, ())]
         
-        for endpoint in schema_endpoints.get(schema_format, []):
-            try:
-                schema_url = base_url + endpoint
-                result = await self._api_call(url=schema_url, method="GET")
+        def found(task) -> bool:
+            if task.cancelled() or task.exception() is not None:
+                return False
+            result = task.result()
+            return bool(result.get("success")) and result.get("response", {}).get("status_code") == 200
+        
+        # Probe every endpoint at once; as soon as the most preferred endpoint that
+        # can still succeed has answered 200, the rest are cancelled
+        tasks = [asyncio.ensure_future(self._api_call(url=schema_url, method="GET")) for schema_url in schema_urls]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                try:
+                    await next_done
+                except Exception:
+                    pass
                 
-                if result.get("success") and result.get("response", {}).get("status_code") == 200:
-                    return {
-                        "success": True,
-                        "schema_url": schema_url,
-                        "schema": result["response"].get("json", result["response"].get("text")),
-                        "format": schema_format
-                    }
-                    
-            except Exception:
-                continue
+                for schema_url, task in zip(schema_urls, tasks):
+                    if not task.done():
+                        break
+                    if found(task):
+                        response = task.result()["response"]
+                        return {
+                            "success": True,
+                            "schema_url": schema_url,
+                            "schema": response.get("json", response.get("text")),
+                            "format": schema_format
+                        }
+        finally:
+            for task in tasks:
+                task.cancel()
         
         return {
             "success": False,
             "error": f"No {schema_format} schema found at common endpoints",
-            "attempted_endpoints": schema_endpoints.get(schema_format, [])
+            "attempted_endpoints": list(self._SCHEMA_ENDPOINTS.get(schema_format, ()))
         }
     
-    async def _check_rate_limit(self, url: str):
-        """Check and enforce rate limiting"""
-        domain = urllib.parse.urlparse(url).netloc
+    async def _check_rate_limit(self, url: str, rate: float = 10, burst: float = 10):
+        """Wait for a token from the domain's bucket; concurrent calls proceed in bursts"""
+        domain = _url_domain(url)
         
-        if domain in self.rate_limits:
-            last_request_time = self.rate_limits[domain]
-            time_since_last = asyncio.get_event_loop().time() - last_request_time
-            
-            # Minimum 100ms between requests to same domain
-            if time_since_last < 0.1:
-                await asyncio.sleep(0.1 - time_since_last)
+        bucket = self._buckets.get(domain)
+        if bucket is None:
+            bucket = self._buckets[domain] = _TokenBucket(rate, burst)
         
-        self.rate_limits[domain] = asyncio.get_event_loop().time()
+        async with bucket:
+            pass
     
     def get_parameters(self) -> Dict[str, Any]:
         return {
@@ -417,6 +968,12 @@ class APITool(BaseTool):
                 "default": 3,
                 "optional": True
             },
+            "max_delay": {
+                "type": "number",
+                "description": "Upper bound in seconds for the randomized backoff between retries",
+                "default": 30,
+                "optional": True
+            },
             "cache": {
                 "type": "boolean",
                 "description": "Cache response",
@@ -434,6 +991,24 @@ class APITool(BaseTool):
                 "default": 5,
                 "optional": True
             },
+            "combine_jsonrpc": {
+                "type": "boolean",
+                "description": "Send JSON-RPC 2.0 calls to the same endpoint as one batch request (for batch_call)",
+                "default": False,
+                "optional": True
+            },
+            "rate_limit": {
+                "type": "number",
+                "description": "Sustained requests per second allowed per domain",
+                "default": 10,
+                "optional": True
+            },
+            "burst": {
+                "type": "integer",
+                "description": "Requests per domain that may be sent back-to-back before rate limiting applies",
+                "default": 10,
+                "optional": True
+            },
             "format": {
                 "type": "string",
                 "description": "Schema format (for get_schema)",
@@ -478,36 +1053,57 @@ class WebhookTool(BaseTool):
     
     async def _create_webhook(self, **kwargs) -> Dict[str, Any]:
         """Create webhook endpoint"""
-        from fastapi import FastAPI, Request
-        import uvicorn
+        from fastapi import Request
         
         port = kwargs.get("port", 8000)
         path = kwargs.get("path", "/webhook")
         webhook_id = kwargs.get("webhook_id", f"webhook_{len(self.active_webhooks)}")
         
-        app = FastAPI()
-        received_data = []
+        if _webhook_server is not None and _webhook_port != port:
+            return {
+                "success": False,
+                "error": f"Webhook server already running on port {_webhook_port}"
+            }
+        
+        app = _get_webhook_app()
+        if any(getattr(route, "path", None) == path for route in app.router.routes):
+            return {
+                "success": False,
+                "error": f"A webhook is already registered at {path}"
+            }
+        
+        # Keep only the most recent deliveries so a busy webhook can't grow without bound
+        received_data = deque(maxlen=kwargs.get("max_history", 1000))
         
-        @app.post(path)
         async def webhook_handler(request: Request):
             data = {
-                "timestamp": asyncio.get_event_loop().time(),
+                "timestamp": time.monotonic(),
                 "headers": dict(request.headers),
                 "method": request.method,
                 "url": str(request.url)
             }
             
+            # Read the body once and parse it ourselves rather than via request.json()
+            body = await request.body()
             try:
-                data["json"] = await request.json()
-            except:
-                data["body"] = await request.body()
+                data["json"] = _json_loads(body)
+            except ValueError:
+                data["body"] = body
             
             received_data.append(data)
             return {"status": "received"}
         
+        try:
+            await _start_webhook_server(port)
+        except OSError as e:
+            return {
+                "success": False,
+                "error": f"Could not start webhook server on port {port}: {e}"
+            }
+        app.add_api_route(path, webhook_handler, methods=["POST"])
+        
         # Store webhook info
         self.active_webhooks[webhook_id] = {
-            "app": app,
             "port": port,
             "path": path,
             "data": received_data,
@@ -541,7 +1137,12 @@ class WebhookTool(BaseTool):
         webhook_id = kwargs.get("webhook_id")
         
         if webhook_id in self.active_webhooks:
-            del self.active_webhooks[webhook_id]
+            webhook = self.active_webhooks.pop(webhook_id)
+            if _webhook_app is not None:
+                _webhook_app.router.routes[:] = [
+                    route for route in _webhook_app.router.routes
+                    if getattr(route, "path", None) != webhook["path"]
+                ]
             return {
                 "success": True,
                 "message": f"Webhook {webhook_id} deleted"
@@ -575,5 +1176,11 @@ class WebhookTool(BaseTool):
                 "type": "string",
                 "description": "Webhook identifier",
                 "optional": True
+            },
+            "max_history": {
+                "type": "integer",
+                "description": "Maximum number of received payloads kept per webhook",
+                "default": 1000,
+                "optional": True
             }
         }
@@ -1,17 +1,40 @@
 """
 Comprehensive error handling system for Agent Zero Gemini
 """
+import asyncio
 import logging
+import reprlib
 import traceback
 import sys
-from typing import Dict, Any, Optional, Callable, Type
+import time
+from array import array
+from typing import Dict, Any, List, Optional, Callable, Type, Tuple
+from collections import Counter
 from datetime import datetime
-from functools import wraps
+from functools import lru_cache, wraps
 from pathlib import Path
 import json
 
+# Optional faster JSON serializer; json is used when it is missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+def _dumps_indented(data: Any) -> bytes:
+    """Serialize to indented JSON bytes, with orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode("utf-8")
+
+def _dumps_line(data: Any) -> bytes:
+    """Serialize to one line of compact JSON bytes, with orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
 class AgentError(Exception):
     """Base exception for Agent Zero errors"""
     
@@ -58,6 +81,113 @@ class ConfigurationError(AgentError):
         super().__init__(message, "CONFIGURATION_ERROR", details)
         self.config_key = config_key
 
+# Extra attributes copied into error records, per error class
+_RECORD_FIELDS: Dict[Type[Exception], Tuple[str, ...]] = {
+    AgentError: ("details",),
+    ToolExecutionError: ("details", "tool_name"),
+    CommunicationError: ("details", "sender_id", "receiver_id"),
+    MemoryError: ("details", "operation"),
+    StorageError: ("details", "storage_type"),
+    ConfigurationError: ("details", "config_key")
+}
+
+@lru_cache(maxsize=256)
+def _record_fields(error_type: Type[Exception]) -> Tuple[str, ...]:
+    """Record fields for an error class, taken from its closest entry in the MRO"""
+    for klass in error_type.__mro__:
+        fields = _RECORD_FIELDS.get(klass)
+        if fields is not None:
+            return fields
+    return ()
+
+class _ErrorRecord(dict):
+    """Error record whose traceback is only formatted when first read"""
+    
+    def __init__(self, summary: traceback.TracebackException, **fields):
+        super().__init__(**fields)
+        # A frame-free snapshot of the traceback; holding the exception itself
+        # would keep every frame and its locals alive for the life of the history
+        self._summary = summary
+    
+    def __missing__(self, key):
+        if key != "traceback":
+            raise KeyError(key)
+        value = self["traceback"] = "".join(self._summary.format())
+        return value
+    
+    def get(self, key, default=None):
+        return self[key] if key in self or key == "traceback" else default
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict copy with the traceback filled in and an ISO timestamp"""
+        self["traceback"]
+        record = dict(self)
+        record["timestamp"] = datetime.fromtimestamp(record["timestamp"]).isoformat()
+        return record
+
+class _ErrorColumns:
+    """Bounded error history stored column-wise; records are rebuilt when read"""
+    
+    # Rows past maxlen are dropped in blocks of this size rather than one per append
+    _TRIM_EVERY = 1024
+    
+    def __init__(self, maxlen: int):
+        self.maxlen = maxlen
+        self._timestamps = array("d")
+        self._types: List[str] = []
+        self._codes: List[str] = []
+        self._messages: List[str] = []
+        self._summaries: List[traceback.TracebackException] = []
+        # Remaining fields (context, system info, per-class details) for each row
+        self._extras: List[Dict[str, Any]] = []
+    
+    def _columns(self):
+        return (self._timestamps, self._types, self._codes, self._messages, self._summaries, self._extras)
+    
+    def append(self, record: "_ErrorRecord"):
+        """Store a record's fields as a new row"""
+        self._timestamps.append(record["timestamp"])
+        self._types.append(record["error_type"])
+        self._codes.append(record["error_code"])
+        self._messages.append(record["error_message"])
+        self._summaries.append(record._summary)
+        self._extras.append({key: value for key, value in record.items() if key not in _COLUMN_FIELDS})
+        
+        excess = len(self._types) - self.maxlen
+        if excess >= self._TRIM_EVERY:
+            for column in self._columns():
+                del column[:excess]
+    
+    def _record(self, index: int) -> "_ErrorRecord":
+        return _ErrorRecord(
+            self._summaries[index],
+            timestamp=self._timestamps[index],
+            error_type=self._types[index],
+            error_message=self._messages[index],
+            error_code=self._codes[index],
+            **self._extras[index]
+        )
+    
+    def __len__(self) -> int:
+        return min(len(self._types), self.maxlen)
+    
+    def __iter__(self):
+        total = len(self._types)
+        for index in range(total - len(self), total):
+            yield self._record(index)
+    
+    def recent(self, count: int) -> List["_ErrorRecord"]:
+        """The last count records, oldest first"""
+        total = len(self._types)
+        return [self._record(index) for index in range(max(total - count, total - len(self)), total)]
+    
+    def clear(self):
+        for column in self._columns():
+            del column[:]
+
+# Record fields kept in their own _ErrorColumns columns
+_COLUMN_FIELDS = frozenset(("timestamp", "error_type", "error_code", "error_message"))
+
 class ErrorHandler:
     """Comprehensive error handling system"""
     
@@ -65,9 +195,19 @@ class ErrorHandler:
         """Initialize ErrorHandler"""
         self.log_errors = log_errors
         self.store_errors = store_errors
-        self.error_storage: List[Dict[str, Any]] = []
+        # Bounded history; per-type/code counts are kept as errors arrive
+        self.error_storage = _ErrorColumns(maxlen=10000)
+        self.error_type_counts: Counter = Counter()
+        self.error_code_counts: Counter = Counter()
         self.error_handlers: Dict[Type[Exception], Callable] = {}
+        # Resolved handler per exception type; reset whenever a handler is registered
+        self._handler_cache: Dict[Type[Exception], Optional[Callable]] = {}
         self.recovery_strategies: Dict[str, Callable] = {}
+        # Same for every record, so built once and shared
+        self._system_info = {
+            "python_version": sys.version,
+            "platform": sys.platform
+        }
         
         # Setup default error handlers
         self._setup_default_handlers()
@@ -86,6 +226,7 @@ class ErrorHandler:
     def register_handler(self, exception_type: Type[Exception], handler: Callable):
         """Register error handler for specific exception type"""
         self.error_handlers[exception_type] = handler
+        self._handler_cache.clear()
         logger.debug(f"Registered error handler for {exception_type.__name__}")
     
     def register_recovery_strategy(self, error_code: str, strategy: Callable):
@@ -102,6 +243,8 @@ class ErrorHandler:
             # Store error if enabled
             if self.store_errors:
                 self.error_storage.append(error_record)
+                self.error_type_counts[error_record["error_type"]] += 1
+                self.error_code_counts[error_record["error_code"]] += 1
             
             # Log error if enabled
             if self.log_errors:
@@ -135,31 +278,21 @@ class ErrorHandler:
     
     def _create_error_record(self, error: Exception, context: Dict[str, Any] = None) -> Dict[str, Any]:
         """Create comprehensive error record"""
-        error_record = {
-            "timestamp": datetime.now().isoformat(),
-            "error_type": type(error).__name__,
-            "error_message": str(error),
-            "error_code": getattr(error, 'error_code', 'UNKNOWN'),
-            "traceback": traceback.format_exc(),
-            "context": context or {},
-            "system_info": {
-                "python_version": sys.version,
-                "platform": sys.platform
-            }
-        }
+        # The traceback is captured without source lines or frames and formatted
+        # lazily; most records are never read in full
+        error_record = _ErrorRecord(
+            traceback.TracebackException(type(error), error, error.__traceback__, lookup_lines=False),
+            timestamp=time.time(),
+            error_type=type(error).__name__,
+            error_message=str(error),
+            error_code=getattr(error, 'error_code', 'UNKNOWN'),
+            context=context or {},
+            system_info=self._system_info
+        )
         
         # Add specific error details
-        if hasattr(error, 'details'):
-            error_record["details"] = error.details
-        
-        if hasattr(error, 'tool_name'):
-            error_record["tool_name"] = error.tool_name
-        
-        if hasattr(error, 'sender_id'):
-            error_record["sender_id"] = error.sender_id
-        
-        if hasattr(error, 'receiver_id'):
-            error_record["receiver_id"] = error.receiver_id
+        for field in _record_fields(type(error)):
+            error_record[field] = getattr(error, field)
         
         return error_record
     
@@ -175,20 +308,25 @@ class ErrorHandler:
             logger.error(f"Unhandled error: {error}")
         
         # Log full details at debug level
-        logger.debug(f"Error details: {json.dumps(error_record, indent=2)}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Error details: %s", _dumps_indented(error_record.to_dict()).decode("utf-8"))
     
     def _find_handler(self, error_type: Type[Exception]) -> Optional[Callable]:
         """Find appropriate error handler"""
-        # Check for exact match
-        if error_type in self.error_handlers:
-            return self.error_handlers[error_type]
+        try:
+            return self._handler_cache[error_type]
+        except KeyError:
+            pass
         
-        # Check for parent class matches
-        for registered_type, handler in self.error_handlers.items():
-            if issubclass(error_type, registered_type):
-                return handler
+        # The closest registered class in the MRO wins, so an exact match comes first
+        handler = None
+        for klass in error_type.__mro__:
+            handler = self.error_handlers.get(klass)
+            if handler is not None:
+                break
         
-        return None
+        self._handler_cache[error_type] = handler
+        return handler
     
     def _handle_tool_error(self, error: ToolExecutionError, record: Dict[str, Any], context: Dict[str, Any] = None) -> Dict[str, Any]:
         """Handle tool execution errors"""
@@ -262,57 +400,59 @@ class ErrorHandler:
         if not self.error_storage:
             return {"total_errors": 0}
         
-        stats = {
-            "total_errors": len(self.error_storage),
-            "error_types": {},
-            "error_codes": {},
-            "recent_errors": []
+        # Counts cover every stored error, including ones since dropped from the bounded history
+        return {
+            "total_errors": sum(self.error_type_counts.values()),
+            "error_types": dict(self.error_type_counts),
+            "error_codes": dict(self.error_code_counts),
+            "recent_errors": self.error_storage.recent(10)
         }
-        
-        # Count by type and code
-        for error_record in self.error_storage:
-            error_type = error_record.get("error_type", "Unknown")
-            error_code = error_record.get("error_code", "UNKNOWN")
-            
-            stats["error_types"][error_type] = stats["error_types"].get(error_type, 0) + 1
-            stats["error_codes"][error_code] = stats["error_codes"].get(error_code, 0) + 1
-        
-        # Get recent errors (last 10)
-        stats["recent_errors"] = self.error_storage[-10:]
-        
-        return stats
     
     def clear_error_history(self):
         """Clear stored error history"""
         self.error_storage.clear()
+        self.error_type_counts.clear()
+        self.error_code_counts.clear()
         logger.info("Cleared error history")
     
     def export_error_log(self, filepath: str):
-        """Export error log to file"""
+        """Export error log to file as JSON Lines, one record per line"""
         try:
-            with open(filepath, 'w') as f:
-                json.dump(self.error_storage, f, indent=2)
+            with open(filepath, 'wb') as f:
+                for error_record in self.error_storage:
+                    f.write(_dumps_line(error_record.to_dict()))
+                    f.write(b"\n")
             logger.info(f"Exported error log to {filepath}")
         except Exception as e:
             logger.error(f"Failed to export error log: {e}")
 
+# Size-capped repr for call arguments recorded in error context; str() of a large
+# buffer or collection could be arbitrarily long
+_arg_repr = reprlib.Repr()
+_arg_repr.maxstring = 80
+_arg_repr.maxother = 80
+
 def error_handler(error_handler_instance: ErrorHandler = None):
     """Decorator for automatic error handling"""
     def decorator(func):
-        @wraps(func)
-        async def async_wrapper(*args, **kwargs):
-            try:
-                return await func(*args, **kwargs)
-            except Exception as e:
-                if error_handler_instance:
-                    result = error_handler_instance.handle_error(e, {
-                        "function": func.__name__,
-                        "args": str(args),
-                        "kwargs": str(kwargs)
-                    })
-                    return result
-                else:
-                    raise
+        # Only the wrapper matching the function type is built
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                try:
+                    return await func(*args, **kwargs)
+                except Exception as e:
+                    if error_handler_instance:
+                        result = error_handler_instance.handle_error(e, {
+                            "function": func.__name__,
+                            "args": _arg_repr.repr(args),
+                            "kwargs": _arg_repr.repr(kwargs)
+                        })
+                        return result
+                    else:
+                        raise
+            
+            return async_wrapper
         
         @wraps(func)
         def sync_wrapper(*args, **kwargs):
@@ -322,19 +462,14 @@ def error_handler(error_handler_instance: ErrorHandler = None):
                 if error_handler_instance:
                     result = error_handler_instance.handle_error(e, {
                         "function": func.__name__,
-                        "args": str(args),
-                        "kwargs": str(kwargs)
+                        "args": _arg_repr.repr(args),
+                        "kwargs": _arg_repr.repr(kwargs)
                     })
                     return result
                 else:
                     raise
         
-        # Return appropriate wrapper based on function type
-        import asyncio
-        if asyncio.iscoroutinefunction(func):
-            return async_wrapper
-        else:
-            return sync_wrapper
+        return sync_wrapper
     
     return decorator
 
@@ -1,12 +1,116 @@
 """
 File utilities for Agent Zero Gemini
 """
+import asyncio
 import os
+import re
 import shutil
+import time
 import hashlib
+import heapq
+import mmap
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import Iterator, List, Optional, Dict, Any, Tuple
 import mimetypes
+from functools import lru_cache
+from stat import S_ISDIR, S_ISREG
+
+import aiofiles
+
+@lru_cache(maxsize=4096)
+def _cached_file_hash(path: str, mtime_ns: int, size: int) -> str:
+    """File hash memoized per (path, mtime, size), so a modified file is re-hashed"""
+    return FileUtils.get_file_hash(Path(path))
+
+# Characters not allowed in filenames: ASCII control characters and <>:"/\|?*
+_INVALID_FILENAME_RE = re.compile(r'[\x00-\x1f<>:"/\\|?*]')
+
+def _walk_entries(directory: Path) -> Iterator[Tuple[os.DirEntry, os.stat_result]]:
+    """Yield (entry, stat) for every regular file under directory, one stat per file"""
+    stack = [str(directory)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            yield entry, entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+
+def _copy_file_range(source: Path, destination: Path):
+    """Copy in the kernel with copy_file_range, which reflinks on CoW filesystems; keeps metadata like copy2"""
+    # Opening the destination truncates it, which would wipe the source if both are one file
+    if os.path.exists(destination) and os.path.samefile(source, destination):
+        raise shutil.SameFileError(f"{source!r} and {destination!r} are the same file")
+    
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        remaining = os.fstat(src.fileno()).st_size
+        while remaining > 0:
+            copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+            if copied == 0:
+                break
+            remaining -= copied
+    shutil.copystat(source, destination)
+
+class _AppendCoalescer:
+    """Write-behind buffer that turns concurrent appends to one file into a single write"""
+    
+    def __init__(self, interval: float = 0.05, max_batch: int = 64):
+        self.interval = interval
+        self.max_batch = max_batch
+        # (path, encoding, create_dirs) -> (pending chunks, future resolved once they are written)
+        self._pending: Dict[Tuple[str, str, bool], Tuple[List[str], asyncio.Future]] = {}
+        # Last flush per key, so batches for one file are written in order
+        self._writing: Dict[Tuple[str, str, bool], asyncio.Task] = {}
+    
+    async def append(self, file_path: Path, content: str, encoding: str, create_dirs: bool) -> bool:
+        """Queue content for file_path; resolves to whether its batch was written"""
+        loop = asyncio.get_running_loop()
+        key = (str(file_path), encoding, create_dirs)
+        
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = ([], loop.create_future())
+            loop.call_later(self.interval, self._flush, key)
+        
+        chunks, written = batch
+        chunks.append(content)
+        if len(chunks) >= self.max_batch:
+            self._flush(key)
+        
+        return await asyncio.shield(written)
+    
+    def _flush(self, key: Tuple[str, str, bool]):
+        """Start writing the pending batch for key, if it hasn't been already"""
+        batch = self._pending.pop(key, None)
+        if batch is not None:
+            self._writing[key] = asyncio.ensure_future(self._write(key, *batch, self._writing.get(key)))
+    
+    async def _write(self, key: Tuple[str, str, bool], chunks: List[str], written: asyncio.Future, previous: Optional[asyncio.Task]):
+        """Append a batch with one open/write, after the previous batch for the same file"""
+        if previous is not None and not previous.done():
+            await previous
+        
+        path, encoding, create_dirs = key
+        try:
+            if create_dirs:
+                await asyncio.to_thread(Path(path).parent.mkdir, parents=True, exist_ok=True)
+            
+            async with aiofiles.open(path, "a", encoding=encoding) as f:
+                await f.write("".join(chunks))
+            written.set_result(True)
+        except Exception:
+            written.set_result(False)
+        finally:
+            if self._writing.get(key) is asyncio.current_task():
+                del self._writing[key]
+
+_append_coalescer = _AppendCoalescer()
 
 class FileUtils:
     """Utility functions for file operations"""
@@ -20,21 +124,29 @@ class FileUtils:
     @staticmethod
     def get_file_hash(file_path: Path, algorithm: str = "sha256") -> str:
         """Get file hash"""
-        hash_func = hashlib.new(algorithm)
-        
         with open(file_path, "rb") as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hash_func.update(chunk)
-        
-        return hash_func.hexdigest()
+            # Python 3.11+: the read/update loop runs in C with the GIL released
+            if hasattr(hashlib, "file_digest"):
+                return hashlib.file_digest(f, algorithm).hexdigest()
+            
+            hash_func = hashlib.new(algorithm)
+            size = os.fstat(f.fileno()).st_size
+            if size:
+                # One update() over the mapped file instead of a Python-level chunk loop
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    hash_func.update(mapped)
+            
+            return hash_func.hexdigest()
     
     @staticmethod
     def get_file_info(file_path: Path) -> Dict[str, Any]:
         """Get comprehensive file information"""
-        if not file_path.exists():
+        try:
+            stat = file_path.stat()
+        except (FileNotFoundError, NotADirectoryError):
             return {"exists": False}
         
-        stat = file_path.stat()
+        is_file = S_ISREG(stat.st_mode)
         mime_type, encoding = mimetypes.guess_type(str(file_path))
         
         return {
@@ -42,27 +154,27 @@ class FileUtils:
             "name": file_path.name,
             "path": str(file_path.absolute()),
             "size": stat.st_size,
-            "is_file": file_path.is_file(),
-            "is_directory": file_path.is_dir(),
+            "is_file": is_file,
+            "is_directory": S_ISDIR(stat.st_mode),
             "mime_type": mime_type,
             "encoding": encoding,
             "created": stat.st_ctime,
             "modified": stat.st_mtime,
             "accessed": stat.st_atime,
             "permissions": oct(stat.st_mode)[-3:],
-            "hash": FileUtils.get_file_hash(file_path) if file_path.is_file() else None
+            "hash": _cached_file_hash(str(file_path), stat.st_mtime_ns, stat.st_size) if is_file else None
         }
     
+    @staticmethod
+    def clear_info_cache() -> None:
+        """Forget file hashes memoized by get_file_info"""
+        _cached_file_hash.cache_clear()
+    
     @staticmethod
     def safe_filename(filename: str) -> str:
         """Create safe filename by removing/replacing invalid characters"""
-        # Characters not allowed in filenames
-        invalid_chars = '<>:"/\\|?*'
-        
-        # Replace invalid characters with underscore
-        safe_name = filename
-        for char in invalid_chars:
-            safe_name = safe_name.replace(char, '_')
+        # Replace invalid characters with underscore, in a single pass
+        safe_name = _INVALID_FILENAME_RE.sub('_', filename)
         
         # Remove leading/trailing spaces and dots
         safe_name = safe_name.strip(' .')
@@ -86,7 +198,13 @@ class FileUtils:
             # Ensure destination directory exists
             destination.parent.mkdir(parents=True, exist_ok=True)
             
-            shutil.copy2(source, destination)
+            try:
+                _copy_file_range(source, destination)
+            except shutil.SameFileError:
+                raise
+            except (AttributeError, OSError):
+                # No copy_file_range (non-Linux, Python < 3.8) or unsupported here
+                shutil.copy2(source, destination)
             return True
             
         except Exception:
@@ -150,8 +268,10 @@ class FileUtils:
             paths = directory.glob(pattern)
         
         for path in paths:
-            if path.is_file() or (path.is_dir() and include_dirs):
-                files.append(FileUtils.get_file_info(path))
+            # get_file_info stats once; reuse its result instead of is_file()/is_dir() probes
+            info = FileUtils.get_file_info(path)
+            if info.get("is_file") or (info.get("is_directory") and include_dirs):
+                files.append(info)
         
         return files
     
@@ -201,18 +321,46 @@ class FileUtils:
         except Exception:
             return False
     
+    @staticmethod
+    async def write_text_file_async(
+        file_path: Path, 
+        content: str, 
+        encoding: str = "utf-8",
+        create_dirs: bool = True
+    ) -> bool:
+        """Write text file without blocking the event loop"""
+        try:
+            if create_dirs:
+                await asyncio.to_thread(file_path.parent.mkdir, parents=True, exist_ok=True)
+            
+            async with aiofiles.open(file_path, "w", encoding=encoding) as f:
+                await f.write(content)
+            
+            return True
+            
+        except Exception:
+            return False
+    
+    @staticmethod
+    async def append_to_file_async(
+        file_path: Path, 
+        content: str, 
+        encoding: str = "utf-8",
+        create_dirs: bool = True
+    ) -> bool:
+        """Append content to file; appends to the same file within 50 ms share one write"""
+        try:
+            return await _append_coalescer.append(file_path, content, encoding, create_dirs)
+        except Exception:
+            return False
+    
     @staticmethod
     def get_directory_size(directory: Path) -> int:
         """Get total size of directory"""
         if not directory.exists() or not directory.is_dir():
             return 0
         
-        total_size = 0
-        for path in directory.rglob("*"):
-            if path.is_file():
-                total_size += path.stat().st_size
-        
-        return total_size
+        return sum(stat.st_size for _, stat in _walk_entries(directory))
     
     @staticmethod
     def cleanup_directory(
@@ -224,9 +372,6 @@ class FileUtils:
         if not directory.exists():
             return {"cleaned": False, "reason": "Directory does not exist"}
         
-        import time
-        from datetime import datetime, timedelta
-        
         current_time = time.time()
         cutoff_time = current_time - (max_age_days * 24 * 60 * 60)
         max_size_bytes = max_size_mb * 1024 * 1024
@@ -234,33 +379,32 @@ class FileUtils:
         files_removed = 0
         bytes_freed = 0
         
-        # Remove old files
-        for file_path in directory.rglob("*"):
-            if file_path.is_file():
-                file_stat = file_path.stat()
-                
-                # Check age
-                if file_stat.st_mtime < cutoff_time:
-                    file_size = file_stat.st_size
-                    if FileUtils.delete_file(file_path):
-                        files_removed += 1
-                        bytes_freed += file_size
+        # One walk collects (size, mtime, path); both passes below work from it
+        entries = [
+            (stat.st_size, stat.st_mtime, Path(entry.path))
+            for entry, stat in _walk_entries(directory)
+        ]
+        
+        # Remove old files; survivors are kept as (-size, path) for the max-heap below
+        remaining = []
+        for file_size, mtime, file_path in entries:
+            if mtime < cutoff_time and FileUtils.delete_file(file_path):
+                files_removed += 1
+                bytes_freed += file_size
+            else:
+                remaining.append((-file_size, file_path))
         
         # Check if directory is still too large
-        current_size = FileUtils.get_directory_size(directory)
+        current_size = -sum(neg_size for neg_size, _ in remaining)
         
         if current_size > max_size_bytes:
-            # Remove largest files first until under limit
-            files_by_size = []
-            for file_path in directory.rglob("*"):
-                if file_path.is_file():
-                    files_by_size.append((file_path.stat().st_size, file_path))
-            
-            files_by_size.sort(reverse=True)  # Largest first
+            # Remove largest files first until under limit; only the files actually
+            # removed are popped, instead of sorting the whole tree
+            heapq.heapify(remaining)
             
-            for file_size, file_path in files_by_size:
-                if current_size <= max_size_bytes:
-                    break
+            while current_size > max_size_bytes and remaining:
+                neg_size, file_path = heapq.heappop(remaining)
+                file_size = -neg_size
                 
                 if FileUtils.delete_file(file_path):
                     files_removed += 1
@@ -271,5 +415,5 @@ class FileUtils:
             "cleaned": True,
             "files_removed": files_removed,
             "bytes_freed": bytes_freed,
-            "final_size": FileUtils.get_directory_size(directory)
+            "final_size": current_size
         }
@@ -1,16 +1,85 @@
 """
 Logging setup for Agent Zero Gemini
 """
+import atexit
 import logging
 import logging.handlers
+import queue
 from pathlib import Path
 from datetime import datetime
 
 from config import config
 
+# Loggers whose records (and their children's) also go to agents.log
+_AGENT_LOGGERS = ("core.agent", "core.gemini_client", "core.tools", "core.memory", "core.communication")
+
+class _AgentLogFilter(logging.Filter):
+    """Pass only records from the agent subsystem loggers"""
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        name = record.name
+        return any(name == prefix or name.startswith(prefix + ".") for prefix in _AGENT_LOGGERS)
+
+# Write buffer for log files; flushed whenever the log queue runs dry
+_LOG_BUFFER_BYTES = 1 << 16
+
+class BufferedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """RotatingFileHandler that writes through a 64 KiB buffer instead of flushing every record"""
+    
+    def _open(self):
+        return open(self.baseFilename, self.mode, buffering=_LOG_BUFFER_BYTES,
+                    encoding=self.encoding, errors=getattr(self, "errors", None))
+    
+    def flush(self):
+        # Called by emit() after every record; the listener calls flush_buffer() instead
+        pass
+    
+    def flush_buffer(self):
+        """Write buffered records to disk"""
+        logging.handlers.RotatingFileHandler.flush(self)
+
+class _FlushingQueueListener(logging.handlers.QueueListener):
+    """QueueListener that flushes buffered handlers each time the queue is drained"""
+    
+    def dequeue(self, block):
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            _flush_buffers(self.handlers)
+            return self.queue.get(block)
+
+def _flush_buffers(handlers):
+    """Flush every handler that buffers its writes"""
+    for handler in handlers:
+        if isinstance(handler, BufferedRotatingFileHandler):
+            handler.flush_buffer()
+
+# Background threads that write queued records to the real handlers
+_queue_listeners = []
+
+def _start_queue_listener(*handlers) -> logging.handlers.QueueHandler:
+    """Run handlers on a background listener thread; returns the handler that feeds it"""
+    log_queue = queue.SimpleQueue()
+    listener = _FlushingQueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _queue_listeners.append(listener)
+    return logging.handlers.QueueHandler(log_queue)
+
+def _stop_queue_listeners():
+    """Flush queued records and stop the listener threads"""
+    while _queue_listeners:
+        listener = _queue_listeners.pop()
+        listener.stop()
+        _flush_buffers(listener.handlers)
+
+atexit.register(_stop_queue_listeners)
+
 def setup_logging():
     """Setup logging configuration"""
     
+    # Logging calls only enqueue; console and file writes happen on listener threads
+    _stop_queue_listeners()
+    
     # Create logs directory
     logs_dir = Path("logs")
     logs_dir.mkdir(exist_ok=True)
@@ -35,56 +104,37 @@ def setup_logging():
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(simple_formatter)
-    root_logger.addHandler(console_handler)
     
     # File handler for all logs
-    file_handler = logging.handlers.RotatingFileHandler(
+    file_handler = BufferedRotatingFileHandler(
         filename=config.logging.file,
         maxBytes=10*1024*1024,  # 10MB
         backupCount=5
     )
     file_handler.setLevel(logging.DEBUG)
     file_handler.setFormatter(detailed_formatter)
-    root_logger.addHandler(file_handler)
     
     # Error file handler
-    error_handler = logging.handlers.RotatingFileHandler(
+    error_handler = BufferedRotatingFileHandler(
         filename=logs_dir / "errors.log",
         maxBytes=5*1024*1024,  # 5MB
         backupCount=3
     )
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(detailed_formatter)
-    root_logger.addHandler(error_handler)
     
     # Agent-specific handler
-    agent_handler = logging.handlers.RotatingFileHandler(
+    agent_handler = BufferedRotatingFileHandler(
         filename=logs_dir / "agents.log",
         maxBytes=10*1024*1024,  # 10MB
         backupCount=5
     )
     agent_handler.setLevel(logging.DEBUG)
     agent_handler.setFormatter(detailed_formatter)
+    # Agent records reach it through the root queue; the filter picks them out by logger name
+    agent_handler.addFilter(_AgentLogFilter())
     
-    # Add agent handler to agent loggers
-    agent_logger = logging.getLogger("core.agent")
-    agent_logger.addHandler(agent_handler)
-    
-    # Gemini client logger
-    gemini_logger = logging.getLogger("core.gemini_client")
-    gemini_logger.addHandler(agent_handler)
-    
-    # Tools logger
-    tools_logger = logging.getLogger("core.tools")
-    tools_logger.addHandler(agent_handler)
-    
-    # Memory logger
-    memory_logger = logging.getLogger("core.memory")
-    memory_logger.addHandler(agent_handler)
-    
-    # Communication logger
-    comm_logger = logging.getLogger("core.communication")
-    comm_logger.addHandler(agent_handler)
+    root_logger.addHandler(_start_queue_listener(console_handler, file_handler, error_handler, agent_handler))
     
     # Suppress some noisy loggers
     logging.getLogger("urllib3").setLevel(logging.WARNING)
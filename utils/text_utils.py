@@ -3,9 +3,87 @@ Text utilities for Agent Zero Gemini
 """
 import re
 import html
-from typing import List, Dict, Optional, Any
+import textwrap
+from functools import lru_cache
+import threading
+from itertools import islice
+from typing import FrozenSet, Iterator, List, Dict, Optional, Any, Tuple
 from datetime import datetime
 
+# Patterns compiled once at import rather than looked up in re's cache per call
+# str.translate deletion table for C0 control characters (except \t \n \r) and DEL
+_CTRL_DELETE_TABLE = dict.fromkeys([*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20), 0x7F])
+_CODE_BLOCK_RE = re.compile(r'```(\w+)?\n?(.*?)```', re.DOTALL)
+# Negated classes rather than lazy .*? so the engine never backtracks within a match
+_TOOL_CALL_RE = re.compile(r'TOOL_CALL:\s*(\w+)\(([^)]*)\)')
+_PARAM_RE = re.compile(r'(\w+)=(?:"([^"\n]*)"|\'([^\'\n]*)\')')
+_URL_PATTERN = r'https?://[^\s<>"{}|\\^`\[\]]+'
+_EMAIL_PATTERN = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+_URL_RE = re.compile(_URL_PATTERN)
+_EMAIL_RE = re.compile(_EMAIL_PATTERN)
+_SENT_RE = re.compile(r'[.!?]+\s+')
+
+# ASCII characters str.split() treats as whitespace: \t \n \v \f \r, \x1c-\x1f and space
+_ASCII_WHITESPACE = bytes([*range(0x09, 0x0E), *range(0x1C, 0x21)])
+# Texts shorter than this are counted faster by str.split()
+_VECTOR_COUNT_MIN_LENGTH = 4096
+
+@lru_cache(maxsize=1)
+def _ascii_whitespace_table():
+    """Byte -> is-whitespace lookup table for vectorized word counting"""
+    import numpy as np
+    
+    table = np.zeros(256, dtype=bool)
+    table[list(_ASCII_WHITESPACE)] = True
+    return table
+
+@lru_cache(maxsize=64)
+def _compile_keyword_re(keywords: tuple) -> re.Pattern:
+    """Case-insensitive alternation of keywords, compiled once per vocabulary"""
+    return re.compile('|'.join(re.escape(keyword) for keyword in keywords), re.IGNORECASE)
+
+def _sentence_spans(text: str) -> Iterator[Tuple[int, int]]:
+    """(start, end) of each segment _SENT_RE.split would return, found lazily"""
+    last = 0
+    for match in _SENT_RE.finditer(text):
+        yield last, match.start()
+        last = match.end()
+    yield last, len(text)
+
+@lru_cache(maxsize=4096)
+def _tokenize(text: str) -> FrozenSet[str]:
+    """Lowercased word set of a text, memoized for repeated comparisons"""
+    return frozenset(text.lower().split())
+
+def _jaccard(words1: FrozenSet[str], words2: FrozenSet[str]) -> float:
+    """Jaccard similarity of two word sets"""
+    if not words1 or not words2:
+        return 0.0
+    
+    intersection = len(words1 & words2)
+    return intersection / (len(words1) + len(words2) - intersection)
+
+# Hyperscan pattern ids for the combined URL/email database
+_HS_URL, _HS_EMAIL = 0, 1
+_hyperscan_lock = threading.Lock()
+
+@lru_cache(maxsize=1)
+def _hyperscan_database():
+    """URL and email patterns compiled into one Hyperscan database, or None without hyperscan"""
+    try:
+        import hyperscan
+    except ImportError:
+        return None
+    
+    database = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    database.compile(
+        expressions=[_URL_PATTERN.encode("utf-8"), _EMAIL_PATTERN.encode("utf-8")],
+        ids=[_HS_URL, _HS_EMAIL],
+        elements=2,
+        flags=[hyperscan.HS_FLAG_SOM_LEFTMOST] * 2
+    )
+    return database
+
 class TextUtils:
     """Utility functions for text processing"""
     
@@ -20,23 +98,19 @@ class TextUtils:
     @staticmethod
     def clean_text(text: str) -> str:
         """Clean text by removing extra whitespace and special characters"""
-        # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Remove leading/trailing whitespace
-        text = text.strip()
+        # Collapse whitespace runs and trim the ends; split() does both in C
+        text = ' '.join(text.split())
         
         # Remove control characters except newlines and tabs
-        text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F]', '', text)
+        text = text.translate(_CTRL_DELETE_TABLE)
         
         return text
     
     @staticmethod
     def extract_code_blocks(text: str) -> List[Dict[str, str]]:
         """Extract code blocks from markdown-style text"""
-        # Pattern for code blocks with optional language
-        pattern = r'```(\w+)?\n?(.*?)```'
-        matches = re.findall(pattern, text, re.DOTALL)
+        # Code blocks with optional language
+        matches = _CODE_BLOCK_RE.findall(text)
         
         code_blocks = []
         for language, code in matches:
@@ -50,9 +124,8 @@ class TextUtils:
     @staticmethod
     def extract_tool_calls(text: str) -> List[Dict[str, Any]]:
         """Extract tool calls from text"""
-        # Pattern for TOOL_CALL: format
-        pattern = r'TOOL_CALL:\s*(\w+)\((.*?)\)'
-        matches = re.findall(pattern, text, re.DOTALL)
+        # TOOL_CALL: format
+        matches = _TOOL_CALL_RE.findall(text)
         
         tool_calls = []
         for tool_name, params_str in matches:
@@ -60,11 +133,10 @@ class TextUtils:
             params = {}
             if params_str.strip():
                 # Simple parameter parsing
-                param_pattern = r'(\w+)=(["\'])(.*?)\2'
-                param_matches = re.findall(param_pattern, params_str)
+                param_matches = _PARAM_RE.findall(params_str)
                 
-                for param_name, quote, param_value in param_matches:
-                    params[param_name] = param_value
+                for param_name, double_quoted, single_quoted in param_matches:
+                    params[param_name] = double_quoted or single_quoted
             
             tool_calls.append({
                 "name": tool_name,
@@ -83,23 +155,13 @@ class TextUtils:
             if len(line) <= max_line_length:
                 formatted_lines.append(line)
             else:
-                # Word wrap long lines
-                words = line.split()
-                current_line = ""
-                
-                for word in words:
-                    if len(current_line + " " + word) <= max_line_length:
-                        if current_line:
-                            current_line += " " + word
-                        else:
-                            current_line = word
-                    else:
-                        if current_line:
-                            formatted_lines.append(current_line)
-                        current_line = word
-                
-                if current_line:
-                    formatted_lines.append(current_line)
+                # Word wrap long lines; words are rejoined with single spaces and never split
+                formatted_lines.extend(textwrap.wrap(
+                    ' '.join(line.split()),
+                    width=max_line_length,
+                    break_long_words=False,
+                    break_on_hyphens=False
+                ))
         
         return '\n'.join(formatted_lines)
     
@@ -116,51 +178,89 @@ class TextUtils:
     @staticmethod
     def extract_urls(text: str) -> List[str]:
         """Extract URLs from text"""
-        url_pattern = r'https?://[^\s<>"{}|\\^`\[\]]+'
-        return re.findall(url_pattern, text)
+        return _URL_RE.findall(text)
     
     @staticmethod
     def extract_emails(text: str) -> List[str]:
         """Extract email addresses from text"""
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        return re.findall(email_pattern, text)
+        return _EMAIL_RE.findall(text)
+    
+    @staticmethod
+    def extract_urls_and_emails(text: str) -> Dict[str, List[str]]:
+        """Extract URLs and email addresses, in a single Hyperscan pass when available"""
+        # Hyperscan's \s and \b are ASCII-only, so Unicode text keeps re's semantics
+        database = _hyperscan_database() if text.isascii() else None
+        if database is None:
+            return {"urls": _URL_RE.findall(text), "emails": _EMAIL_RE.findall(text)}
+        
+        # One DFA pass finds the earliest start of each pattern; texts without
+        # candidates never reach re, the rest resolve matches from that offset
+        first_start: Dict[int, int] = {}
+        
+        def on_match(pattern_id, start, end, flags, context):
+            if start < first_start.get(pattern_id, len(text)):
+                first_start[pattern_id] = start
+        
+        # A database's scratch space can't be shared between concurrent scans
+        with _hyperscan_lock:
+            database.scan(text.encode("ascii"), match_event_handler=on_match)
+        
+        return {
+            "urls": _URL_RE.findall(text, first_start[_HS_URL]) if _HS_URL in first_start else [],
+            "emails": _EMAIL_RE.findall(text, first_start[_HS_EMAIL]) if _HS_EMAIL in first_start else []
+        }
     
     @staticmethod
     def count_words(text: str) -> int:
         """Count words in text"""
-        return len(text.split())
+        if len(text) < _VECTOR_COUNT_MIN_LENGTH or not text.isascii():
+            return len(text.split())
+        
+        try:
+            import numpy as np
+        except ImportError:
+            return len(text.split())
+        
+        # Count whitespace -> word transitions over the bytes instead of building
+        # a list of every word; a word also starts at a non-whitespace first byte
+        space = _ascii_whitespace_table()[np.frombuffer(text.encode("ascii"), dtype=np.uint8)]
+        return int(np.count_nonzero(space[:-1] & ~space[1:])) + (not space[0])
     
     @staticmethod
     def count_sentences(text: str) -> int:
         """Count sentences in text"""
-        # Simple sentence counting based on punctuation
-        sentence_endings = r'[.!?]+\s+'
-        sentences = re.split(sentence_endings, text)
-        return len([s for s in sentences if s.strip()])
+        # Simple sentence counting based on punctuation. The greedy \s+ leaves every
+        # later segment either empty or starting with content, so only the first
+        # segment can be blank without being empty
+        sentences = _SENT_RE.split(text)
+        count = len(sentences) - sentences.count('')
+        return count - 1 if sentences[0].isspace() else count
     
     @staticmethod
     def highlight_keywords(text: str, keywords: List[str], highlight_format: str = "**{}**") -> str:
         """Highlight keywords in text"""
-        highlighted_text = text
-        
-        for keyword in keywords:
-            # Case-insensitive replacement
-            pattern = re.compile(re.escape(keyword), re.IGNORECASE)
-            highlighted_text = pattern.sub(
-                lambda m: highlight_format.format(m.group(0)),
-                highlighted_text
-            )
+        # One case-insensitive pass for all keywords; longer keywords are tried first
+        # so a keyword that contains another is highlighted whole. The order is fully
+        # determined so repeated vocabularies hit the compiled-pattern cache
+        keywords = tuple(sorted({keyword for keyword in keywords if keyword}, key=lambda k: (-len(k), k)))
+        if not keywords:
+            return text
         
-        return highlighted_text
+        pattern = _compile_keyword_re(keywords)
+        return pattern.sub(lambda m: highlight_format.format(m.group(0)), text)
     
     @staticmethod
     def create_summary(text: str, max_sentences: int = 3) -> str:
         """Create simple summary by taking first few sentences"""
-        sentences = re.split(r'[.!?]+\s+', text)
-        summary_sentences = sentences[:max_sentences]
+        if max_sentences < 0:
+            summary_sentences = _SENT_RE.split(text)[:max_sentences]
+        else:
+            # Stop scanning once the leading sentences are found
+            summary_sentences = (text[start:end] for start, end in islice(_sentence_spans(text), max_sentences))
         
         # Clean up and join
-        summary = '. '.join(s.strip() for s in summary_sentences if s.strip())
+        stripped = (s.strip() for s in summary_sentences)
+        summary = '. '.join(s for s in stripped if s)
         
         if summary and not summary.endswith('.'):
             summary += '.'
@@ -199,46 +299,34 @@ class TextUtils:
         if headers is None:
             headers = list(data[0].keys())
         
-        # Calculate column widths
-        col_widths = {}
-        for header in headers:
-            col_widths[header] = len(header)
-        
-        for row in data:
-            for header in headers:
-                value = str(row.get(header, ""))
-                col_widths[header] = max(col_widths[header], len(value))
+        # Stringify every cell once
+        cell_rows = [[str(row.get(header, "")) for header in headers] for row in data]
         
-        # Create table
-        lines = []
-        
-        # Header row
-        header_row = " | ".join(header.ljust(col_widths[header]) for header in headers)
-        lines.append(header_row)
-        
-        # Separator row
-        separator_row = " | ".join("-" * col_widths[header] for header in headers)
-        lines.append(separator_row)
+        # Calculate column widths
+        col_widths = [
+            max(len(header), max((len(cells[index]) for cells in cell_rows), default=0))
+            for index, header in enumerate(headers)
+        ]
         
-        # Data rows
-        for row in data:
-            data_row = " | ".join(str(row.get(header, "")).ljust(col_widths[header]) for header in headers)
-            lines.append(data_row)
+        # Header row, separator row, then data rows
+        lines = [
+            " | ".join(header.ljust(width) for header, width in zip(headers, col_widths)),
+            " | ".join("-" * width for width in col_widths)
+        ]
+        lines.extend(
+            " | ".join(cell.ljust(width) for cell, width in zip(cells, col_widths))
+            for cells in cell_rows
+        )
         
         return "\n".join(lines)
     
     @staticmethod
     def similarity_score(text1: str, text2: str) -> float:
         """Calculate simple similarity score between two texts"""
-        # Convert to lowercase and split into words
-        words1 = set(text1.lower().split())
-        words2 = set(text2.lower().split())
-        
-        # Calculate Jaccard similarity
-        intersection = len(words1.intersection(words2))
-        union = len(words1.union(words2))
-        
-        if union == 0:
-            return 0.0
-        
-        return intersection / union
+        return _jaccard(_tokenize(text1), _tokenize(text2))
+    
+    @staticmethod
+    def similarity_batch(query: str, documents: List[str]) -> List[float]:
+        """Similarity score of query against each document, tokenizing the query once"""
+        query_words = _tokenize(query)
+        return [_jaccard(query_words, _tokenize(document)) for document in documents]
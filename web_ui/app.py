@@ -4,7 +4,8 @@ FastAPI web application for Agent Zero Gemini
 import asyncio
 import json
 import logging
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request, HTTPException
@@ -15,8 +16,80 @@ from pydantic import BaseModel
 
 from config import config
 
+# Optional faster JSON serializer; json is used when it is missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Seconds that status and statistics results are reused across polls
+_STATS_TTL = 1.0
+
+# Replies ready within this many seconds are sent without a typing indicator frame
+_TYPING_DELAY = 0.05
+
+# Messages buffered per WebSocket client before it is treated as too slow
+_SEND_QUEUE_SIZE = 64
+# WebSocket close code 1013 (try again later), for rejected and overflowing clients
+_WS_TRY_AGAIN_LATER = 1013
+
+# (millisecond, ISO string) of the last timestamp formatted by _now_iso
+_now_iso_cache = (0, "")
+
+def _now_iso() -> str:
+    """Current local time in ISO format, formatted at most once per millisecond"""
+    global _now_iso_cache
+    
+    now = time.time()
+    millisecond = int(now * 1000)
+    if _now_iso_cache[0] != millisecond:
+        _now_iso_cache = (millisecond, datetime.fromtimestamp(now).isoformat())
+    return _now_iso_cache[1]
+
+def _dumps(data: Any) -> str:
+    """Serialize a WebSocket payload to JSON text, with orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(data, default=str).decode("utf-8")
+    return json.dumps(data, default=str)
+
+class _OrjsonResponse(JSONResponse):
+    """JSON response rendered straight to bytes by orjson when available"""
+    
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+        return super().render(content)
+
+class _AsyncTTLCache:
+    """Reuses results of async introspection calls for a short time"""
+    
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries: Dict[str, Tuple[float, asyncio.Future]] = {}
+    
+    async def get(self, key: str, factory):
+        """Result of factory() cached under key, sharing a call already in flight"""
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is None or now - entry[0] > self.ttl:
+            entry = (now, asyncio.ensure_future(factory()))
+            self._entries[key] = entry
+        
+        try:
+            # Shielded so one cancelled caller doesn't cancel the shared call
+            return await asyncio.shield(entry[1])
+        except Exception:
+            # Failures are not cached
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+            raise
+    
+    def clear(self):
+        """Drop all cached results"""
+        self._entries.clear()
+
 class ChatMessage(BaseModel):
     """Chat message model"""
     message: str
@@ -25,44 +98,106 @@ class ChatMessage(BaseModel):
 class WebSocketManager:
     """Manages WebSocket connections"""
     
-    def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
+    def __init__(self, max_connections: int = 1000):
+        self.max_connections = max_connections
+        # Contiguous (client_id, websocket, send queue, sender task) list for
+        # broadcasts, indexed by client_id
+        self._connections: List[Tuple[str, WebSocket, asyncio.Queue, asyncio.Task]] = []
+        self._index: Dict[str, int] = {}
+    
+    @property
+    def active_connections(self) -> Dict[str, WebSocket]:
+        """Connected clients by id"""
+        return {client_id: websocket for client_id, websocket, _, _ in self._connections}
     
-    async def connect(self, websocket: WebSocket, client_id: str):
-        """Connect client"""
+    async def connect(self, websocket: WebSocket, client_id: str) -> bool:
+        """Connect client; False if the connection limit is reached"""
+        if client_id not in self._index and len(self._connections) >= self.max_connections:
+            await websocket.close(code=_WS_TRY_AGAIN_LATER)
+            logger.warning(f"WebSocket client {client_id} rejected: {self.max_connections} connections open")
+            return False
+        
         await websocket.accept()
-        self.active_connections[client_id] = websocket
+        
+        # Each client gets its own bounded queue and sender, so a slow client
+        # never blocks the agent or the other clients
+        queue = asyncio.Queue(maxsize=_SEND_QUEUE_SIZE)
+        sender = asyncio.create_task(self._send_queued(client_id, websocket, queue))
+        entry = (client_id, websocket, queue, sender)
+        
+        if client_id in self._index:
+            position = self._index[client_id]
+            self._connections[position][3].cancel()
+            self._connections[position] = entry
+        else:
+            self._index[client_id] = len(self._connections)
+            self._connections.append(entry)
         logger.info(f"WebSocket client {client_id} connected")
+        return True
     
     def disconnect(self, client_id: str):
         """Disconnect client"""
-        if client_id in self.active_connections:
-            del self.active_connections[client_id]
+        position = self._index.pop(client_id, None)
+        if position is not None:
+            # Swap the last connection into the freed slot and pop the tail
+            last = self._connections.pop()
+            if position < len(self._connections):
+                removed = self._connections[position]
+                self._connections[position] = last
+                self._index[last[0]] = position
+            else:
+                removed = last
+            removed[3].cancel()
             logger.info(f"WebSocket client {client_id} disconnected")
     
+    async def _send_queued(self, client_id: str, websocket: WebSocket, queue: asyncio.Queue):
+        """Drain a client's queue onto its socket until it fails or is cancelled"""
+        try:
+            while True:
+                message = await queue.get()
+                await websocket.send_text(message)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Error sending message to {client_id}: {e}")
+            if self._is_current(client_id, websocket):
+                self.disconnect(client_id)
+    
+    def _is_current(self, client_id: str, websocket: WebSocket) -> bool:
+        """Whether websocket is still the registered connection for client_id"""
+        position = self._index.get(client_id)
+        return position is not None and self._connections[position][1] is websocket
+    
+    def _enqueue(self, client_id: str, message: str) -> bool:
+        """Queue a message for a client; on overflow drop the client and close its socket"""
+        _, websocket, queue, _ = self._connections[self._index[client_id]]
+        try:
+            queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            logger.warning(f"WebSocket client {client_id} is not keeping up; closing its connection")
+            self.disconnect(client_id)
+            asyncio.create_task(self._close(websocket))
+            return False
+    
+    @staticmethod
+    async def _close(websocket: WebSocket):
+        """Close a socket, ignoring one that is already gone"""
+        try:
+            await websocket.close(code=_WS_TRY_AGAIN_LATER)
+        except Exception:
+            pass
+    
     async def send_personal_message(self, message: str, client_id: str):
         """Send message to specific client"""
-        if client_id in self.active_connections:
-            try:
-                await self.active_connections[client_id].send_text(message)
-            except Exception as e:
-                logger.error(f"Error sending message to {client_id}: {e}")
-                self.disconnect(client_id)
+        if client_id in self._index:
+            self._enqueue(client_id, message)
     
     async def broadcast(self, message: str):
         """Broadcast message to all clients"""
-        disconnected_clients = []
-        
-        for client_id, connection in self.active_connections.items():
-            try:
-                await connection.send_text(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to {client_id}: {e}")
-                disconnected_clients.append(client_id)
-        
-        # Clean up disconnected clients
-        for client_id in disconnected_clients:
-            self.disconnect(client_id)
+        # Queueing never waits on a socket; overflowing clients drop out as they fail
+        for client_id in [client_id for client_id, _, _, _ in self._connections]:
+            self._enqueue(client_id, message)
 
 def create_app(agent_app) -> FastAPI:
     """Create FastAPI application"""
@@ -70,11 +205,15 @@ def create_app(agent_app) -> FastAPI:
     app = FastAPI(
         title="Agent Zero Gemini",
         description="Web interface for Agent Zero powered by Gemini AI",
-        version="1.0.0"
+        version="1.0.0",
+        default_response_class=_OrjsonResponse
     )
     
     # WebSocket manager
-    websocket_manager = WebSocketManager()
+    websocket_manager = WebSocketManager(max_connections=config.web_ui.max_connections)
+    
+    # Dashboards poll status and statistics; repeated calls within the TTL share one result
+    stats_cache = _AsyncTTLCache(_STATS_TTL)
     
     # Templates and static files
     templates = Jinja2Templates(directory="web_ui/templates")
@@ -93,8 +232,8 @@ def create_app(agent_app) -> FastAPI:
     async def get_status():
         """Get agent status"""
         try:
-            status = await agent_app.get_status()
-            return JSONResponse(content=status)
+            status = await stats_cache.get("status", agent_app.get_status)
+            return _OrjsonResponse(content=status)
         except Exception as e:
             logger.error(f"Error getting status: {e}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -104,7 +243,7 @@ def create_app(agent_app) -> FastAPI:
         """Get available tools"""
         try:
             tools = agent_app.root_agent.tool_manager.get_available_tools()
-            return JSONResponse(content={"tools": tools})
+            return _OrjsonResponse(content={"tools": tools})
         except Exception as e:
             logger.error(f"Error getting tools: {e}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -113,8 +252,8 @@ def create_app(agent_app) -> FastAPI:
     async def get_memory_stats():
         """Get memory statistics"""
         try:
-            stats = await agent_app.root_agent.memory_manager.get_memory_stats()
-            return JSONResponse(content=stats)
+            stats = await stats_cache.get("memory_stats", agent_app.root_agent.memory_manager.get_memory_stats)
+            return _OrjsonResponse(content=stats)
         except Exception as e:
             logger.error(f"Error getting memory stats: {e}")
             raise HTTPException(status_code=500, detail=str(e))
@@ -123,56 +262,40 @@ def create_app(agent_app) -> FastAPI:
     async def get_hierarchy():
         """Get agent hierarchy"""
         try:
-            hierarchy = await agent_app.hierarchy_manager.get_hierarchy()
-            return JSONResponse(content=hierarchy)
+            hierarchy = await stats_cache.get("hierarchy", agent_app.hierarchy_manager.get_hierarchy)
+            return _OrjsonResponse(content=hierarchy)
         except Exception as e:
             logger.error(f"Error getting hierarchy: {e}")
             raise HTTPException(status_code=500, detail=str(e))
 
-    @app.post("/api/chat")
-    async def chat(message: ChatMessage):
-        """Send chat message"""
-        try:
-            response = await agent_app.process_user_input(message.message)
-            return JSONResponse(content={
-                "success": True,
-                "response": response,
-                "timestamp": datetime.now().isoformat()
-            })
-        except Exception as e:
-            logger.error(f"Error processing chat message: {e}")
-            return JSONResponse(content={
-                "success": False,
-                "error": str(e)
-            }, status_code=500)
-    
     @app.post("/api/chat")
     async def chat(message: ChatMessage):
         """Send chat message"""
         try:
             response = await agent_app.process_user_input(message.message)
             
-            return JSONResponse(content={
+            return _OrjsonResponse(content={
                 "success": True,
                 "response": response,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             })
             
         except Exception as e:
             logger.error(f"Error processing chat message: {e}")
-            return JSONResponse(
+            return _OrjsonResponse(
                 status_code=500,
                 content={
                     "success": False,
                     "error": str(e),
-                    "timestamp": datetime.now().isoformat()
+                    "timestamp": _now_iso()
                 }
             )
     
     @app.websocket("/ws/{client_id}")
     async def websocket_endpoint(websocket: WebSocket, client_id: str):
         """WebSocket endpoint for real-time communication"""
-        await websocket_manager.connect(websocket, client_id)
+        if not await websocket_manager.connect(websocket, client_id):
+            return
         
         try:
             while True:
@@ -184,26 +307,30 @@ def create_app(agent_app) -> FastAPI:
                     # Process chat message
                     user_message = message_data.get("message", "")
                     
-                    # Send typing indicator
-                    await websocket_manager.send_personal_message(
-                        json.dumps({
-                            "type": "typing",
-                            "message": "Agent is thinking...",
-                            "timestamp": datetime.now().isoformat()
-                        }),
-                        client_id
-                    )
+                    # Process with agent; a quick reply is sent as a single frame
+                    processing = asyncio.create_task(agent_app.process_user_input(user_message))
+                    done, _ = await asyncio.wait({processing}, timeout=_TYPING_DELAY)
+                    
+                    if not done:
+                        # Send typing indicator
+                        await websocket_manager.send_personal_message(
+                            _dumps({
+                                "type": "typing",
+                                "message": "Agent is thinking...",
+                                "timestamp": _now_iso()
+                            }),
+                            client_id
+                        )
                     
-                    # Process with agent
                     try:
-                        response = await agent_app.process_user_input(user_message)
+                        response = await processing
                         
                         # Send response
                         await websocket_manager.send_personal_message(
-                            json.dumps({
+                            _dumps({
                                 "type": "response",
                                 "message": response,
-                                "timestamp": datetime.now().isoformat()
+                                "timestamp": _now_iso()
                             }),
                             client_id
                         )
@@ -211,22 +338,22 @@ def create_app(agent_app) -> FastAPI:
                     except Exception as e:
                         # Send error
                         await websocket_manager.send_personal_message(
-                            json.dumps({
+                            _dumps({
                                 "type": "error",
                                 "message": f"Error: {str(e)}",
-                                "timestamp": datetime.now().isoformat()
+                                "timestamp": _now_iso()
                             }),
                             client_id
                         )
                 
                 elif message_data.get("type") == "status":
                     # Send status update
-                    status = await agent_app.get_status()
+                    status = await stats_cache.get("status", agent_app.get_status)
                     await websocket_manager.send_personal_message(
-                        json.dumps({
+                        _dumps({
                             "type": "status",
                             "data": status,
-                            "timestamp": datetime.now().isoformat()
+                            "timestamp": _now_iso()
                         }),
                         client_id
                     )
@@ -241,8 +368,8 @@ def create_app(agent_app) -> FastAPI:
     async def get_agents():
         """Get all agents information"""
         try:
-            hierarchy = await agent_app.hierarchy_manager.get_hierarchy()
-            return JSONResponse(content=hierarchy)
+            hierarchy = await stats_cache.get("hierarchy", agent_app.hierarchy_manager.get_hierarchy)
+            return _OrjsonResponse(content=hierarchy)
 
         except Exception as e:
             logger.error(f"Error getting agents: {e}")
@@ -254,9 +381,9 @@ def create_app(agent_app) -> FastAPI:
         try:
             if agent_id == "root_agent" and agent_app.root_agent:
                 interactions = await agent_app.root_agent.memory_manager.get_recent_interactions(limit=limit)
-                return JSONResponse(content={"interactions": interactions})
+                return _OrjsonResponse(content={"interactions": interactions})
             else:
-                return JSONResponse(content={"interactions": []})
+                return _OrjsonResponse(content={"interactions": []})
 
         except Exception as e:
             logger.error(f"Error getting agent memory: {e}")
@@ -269,16 +396,17 @@ def create_app(agent_app) -> FastAPI:
             # Reset the agent
             if agent_app.root_agent:
                 await agent_app.root_agent.reset()
+            stats_cache.clear()
 
-            return JSONResponse(content={
+            return _OrjsonResponse(content={
                 "success": True,
                 "message": "Agent reset successfully",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             })
 
         except Exception as e:
             logger.error(f"Error resetting agent: {e}")
-            return JSONResponse(content={
+            return _OrjsonResponse(content={
                 "success": False,
                 "error": str(e)
             }, status_code=500)
@@ -289,16 +417,17 @@ def create_app(agent_app) -> FastAPI:
         try:
             if agent_app.root_agent:
                 await agent_app.root_agent.memory_manager.clear_memories()
+            stats_cache.clear()
 
-            return JSONResponse(content={
+            return _OrjsonResponse(content={
                 "success": True,
                 "message": "Memory cleared successfully",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             })
 
         except Exception as e:
             logger.error(f"Error clearing memory: {e}")
-            return JSONResponse(content={
+            return _OrjsonResponse(content={
                 "success": False,
                 "error": str(e)
             }, status_code=500)
@@ -307,38 +436,23 @@ def create_app(agent_app) -> FastAPI:
     async def get_performance():
         """Get performance metrics"""
         try:
-            # Get tool statistics
-            tool_stats = await agent_app.root_agent.tool_manager.get_tool_statistics()
-
-            # Get memory stats
-            memory_stats = await agent_app.root_agent.memory_manager.get_memory_stats()
-
-            # Get hierarchy stats
-            hierarchy_stats = await agent_app.hierarchy_manager.get_hierarchy_stats()
+            # Tool, memory and hierarchy stats are independent; fetch them concurrently
+            tool_stats, memory_stats, hierarchy_stats = await asyncio.gather(
+                stats_cache.get("tool_stats", agent_app.root_agent.tool_manager.get_tool_statistics),
+                stats_cache.get("memory_stats", agent_app.root_agent.memory_manager.get_memory_stats),
+                stats_cache.get("hierarchy_stats", agent_app.hierarchy_manager.get_hierarchy_stats)
+            )
 
-            return JSONResponse(content={
+            return _OrjsonResponse(content={
                 "tools": tool_stats,
                 "memory": memory_stats,
                 "hierarchy": hierarchy_stats,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             })
 
         except Exception as e:
             logger.error(f"Error getting performance metrics: {e}")
             raise HTTPException(status_code=500, detail=str(e))
-                "success": True,
-                "message": "Agent reset successfully"
-            })
-            
-        except Exception as e:
-            logger.error(f"Error resetting agent: {e}")
-            return JSONResponse(
-                status_code=500,
-                content={
-                    "success": False,
-                    "error": str(e)
-                }
-            )
     
     return app
 
@@ -358,7 +472,9 @@ async def run_web_app(agent_app):
             app,
             host=config.web_ui.host,
             port=config.web_ui.port,
-            log_level="info"
+            log_level="info",
+            # Payloads are short JSON messages, where deflate costs more than it saves
+            ws_per_message_deflate=False
         )
         server = uvicorn.Server(config_obj)
         